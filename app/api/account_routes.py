@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.schema.account_state_schema import AppendTransactionsRequest, AccountMetricsResponse
+from app.schema.transaction_frame import TransactionFrame
+from app.services.account_state_service import AccountStateService, get_account_state_service
+from app.services.metrics_service import MetricsService
+
+router = APIRouter()
+
+@router.post("/{account_id}/transactions", response_model=AccountMetricsResponse)
+async def append_transactions(account_id: str,
+                              request: AppendTransactionsRequest,
+                              account_state_service: AccountStateService = Depends(get_account_state_service)):
+    try:
+        state = account_state_service.append_transactions(account_id, TransactionFrame.from_transactions(request.transactions))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return AccountMetricsResponse(
+        account_id=account_id,
+        transaction_count=state.transaction_count,
+        start_date=state.min_date,
+        end_date=state.max_date,
+        cashflow_metrics=MetricsService.cashflow_metrics_from_state(state),
+        debt_servicing_metrics=MetricsService.debt_servicing_metrics_from_state(state, request.total_debt)
+    )
@@ -1,46 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from app.services.ingestion_service import IngestionService
-from app.core.models import DocumentAnalysisRequest, DocumentInput
+from app.core.models import DocumentAnalysisRequest
 from app.schema.output_schema import UnifiedDocumentResponse
 from app.services.file_format_handler_service import FileFormatHandlerService
+from app.core.service_container import get_ingestion_service, get_file_format_handler
+from app.core.executor import ExecutorBusyError, ExecutorTimeoutError
+from app.core.json_response import FastJSONResponse
+from app.core.pipeline_context import InvalidPayloadError
+from app.core.response_fields import InvalidFieldsError, ResponseFields
 import traceback
 
 router = APIRouter()
 
+def get_response_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. risk_score,risk_factors; all by default"),
+    include: Optional[str] = Query(None, description="extracted_data to echo the parsed input back instead of a summary of it")
+) -> ResponseFields:
+    try:
+        return ResponseFields.parse(fields, include)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _project(response: UnifiedDocumentResponse, fields: ResponseFields) -> FastJSONResponse:
+    # Unrequested sections are left out of serialization altogether; the dump goes to orjson as is
+    return FastJSONResponse(response.model_dump(include=fields.names))
+
 @router.post("/analyze-document", response_model=UnifiedDocumentResponse)
-async def analyze_document(request: DocumentAnalysisRequest, ingestion_service: IngestionService = Depends()):
+async def analyze_document(request: DocumentAnalysisRequest,
+                           fields: ResponseFields = Depends(get_response_fields),
+                           ingestion_service: IngestionService = Depends(get_ingestion_service)):
     try:
-        response = await ingestion_service.process_document(request)
-        return response
+        response = await ingestion_service.process_document(request, fields)
+        return _project(response, fields)
+    except InvalidPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ExecutorTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         traceback.print_exc() # Print traceback for debugging
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/upload-file-for-analysis", response_model=UnifiedDocumentResponse)
-async def upload_file_for_analysis(file: UploadFile = File(...), 
-                                   ingestion_service: IngestionService = Depends(),
-                                   file_format_handler: FileFormatHandlerService = Depends()):
-    valid_extensions = ('.pdf', '.xls', '.xlsx', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')
+async def upload_file_for_analysis(file: UploadFile = File(...),
+                                   fields: ResponseFields = Depends(get_response_fields),
+                                   ingestion_service: IngestionService = Depends(get_ingestion_service),
+                                   file_format_handler: FileFormatHandlerService = Depends(get_file_format_handler)):
+    valid_extensions = ('.pdf', '.xls', '.xlsx', '.csv', '.tsv', '.parquet', '.arrow', '.feather', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')
     if not file.filename.lower().endswith(valid_extensions):
         raise HTTPException(status_code=400, detail=f"Invalid file type. Supported formats: {', '.join(valid_extensions)}.")
 
     try:
         file_content = await file.read()
-        processed_data = await file_format_handler.process_file(file_content, file.filename)
-        
-        if "error" in processed_data:
-            raise HTTPException(status_code=400, detail=f"File processing error: {processed_data['error']}")
-
-        document_input = DocumentInput(
-            document_id=file.filename,
-            content=processed_data,
+        context = await file_format_handler.build_context(
+            file_content,
+            file.filename,
             metadata={'original_filename': file.filename, 'file_type': file.content_type}
         )
-        request = DocumentAnalysisRequest(document=document_input)
-        response = await ingestion_service.process_document(request)
-        return response
+
+        if context.error:
+            raise HTTPException(status_code=400, detail=f"File processing error: {context.error}")
+
+        response = await ingestion_service.process_context(context, fields)
+        return _project(response, fields)
     except HTTPException as e:
         raise e
+    except ExecutorBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ExecutorTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         traceback.print_exc() # Print traceback for debugging
         raise HTTPException(status_code=500, detail=f"Failed to process file for analysis: {e}")
@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Response
 from app.core.models import HealthCheckResponse
+from app.core.service_container import ServiceContainer, get_service_container
 
 router = APIRouter()
 
@@ -8,6 +9,10 @@ async def livez():
     return {"status": "ok", "message": "Service is live"}
 
 @router.get("/readyz", response_model=HealthCheckResponse)
-async def readyz():
+async def readyz(response: Response, container: ServiceContainer = Depends(get_service_container)):
+    if not container.is_ready:
+        response.status_code = 503
+        if container.warm_up_error:
+            return {"status": "unavailable", "message": f"Warm-up failed: {container.warm_up_error}"}
+        return {"status": "unavailable", "message": "Service is warming up"}
     return {"status": "ok", "message": "Service is ready"}
-
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.services.risk_engine import RiskEngine
-from app.schema.output_schema import RiskScoreRequest, RiskScoreResponse, CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
+from datetime import datetime
+from app.services.risk_engine import RiskEngine, get_risk_engine
+from app.services.rule_registry import RuleRegistry, get_rule_registry
+from app.schema.output_schema import RiskScoreRequest, RiskScoreRecord, RiskScoreResponse, RiskEngineOutput, RuleSetInfo, CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Built once; the whole body is validated in one call into plain dicts
+_batch_request_adapter = TypeAdapter(List[RiskScoreRecord])
+
 @router.post("/risk-score", response_model=RiskScoreResponse)
-async def get_risk_score(request: RiskScoreRequest, risk_engine: RiskEngine = Depends()):
+async def get_risk_score(request: RiskScoreRequest, risk_engine: RiskEngine = Depends(get_risk_engine)):
     try:
         risk_engine_output = await risk_engine.compute_risk_score(
             cashflow_metrics=request.cashflow_metrics,
@@ -21,3 +31,50 @@ async def get_risk_score(request: RiskScoreRequest, risk_engine: RiskEngine = De
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_batch_body(body: bytes, content_type: str) -> List[RiskScoreRecord]:
+    """Parses a JSON array, or NDJSON with one RiskScoreRequest per line (blank lines are ignored)."""
+    if content_type.split(";")[0].strip().lower() in NDJSON_MEDIA_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        body = b"[" + b",".join(lines) + b"]"
+    return _batch_request_adapter.validate_json(body)
+
+@router.post("/risk-score-batch", response_model=List[RiskEngineOutput])
+async def get_risk_score_batch(request: Request, risk_engine: RiskEngine = Depends(get_risk_engine)):
+    """
+    Scores many metric sets in one call. Send a JSON array of RiskScoreRequest objects, or NDJSON
+    (Content-Type: application/x-ndjson). Results are returned as a JSON array in input order.
+    """
+    try:
+        requests = parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except ValidationError as e:
+        # The first location element is the record's position in the batch (its non-blank line for NDJSON)
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False, include_input=False))
+
+    try:
+        batch = await risk_engine.compute_risk_scores(requests)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    # Serialized straight from the columnar results instead of through FastAPI's per-object encoder
+    return Response(content=to_json(batch.to_records()), media_type="application/json")
+
+def _rule_set_info(registry: RuleRegistry) -> RuleSetInfo:
+    rule_set = registry.current()
+    return RuleSetInfo(
+        version=rule_set.version,
+        rule_count=len(rule_set.compiled_rules),
+        rules_path=str(registry.rules_path),
+        loaded_at=datetime.fromtimestamp(rule_set.loaded_at)
+    )
+
+@router.get("/rules", response_model=RuleSetInfo)
+async def get_rules(registry: RuleRegistry = Depends(get_rule_registry)):
+    return _rule_set_info(registry)
+
+@router.post("/rules/reload", response_model=RuleSetInfo)
+async def reload_rules(registry: RuleRegistry = Depends(get_rule_registry)):
+    """Re-reads the rules file now; an invalid file is rejected and the current version stays live."""
+    try:
+        registry.reload()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Rules not reloaded: {e}")
+    return _rule_set_info(registry)
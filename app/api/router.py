@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from app.api import document_routes, risk_routes, health_routes
+from app.api import document_routes, risk_routes, health_routes, account_routes
 
 api_router = APIRouter()
 
 api_router.include_router(health_routes.router, prefix="/health", tags=["health"])
 api_router.include_router(document_routes.router, prefix="/document", tags=["document"])
 api_router.include_router(risk_routes.router, prefix="/risk", tags=["risk"])
+api_router.include_router(account_routes.router, prefix="/accounts", tags=["accounts"])
 
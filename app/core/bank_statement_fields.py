@@ -31,9 +31,25 @@ CANONICAL_BANK_STATEMENT_FIELDS = {
         "saldo", "saldo contable", "saldo disponible", "saldo actual", "bilanz",
         "kontostand", "restbetrag", "balans", "eindsaldo", "solde", "solde disponible",
         "saldo finale", "disponibile", "saldo atual", "montant disponible", "total"
+    ],
+    "amount": [
+        "amount", "transaction amount", "txn amount", "net amount", "importe", "monto",
+        "betrag", "bedrag", "montant", "importo", "valor", "valor da transação"
+    ],
+    "type": [
+        "type", "transaction type", "txn type", "dr cr", "cr dr", "drcr", "crdr",
+        "tipo", "typ", "tipo de transaccion", "buchungsart", "sens"
     ]
 }
 
+# Values found in a "type" column, mapped to the canonical transaction type
+TRANSACTION_TYPE_ALIASES = {
+    "credit": "credit", "cr": "credit", "c": "credit", "deposit": "credit", "crédito": "credit",
+    "credito": "credit", "haben": "credit", "crédit": "credit", "+": "credit",
+    "debit": "debit", "dr": "debit", "d": "debit", "withdrawal": "debit", "débito": "debit",
+    "debito": "debit", "soll": "debit", "débit": "debit", "-": "debit"
+}
+
 CANONICAL_DOCUMENT_TYPES = {
     "bank_statement": [
         "bank statement", "account statement", "statement of account", "transaction history",
@@ -3,6 +3,48 @@ import os
 class Settings:
     PROJECT_NAME: str = "Document Intelligence Backend"
     PROJECT_VERSION: str = "0.1.0"
+    # Directory where per-account metric aggregates are persisted as JSON; in-memory only when unset
+    ACCOUNT_STATE_DIR: str | None = os.getenv("ACCOUNT_STATE_DIR")
 
-settings = Settings()
+    # Risk rules: defaults to app/rules/rules.yaml; the file's mtime is checked at most every
+    # RULES_RELOAD_CHECK_SECONDS for hot reloads (0 disables watching; use the reload endpoint instead)
+    RULES_PATH: str | None = os.getenv("RULES_PATH")
+    RULES_RELOAD_CHECK_SECONDS: float = float(os.getenv("RULES_RELOAD_CHECK_SECONDS", "5"))
+
+    # Executor for blocking work: thread workers for GIL-releasing work, process workers for pure-Python
+    # parsing (0 runs those in the thread pool too); at most EXECUTOR_MAX_PENDING tasks queued or running
+    EXECUTOR_THREAD_WORKERS: int = int(os.getenv("EXECUTOR_THREAD_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+    EXECUTOR_PROCESS_WORKERS: int = int(os.getenv("EXECUTOR_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+    EXECUTOR_PROCESS_START_METHOD: str = os.getenv("EXECUTOR_PROCESS_START_METHOD", "spawn")
+    EXECUTOR_MAX_PENDING: int = int(os.getenv("EXECUTOR_MAX_PENDING", "64"))
+    EXECUTOR_TASK_TIMEOUT_SECONDS: float = float(os.getenv("EXECUTOR_TASK_TIMEOUT_SECONDS", "120"))
+
+    # PDF extraction: page ranges of PDF_PAGES_PER_TASK pages go to worker processes; caps of 0 mean no limit
+    PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "0"))
+    PDF_MAX_TEXT_BYTES: int = int(os.getenv("PDF_MAX_TEXT_BYTES", "0"))
+
+    # Excel ingestion: the first EXCEL_SNIFF_ROWS rows of each sheet are sniffed for the header, then the
+    # needed columns are streamed EXCEL_CHUNK_ROWS rows at a time
+    EXCEL_SNIFF_ROWS: int = int(os.getenv("EXCEL_SNIFF_ROWS", "20"))
+    EXCEL_CHUNK_ROWS: int = int(os.getenv("EXCEL_CHUNK_ROWS", "10000"))
 
+    # Out-of-core processing: uploads estimated to need more than MAX_MEMORY_MB once parsed are folded into the
+    # metrics OUT_OF_CORE_CHUNK_ROWS rows at a time instead of being held whole (0 disables chunking)
+    MAX_MEMORY_MB: float = float(os.getenv("MAX_MEMORY_MB", "1024"))
+    OUT_OF_CORE_CHUNK_ROWS: int = int(os.getenv("OUT_OF_CORE_CHUNK_ROWS", "250000"))
+
+    # Text classification scans the first CLASSIFIER_SCAN_KB of a document, and more only when that is inconclusive
+    CLASSIFIER_SCAN_KB: int = int(os.getenv("CLASSIFIER_SCAN_KB", "64"))
+
+    # Forecasting: model is one of rolling_mean, ewma, holt; horizons are in days
+    FORECAST_MODEL: str = os.getenv("FORECAST_MODEL", "holt")
+    FORECAST_HORIZON_DAYS: int = int(os.getenv("FORECAST_HORIZON_DAYS", "7"))
+    FORECAST_LONG_TERM_DAYS: int = int(os.getenv("FORECAST_LONG_TERM_DAYS", "90"))
+    # Monte Carlo liquidity stress test
+    STRESS_TEST_PATHS: int = int(os.getenv("STRESS_TEST_PATHS", "10000"))
+    STRESS_TEST_HORIZON_DAYS: int = int(os.getenv("STRESS_TEST_HORIZON_DAYS", "90"))
+    STRESS_TEST_SEED: int = int(os.getenv("STRESS_TEST_SEED", "42"))
+    STRESS_TEST_MAX_PROBABILITY_NEGATIVE: float = float(os.getenv("STRESS_TEST_MAX_PROBABILITY_NEGATIVE", "0.05"))
+
+settings = Settings()
@@ -0,0 +1,119 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when the executor already holds its maximum number of pending tasks."""
+
+
+class ExecutorTimeoutError(TimeoutError):
+    """Raised when a task does not finish within its timeout."""
+
+
+class TaskExecutor:
+    """
+    Runs blocking work off the event loop.
+    `run_in_thread` is for work that releases the GIL (NumPy, pandas C paths, Pillow, rapidfuzz);
+    `run_in_process` is for pure-Python parsing (e.g. pypdf) and needs a picklable, module-level
+    function. At most `max_pending` tasks may be queued or running at once; further submissions
+    fail fast with ExecutorBusyError so callers can shed load instead of queueing without bound.
+    """
+
+    def __init__(self,
+                 thread_workers: Optional[int] = None,
+                 process_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.thread_workers = thread_workers or settings.EXECUTOR_THREAD_WORKERS
+        self.process_workers = process_workers if process_workers is not None else settings.EXECUTOR_PROCESS_WORKERS
+        self.max_pending = max_pending or settings.EXECUTOR_MAX_PENDING
+        self.timeout = timeout if timeout is not None else settings.EXECUTOR_TASK_TIMEOUT_SECONDS
+        self._pending = BoundedSemaphore(self.max_pending)
+        self._pools_lock = Lock()
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._pools_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="task-executor")
+            return self._thread_pool
+
+    def _get_process_pool(self) -> Executor:
+        # With no process workers configured, process tasks share the thread pool
+        if self.process_workers <= 0:
+            return self._get_thread_pool()
+        with self._pools_lock:
+            if self._process_pool is None:
+                # Spawned rather than forked: the server process has threads running
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context(settings.EXECUTOR_PROCESS_START_METHOD)
+                )
+            return self._process_pool
+
+    async def _submit(self, pool: Executor, fn: Callable[..., Any], args: tuple, kwargs: dict, timeout: Optional[float]) -> Any:
+        if not self._pending.acquire(blocking=False):
+            raise ExecutorBusyError(f"Executor has {self.max_pending} tasks pending; try again later")
+        try:
+            future: Future = pool.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._pending.release()
+            raise
+        # The slot is freed when the work actually finishes, not when the caller stops waiting
+        future.add_done_callback(lambda _: self._pending.release())
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout if timeout > 0 else None)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool so later tasks can run
+            self._discard_process_pool(pool)
+            raise
+        except asyncio.TimeoutError:
+            # Only stops tasks that have not started; a running task finishes in the background
+            future.cancel()
+            raise ExecutorTimeoutError(f"{getattr(fn, '__name__', 'task')} did not finish within {timeout:g}s")
+
+    async def start_process_workers(self) -> None:
+        """Spawns the worker processes ahead of time, so the first real task doesn't wait for interpreter start-up."""
+        if self.process_workers > 0:
+            await asyncio.gather(*(self.run_in_process(os.getpid) for _ in range(self.process_workers)))
+
+    def _discard_process_pool(self, pool: Executor) -> None:
+        with self._pools_lock:
+            if self._process_pool is pool:
+                self._process_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run_in_thread(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._submit(self._get_thread_pool(), fn, args, kwargs, timeout)
+
+    async def run_in_process(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._submit(self._get_process_pool(), fn, args, kwargs, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._pools_lock:
+            for pool in (self._thread_pool, self._process_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait, cancel_futures=True)
+            self._thread_pool = None
+            self._process_pool = None
+
+
+_task_executor: Optional[TaskExecutor] = None
+
+
+def get_executor() -> TaskExecutor:
+    """Process-wide executor shared by the services."""
+    global _task_executor
+    if _task_executor is None:
+        _task_executor = TaskExecutor()
+    return _task_executor
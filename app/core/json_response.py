@@ -0,0 +1,49 @@
+import base64
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import ORJSONResponse
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    # Only called for types orjson doesn't handle itself; conversions match FastAPI's jsonable_encoder
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    # decimal128 columns of Parquet/Arrow exports
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, bytes):
+        # Binary columns: text when it is UTF-8, base64 otherwise
+        try:
+            return obj.decode("utf-8")
+        except UnicodeDecodeError:
+            return base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    The app's default response class. orjson writes NaN and infinity as null and serializes NumPy
+    scalars and arrays, date dict keys and pandas timestamps natively, so results need no per-value
+    cleanup before they are returned.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -7,6 +7,8 @@ class HealthCheckResponse(BaseModel):
 
 class DocumentInput(BaseModel):
     document_id: str
+    # Tables may be sent as "excel_data" (row dicts), "columns" ({name: [values]}) or
+    # "arrow_ipc" (base64 Arrow IPC); text as "text_content"
     content: Dict[str, Any]
     metadata: Dict[str, Any] = {}
 
@@ -0,0 +1,91 @@
+from typing import Callable, Dict, Any, Iterator, Optional
+import pandas as pd
+from app.schema.transaction_frame import TransactionFrame
+from app.schema.period_rollup import PeriodRollup
+
+
+# Payload keys that hold the table itself; summarized by the parsed frame's shape
+_TABLE_PAYLOAD_KEYS = ("arrow_ipc", "columns", "excel_data")
+# Longer strings (document text, base64 images) are summarized by their length
+_MAX_SUMMARY_STRING_LENGTH = 256
+
+
+class InvalidPayloadError(ValueError):
+    """Raised when a columnar or Arrow payload can't be turned into a table."""
+
+
+class PipelineContext:
+    """
+    Per-request state shared by the document pipeline.
+    The file handler fills in the parsed frame, the classifier the header mapping,
+    and the standardizer the typed columns and their array-backed TransactionFrame,
+    so later stages reuse them instead of rebuilding DataFrames from row dicts. Tabular request
+    payloads are decoded into `frame` by the service layer (TablePayloadService) before the context is built.
+    Tables too large to hold whole come with a `chunk_source` that reads them again chunk by chunk
+    on every call; `frame` is then only the first chunk, enough to classify the document.
+    """
+
+    def __init__(self,
+                 document_id: str,
+                 content: Optional[Dict[str, Any]] = None,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 frame: Optional[pd.DataFrame] = None,
+                 chunk_source: Optional[Callable[[], Iterator[pd.DataFrame]]] = None):
+        self.document_id = document_id
+        self.metadata = metadata or {}
+        self._content = content
+        self.frame = frame
+        self.chunk_source = chunk_source
+        self.document_type: Optional[str] = None
+        self.header_mapping: Optional[Dict[str, str]] = None
+        self.bank_statement_frame: Optional[pd.DataFrame] = None
+        self.transactions: Optional[TransactionFrame] = None
+        # Period buckets shared by the metrics and the forecast
+        self.daily_rollup: Optional[PeriodRollup] = None
+        self.monthly_rollup: Optional[PeriodRollup] = None
+
+
+    @property
+    def content(self) -> Dict[str, Any]:
+        """Raw content as the API sees it; row dicts are only built here when a frame was parsed directly."""
+        if self._content is None:
+            records = []
+            if self.frame is not None:
+                # Missing cells stay NaN/NaT; the response class writes them as null
+                records = self.frame.to_dict(orient='records')
+            self._content = {"excel_data": records}
+        return self._content
+
+    def content_summary(self) -> Dict[str, Any]:
+        """
+        A summary of the input for the response instead of echoing it back: the parsed table's row count
+        and columns, the length of long strings and the size of lists and dicts. Never builds row dicts.
+        """
+        summary: Dict[str, Any] = {}
+        for key, value in (self._content or {}).items():
+            if self.frame is not None and key in _TABLE_PAYLOAD_KEYS:
+                continue
+            if isinstance(value, str) and len(value) > _MAX_SUMMARY_STRING_LENGTH:
+                summary[f"{key}_length"] = len(value)
+            elif isinstance(value, (list, dict)):
+                summary[f"{key}_count"] = len(value)
+            else:
+                summary[key] = value
+        if self.frame is not None:
+            # With a chunk source the frame is only the first chunk, so its length is not the row count
+            if self.chunk_source is None:
+                summary["row_count"] = len(self.frame)
+            summary["columns"] = [str(column) for column in self.frame.columns]
+        return summary
+
+    @property
+    def text_content(self) -> Optional[str]:
+        if self._content is not None and isinstance(self._content.get("text_content"), str):
+            return self._content["text_content"]
+        return None
+
+    @property
+    def error(self) -> Optional[str]:
+        if self._content is not None:
+            return self._content.get("error")
+        return None
@@ -0,0 +1,52 @@
+from typing import FrozenSet, Optional
+from app.schema.output_schema import UnifiedDocumentResponse
+
+RESPONSE_FIELDS: FrozenSet[str] = frozenset(UnifiedDocumentResponse.model_fields)
+# Sections that can be switched from their default form to the full one
+INCLUDABLE = frozenset({"extracted_data"})
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when the fields/include query parameters name something the response doesn't have."""
+
+
+class ResponseFields:
+    """
+    Which top-level sections of a UnifiedDocumentResponse the caller asked for (`fields`, all by default)
+    and which of them come in full (`include`): extracted_data is a summary of the input unless included.
+    Sections that aren't wanted are neither computed by the pipeline nor serialized.
+    """
+
+    __slots__ = ("names", "include")
+
+    def __init__(self, names: Optional[FrozenSet[str]] = None, include: FrozenSet[str] = frozenset()):
+        self.names = names
+        self.include = include
+
+    @staticmethod
+    def _split(value: Optional[str], allowed: FrozenSet[str], parameter: str) -> Optional[FrozenSet[str]]:
+        if value is None:
+            return None
+        names = frozenset(name.strip() for name in value.split(",") if name.strip())
+        unknown = names - allowed
+        if unknown:
+            raise InvalidFieldsError(f"Unknown {parameter}: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}")
+        return names
+
+    @classmethod
+    def parse(cls, fields: Optional[str] = None, include: Optional[str] = None) -> "ResponseFields":
+        names = cls._split(fields, RESPONSE_FIELDS, "fields")
+        included = cls._split(include, INCLUDABLE, "include") or frozenset()
+        if names is not None:
+            # document_type is always returned; included sections count as requested
+            names = names | included | {"document_type"}
+        return cls(names, included)
+
+    def wants(self, name: str) -> bool:
+        return self.names is None or name in self.names
+
+    def wants_any(self, *names: str) -> bool:
+        return any(self.wants(name) for name in names)
+
+    def includes(self, name: str) -> bool:
+        return name in self.include
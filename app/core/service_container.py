@@ -0,0 +1,81 @@
+import time
+from typing import Optional
+import numpy as np
+import pandas as pd
+from app.core.executor import TaskExecutor, get_executor
+from app.core.logger import get_logger
+from app.core.pipeline_context import PipelineContext
+from app.services.account_state_service import AccountStateService, get_account_state_service
+from app.services.file_format_handler_service import FileFormatHandlerService
+from app.services.ingestion_service import IngestionService
+from app.services.risk_engine import RiskEngine, get_risk_engine
+
+logger = get_logger(__name__)
+
+
+def synthetic_bank_statement(days: int = 90, seed: int = 0) -> pd.DataFrame:
+    """A small, realistic-looking statement with raw headers, used to exercise the full pipeline at startup."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2023-01-01", periods=days, freq="D")
+    amounts = np.where(rng.random(days) < 0.1, rng.uniform(1000.0, 3000.0, days), -rng.gamma(2.0, 40.0, days)).round(2)
+    return pd.DataFrame({
+        "Transaction Date": dates.strftime("%Y-%m-%d"),
+        "Narration": np.where(amounts > 0, "Salary", "Card payment"),
+        "Amount": np.abs(amounts),
+        "Dr/Cr": np.where(amounts > 0, "CR", "DR"),
+        "Running Balance": (5000.0 + np.cumsum(amounts)).round(2),
+    })
+
+
+class ServiceContainer:
+    """
+    The services shared by every request, built once per process.
+    `warm_up` pushes a synthetic statement through the whole pipeline so imports, fuzzy-match
+    indexes and NumPy code paths are exercised before real traffic arrives; `is_ready` stays
+    False until it has finished.
+    """
+
+    def __init__(self):
+        self.executor: TaskExecutor = get_executor()
+        self.ingestion_service = IngestionService(self.executor)
+        self.file_format_handler = FileFormatHandlerService(self.executor)
+        self.risk_engine: RiskEngine = get_risk_engine()
+        self.account_state_service: AccountStateService = get_account_state_service()
+        self.is_ready = False
+        self.warm_up_error: Optional[str] = None
+
+    async def warm_up(self) -> None:
+        start = time.perf_counter()
+        try:
+            context = PipelineContext(document_id="warm-up", frame=synthetic_bank_statement())
+            response = await self.ingestion_service.process_context(context)
+            if response.document_type != "bank_statement":
+                raise RuntimeError(f"warm-up statement classified as {response.document_type!r}")
+            # Text classification path
+            self.ingestion_service.document_classifier.classify_document({"text_content": "account statement opening balance"})
+            await self.executor.start_process_workers()
+        except Exception as e:
+            self.warm_up_error = str(e)
+            logger.exception("Warm-up failed; the service will report not ready")
+            return
+        self.is_ready = True
+        logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - start) * 1000)
+
+
+_service_container: Optional[ServiceContainer] = None
+
+
+def get_service_container() -> ServiceContainer:
+    """The process-wide container; built by the app lifespan, or lazily on first use without one."""
+    global _service_container
+    if _service_container is None:
+        _service_container = ServiceContainer()
+    return _service_container
+
+
+def get_ingestion_service() -> IngestionService:
+    return get_service_container().ingestion_service
+
+
+def get_file_format_handler() -> FileFormatHandlerService:
+    return get_service_container().file_format_handler
@@ -1,22 +1,28 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.router import api_router
-from pydantic import BaseModel
-import numpy as np # Import numpy
+from app.core.json_response import FastJSONResponse
+from app.core.service_container import get_service_container
 
-# Custom JSON serializer for numpy.nan
-def convert_nan_to_none(obj):
-    if isinstance(obj, float) and np.isnan(obj):
-        return None
-    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Services are built once here; warm-up runs in the background so /health/livez answers
+    # immediately while /health/readyz reports not ready until it completes
+    container = get_service_container()
+    warm_up = asyncio.create_task(container.warm_up())
+    yield
+    if not warm_up.done():
+        warm_up.cancel()
+    container.executor.shutdown(wait=False)
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Document Intelligence Backend",
     description="Glue layer for document processing and risk assessment",
     version="0.1.0",
-    json_encoders={
-        np.float64: convert_nan_to_none, # Handle numpy float NaN
-        float: convert_nan_to_none       # Handle standard float NaN
-    }
+    # NaN/inf become null and NumPy values are serialized natively, in one pass over the response
+    default_response_class=FastJSONResponse
 )
 
 app.include_router(api_router)
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import date
+from app.schema.bank_statement_schema import Transaction
+from app.schema.output_schema import CashflowMetrics, DebtServicingMetrics
+
+class MetricsAggregateState(BaseModel):
+    """Mergeable running aggregates for one account; amounts are signed (credits positive)."""
+    transaction_count: int = 0
+    credit_count: int = 0
+    debit_count: int = 0
+    total_inflow: float = 0.0
+    total_outflow: float = 0.0
+    # Welford running count, mean and sum of squared deviations of the signed amounts
+    amount_count: int = 0
+    amount_mean: float = 0.0
+    amount_m2: float = 0.0
+    last_balance: Optional[float] = None
+    last_credit_balance: Optional[float] = None
+    last_debit_balance: Optional[float] = None
+    min_date: Optional[date] = None
+    max_date: Optional[date] = None
+    # Net cashflow per YYYY-MM month, merged by summing so monthly volatility survives incremental updates
+    monthly_net_cashflow: Dict[str, float] = Field(default_factory=dict)
+
+    @property
+    def amount_variance(self) -> Optional[float]:
+        return self.amount_m2 / (self.amount_count - 1) if self.amount_count > 1 else None
+
+class AppendTransactionsRequest(BaseModel):
+    transactions: List[Transaction] = Field(..., min_length=1)
+    total_debt: float = 0.0
+
+class AccountMetricsResponse(BaseModel):
+    account_id: str
+    transaction_count: int
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    cashflow_metrics: CashflowMetrics
+    debt_servicing_metrics: DebtServicingMetrics
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
-from datetime import date
+from typing_extensions import TypedDict
+from datetime import date, datetime
 
 class CashflowMetrics(BaseModel):
     total_inflow: Optional[float] = None
@@ -14,6 +15,7 @@ class LiquidityMetrics(BaseModel):
     quick_ratio: Optional[float] = None
     cash_conversion_cycle: Optional[float] = None
     days_cash_on_hand: Optional[float] = None
+    min_balance_by_month: Optional[Dict[str, Optional[float]]] = None
 
 class FinancialDisciplineMetrics(BaseModel):
     overdraft_frequency: Optional[int] = None # Assuming this could be None if no data
@@ -32,6 +34,13 @@ class RiskIndicators(BaseModel):
     negative_news_mentions: Optional[int] = None # Assuming this could be None
     bankruptcy_flags: Optional[bool] = None # Assuming this could be None
 
+class BankStatementMetrics(BaseModel):
+    cashflow_metrics: CashflowMetrics
+    liquidity_metrics: LiquidityMetrics
+    financial_discipline_metrics: FinancialDisciplineMetrics
+    debt_servicing_metrics: DebtServicingMetrics
+    risk_indicators: RiskIndicators
+
 class LlmSummaryOutput(BaseModel):
     summary_text: str
     key_insights: List[str]
@@ -44,7 +53,8 @@ class ForecastOutputs(BaseModel):
 
 class UnifiedDocumentResponse(BaseModel):
     document_type: str
-    extracted_data: Dict[str, Any]
+    # A summary of the input (row count and columns, text length, ...); the parsed input itself with include=extracted_data
+    extracted_data: Optional[Dict[str, Any]] = None
     cashflow_metrics: Optional[CashflowMetrics] = None
     liquidity_metrics: Optional[LiquidityMetrics] = None
     financial_discipline_metrics: Optional[FinancialDisciplineMetrics] = None
@@ -54,12 +64,16 @@ class UnifiedDocumentResponse(BaseModel):
     forecasts: Optional[ForecastOutputs] = None
     risk_score: Optional[float] = None
     risk_factors: Optional[List[str]] = None
+    # What ingestion detected about the input, e.g. {"excel": {"sheet_name": ..., "header_row": ...}}
+    metadata: Optional[Dict[str, Any]] = None
 
 class RiskEngineOutput(BaseModel):
     score: float = Field(..., ge=0, le=100)
     bin: str
     decision: str
     rationale: List[str]
+    # Version (content hash) of the rules file the score was computed with
+    rule_set_version: Optional[str] = None
 
 class RiskScoreRequest(BaseModel):
     cashflow_metrics: CashflowMetrics
@@ -68,6 +82,22 @@ class RiskScoreRequest(BaseModel):
     debt_servicing_metrics: DebtServicingMetrics
     risk_indicators: RiskIndicators
 
+def _record_type(model: type) -> type:
+    """A TypedDict mirroring a model's fields, for bulk validation into plain dicts."""
+    return TypedDict(f"{model.__name__}Record", {name: field.annotation for name, field in model.model_fields.items()}, total=False)
+
+# Same shape as RiskScoreRequest, validated into dicts; batch scoring skips building 6 model instances per request
+RiskScoreRecord = TypedDict(
+    "RiskScoreRecord",
+    {section: _record_type(field.annotation) for section, field in RiskScoreRequest.model_fields.items()}
+)
+
 class RiskScoreResponse(BaseModel):
     document_id: Optional[str] = None
     risk_engine_output: RiskEngineOutput
+
+class RuleSetInfo(BaseModel):
+    version: str
+    rule_count: int
+    rules_path: str
+    loaded_at: datetime
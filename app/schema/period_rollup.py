@@ -0,0 +1,53 @@
+import numpy as np
+
+# 1970-01-01 was a Thursday; shifting by three days makes week codes start on Mondays
+WEEK_OFFSET_DAYS = 3
+
+
+class PeriodRollup:
+    """
+    Per-period aggregates over a contiguous range of integer period codes.
+    Position i holds period `first_code + i`; periods without transactions are kept with zero flows,
+    so averages and volatility account for quiet periods.
+    """
+
+    __slots__ = ("freq", "first_code", "inflow", "outflow", "net", "count", "min_balance", "last_balance")
+
+    def __init__(self,
+                 freq: str,
+                 first_code: int,
+                 inflow: np.ndarray,
+                 outflow: np.ndarray,
+                 count: np.ndarray,
+                 min_balance: np.ndarray,
+                 last_balance: np.ndarray):
+        self.freq = freq
+        self.first_code = first_code
+        self.inflow = inflow
+        self.outflow = outflow
+        self.net = inflow - outflow
+        self.count = count
+        self.min_balance = min_balance
+        self.last_balance = last_balance
+
+    def __len__(self) -> int:
+        return len(self.net)
+
+    @property
+    def codes(self) -> np.ndarray:
+        return np.arange(self.first_code, self.first_code + len(self), dtype=np.int64)
+
+    @property
+    def period_starts(self) -> np.ndarray:
+        """First day of every period as datetime64[D]."""
+        if self.freq == "M":
+            return self.codes.astype("datetime64[M]").astype("datetime64[D]")
+        if self.freq == "W":
+            return (self.codes * 7 - WEEK_OFFSET_DAYS).astype("datetime64[D]")
+        return self.codes.astype("datetime64[D]")
+
+    def labels(self) -> list:
+        """Human readable period labels (YYYY-MM-DD, or YYYY-MM for months)."""
+        if self.freq == "M":
+            return [str(code) for code in self.codes.astype("datetime64[M]")]
+        return [str(day) for day in self.period_starts]
@@ -0,0 +1,122 @@
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import date
+import numpy as np
+import pandas as pd
+from app.schema.bank_statement_schema import BankStatementInput, Transaction
+
+TYPE_CODES = {"credit": 1, "debit": -1, "unknown": 0}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+
+class TransactionFrame:
+    """
+    Array-backed transactions used inside the pipeline.
+    Each field is a contiguous NumPy array; amounts are signed (credits positive,
+    debits negative) and types are stored as int8 codes (1 credit, -1 debit, 0 unknown).
+    Pydantic Transaction objects are only built on request, at the API boundary.
+    """
+
+    __slots__ = ("dates", "descriptions", "amounts", "type_codes", "balances")
+
+    def __init__(self,
+                 dates: np.ndarray,
+                 amounts: np.ndarray,
+                 type_codes: np.ndarray,
+                 balances: Optional[np.ndarray] = None,
+                 descriptions: Optional[np.ndarray] = None):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.type_codes = np.asarray(type_codes, dtype=np.int8)
+        self.balances = np.asarray(balances, dtype=np.float64) if balances is not None else np.full(len(self.dates), np.nan)
+        self.descriptions = np.asarray(descriptions, dtype=object) if descriptions is not None else np.full(len(self.dates), "", dtype=object)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "TransactionFrame":
+        """Builds the frame from the typed columns produced by StandardizationService."""
+        type_codes = df["type"].map(TYPE_CODES).fillna(0).to_numpy(dtype=np.int8)
+        return cls(
+            dates=df["date"].to_numpy(dtype="datetime64[D]"),
+            amounts=df["amount"].to_numpy(dtype=np.float64),
+            type_codes=type_codes,
+            balances=df["balance"].to_numpy(dtype=np.float64),
+            descriptions=df["description"].to_numpy(dtype=object)
+        )
+
+    @classmethod
+    def from_bank_statement(cls, bank_statement: BankStatementInput) -> "TransactionFrame":
+        return cls.from_transactions(bank_statement.transactions)
+
+    @classmethod
+    def from_transactions(cls, transactions: Sequence[Transaction]) -> "TransactionFrame":
+        """Converts pydantic transactions; amounts are re-signed from the type in case they were given unsigned."""
+        amounts = np.array([t.amount if t.amount is not None else np.nan for t in transactions], dtype=np.float64)
+        type_codes = np.array([TYPE_CODES.get(t.type, 0) for t in transactions], dtype=np.int8)
+        amounts = np.where(type_codes == 1, np.abs(amounts), np.where(type_codes == -1, -np.abs(amounts), amounts))
+        return cls(
+            dates=np.array([t.date for t in transactions], dtype="datetime64[D]"),
+            amounts=amounts,
+            type_codes=type_codes,
+            balances=np.array([t.balance if t.balance is not None else np.nan for t in transactions], dtype=np.float64),
+            descriptions=np.array([t.description for t in transactions], dtype=object)
+        )
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def is_credit(self) -> np.ndarray:
+        return self.type_codes == 1
+
+    @property
+    def is_debit(self) -> np.ndarray:
+        return self.type_codes == -1
+
+    @property
+    def start_date(self) -> Optional[date]:
+        return self.dates.min().astype(date) if len(self) else None
+
+    @property
+    def end_date(self) -> Optional[date]:
+        return self.dates.max().astype(date) if len(self) else None
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.amounts.nbytes + self.type_codes.nbytes + self.balances.nbytes + self.descriptions.nbytes
+
+    def to_transactions(self, indices: Optional[Sequence[int]] = None) -> List[Transaction]:
+        """Materializes the selected rows (all rows by default) as pydantic Transactions."""
+        # The arrays are already typed, so rows are constructed without re-validation
+        return [Transaction.model_construct(**record) for record in self.to_records(indices)]
+
+    def to_records(self, indices: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """Selected rows as plain dicts, built column-wise."""
+        if indices is None:
+            indices = slice(None)
+        balances = self.balances[indices]
+        amounts = self.amounts[indices]
+        columns = {
+            "date": self.dates[indices].astype(object).tolist(),
+            "description": [str(d) for d in self.descriptions[indices]],
+            "amount": np.where(np.isnan(amounts), None, amounts).tolist(),
+            "type": [TYPE_NAMES[code] for code in self.type_codes[indices].tolist()],
+            "balance": np.where(np.isnan(balances), None, balances).tolist()
+        }
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    def to_bank_statement_input(self) -> BankStatementInput:
+        return BankStatementInput(
+            account_holder_name="Default Account Holder",  # Placeholder
+            account_number="XXXX-XXXX-XXXX-1234",  # Placeholder
+            bank_name="Generic Bank",  # Placeholder
+            start_date=self.start_date or date.min,
+            end_date=self.end_date or date.max,
+            transactions=self.to_transactions(),
+            currency="USD"  # Placeholder
+        )
+
+
+def as_transaction_frame(transactions: "TransactionFrame | BankStatementInput") -> TransactionFrame:
+    """Lets services accept either the columnar frame or the pydantic statement."""
+    if isinstance(transactions, TransactionFrame):
+        return transactions
+    return TransactionFrame.from_bank_statement(transactions)
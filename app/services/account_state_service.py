@@ -0,0 +1,75 @@
+import re
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+from app.core.config import settings
+from app.schema.account_state_schema import MetricsAggregateState
+from app.services.metrics_service import MetricsService, StatementData
+
+_ACCOUNT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,128}$')
+
+
+class AccountStateService:
+    """
+    Keeps the mergeable metric aggregates of every account and folds new transactions into them,
+    so a monthly refresh costs time proportional to the new rows rather than the full history.
+    """
+
+    def __init__(self, state_dir: Optional[str] = None):
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.metrics_service = MetricsService()
+        self._states: Dict[str, MetricsAggregateState] = {}
+        self._account_locks: Dict[str, Lock] = {}
+        self._account_locks_guard = Lock()
+
+    def _lock_for(self, account_id: str) -> Lock:
+        with self._account_locks_guard:
+            return self._account_locks.setdefault(account_id, Lock())
+
+    def _state_path(self, account_id: str) -> Path:
+        return self.state_dir / f"{account_id}.json"
+
+    @staticmethod
+    def _validate_account_id(account_id: str) -> None:
+        # Account ids double as file names when states are persisted
+        if not _ACCOUNT_ID_PATTERN.match(account_id):
+            raise ValueError(f"Invalid account id: {account_id!r}")
+
+    def get_state(self, account_id: str) -> Optional[MetricsAggregateState]:
+        self._validate_account_id(account_id)
+        state = self._states.get(account_id)
+        if state is None and self.state_dir is not None and self._state_path(account_id).exists():
+            state = MetricsAggregateState.model_validate_json(self._state_path(account_id).read_text())
+            self._states[account_id] = state
+        return state
+
+    def save_state(self, account_id: str, state: MetricsAggregateState) -> None:
+        self._validate_account_id(account_id)
+        self._states[account_id] = state
+        if self.state_dir is not None:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a truncated state behind
+            temporary_path = self._state_path(account_id).with_suffix(".json.tmp")
+            temporary_path.write_text(state.model_dump_json())
+            temporary_path.replace(self._state_path(account_id))
+
+    def append_transactions(self, account_id: str, transactions: StatementData) -> MetricsAggregateState:
+        """Aggregates only the new transactions and merges them into the stored state."""
+        self._validate_account_id(account_id)
+        delta = self.metrics_service.aggregate_state(transactions)
+        with self._lock_for(account_id):
+            state = self.get_state(account_id) or MetricsAggregateState()
+            merged_state = self.metrics_service.merge_states(state, delta)
+            self.save_state(account_id, merged_state)
+        return merged_state
+
+
+_account_state_service: Optional[AccountStateService] = None
+
+
+def get_account_state_service() -> AccountStateService:
+    """Process-wide instance, so account states outlive individual requests."""
+    global _account_state_service
+    if _account_state_service is None:
+        _account_state_service = AccountStateService(settings.ACCOUNT_STATE_DIR)
+    return _account_state_service
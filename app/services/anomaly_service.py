@@ -1,21 +1,15 @@
 from typing import Dict, Any
 from app.core.models import AnomalyOutput
-import pandas as pd
 
 class AnomalyService:
 
     async def detect_anomaly(self, data: Dict[str, Any]) -> AnomalyOutput:
-        # In a real implementation, this would involve calculations that might result in NaN.
-        # We ensure to convert any potential NaN to None before returning.
-        anomaly_score_result = 0.1 # This would be a calculated value
-        if pd.notna(anomaly_score_result):
-            final_anomaly_score = float(anomaly_score_result)
-        else:
-            final_anomaly_score = None
+        # In a real implementation this would be calculated; a NaN score is serialized as null
+        anomaly_score_result = 0.1
 
         return AnomalyOutput(
             is_anomaly=False,
-            anomaly_score=final_anomaly_score,
+            anomaly_score=anomaly_score_result,
             reason="No anomaly detected (stub)"
         )
 
@@ -0,0 +1,182 @@
+import os
+import pandas as pd
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS
+from app.services.header_standardization_service import HeaderStandardizationService
+
+# File extension -> reader
+TABLE_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+_DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+
+class ArrowProcessingService:
+    """
+    CSV/TSV, Parquet and Arrow IPC (Feather v2) exports, read with pyarrow's multithreaded readers.
+    The column names are read first and mapped to the bank statement fields, so only the mappable
+    columns are decoded; the result is a columnar DataFrame that goes straight to standardization.
+    Tables that don't look like a statement keep all their columns.
+    """
+
+    @staticmethod
+    def format_of(filename: str) -> Optional[str]:
+        return TABLE_FORMATS.get(os.path.splitext(filename)[1].lower())
+
+    @staticmethod
+    def _projection(names: List[str]) -> List[str]:
+        return [names[position] for position in HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS).projection(names)]
+
+    @staticmethod
+    def _read_delimited(file_content: bytes, delimiter: str):
+        # Imported on first use; pandas loads pyarrow itself but not its readers
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        parse_options = pacsv.ParseOptions(delimiter=delimiter)
+        # Opening a streaming reader only parses the first block, which is enough for the header
+        with pacsv.open_csv(pa.BufferReader(file_content), parse_options=parse_options) as reader:
+            names = reader.schema.names
+        columns = ArrowProcessingService._projection(names)
+        table = pacsv.read_csv(
+            pa.BufferReader(file_content),
+            read_options=pacsv.ReadOptions(use_threads=True),
+            parse_options=parse_options,
+            convert_options=pacsv.ConvertOptions(include_columns=columns),
+        )
+        return table, len(names)
+
+    @staticmethod
+    def _read_parquet(file_content: bytes):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(pa.BufferReader(file_content))
+        names = parquet_file.schema_arrow.names
+        # Column chunks that are not projected are never read or decompressed
+        table = parquet_file.read(columns=ArrowProcessingService._projection(names), use_threads=True)
+        return table, len(names)
+
+    @staticmethod
+    def _read_ipc(file_content: bytes):
+        import pyarrow as pa
+
+        try:
+            names = pa.ipc.open_file(pa.BufferReader(file_content)).schema.names
+            open_reader = pa.ipc.open_file
+        except pa.ArrowInvalid:
+            # Not the random-access file format, so the streaming format
+            names = pa.ipc.open_stream(pa.BufferReader(file_content)).schema.names
+            open_reader = pa.ipc.open_stream
+        columns = ArrowProcessingService._projection(names)
+        options = pa.ipc.IpcReadOptions(included_fields=[names.index(name) for name in columns])
+        table = open_reader(pa.BufferReader(file_content), options=options).read_all()
+        return table, len(names)
+
+    @staticmethod
+    def read_frame(file_content: bytes, table_format: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """The table as a DataFrame plus what was read: format, columns decoded, column and row counts."""
+        if table_format in _DELIMITERS:
+            table, column_count = ArrowProcessingService._read_delimited(file_content, _DELIMITERS[table_format])
+        elif table_format == "parquet":
+            table, column_count = ArrowProcessingService._read_parquet(file_content)
+        elif table_format == "arrow":
+            table, column_count = ArrowProcessingService._read_ipc(file_content)
+        else:
+            raise ValueError(f"Unsupported table format: {table_format}")
+
+        metadata = {
+            "format": table_format,
+            "columns_read": table.column_names,
+            "columns_total": column_count,
+            "rows": table.num_rows,
+        }
+        # Column by column into NumPy-backed Series; no row dicts are built
+        return table.to_pandas(split_blocks=True), metadata
+
+    @staticmethod
+    def _delimited_batches(file_content: bytes, delimiter: str, chunk_rows: int):
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        parse_options = pacsv.ParseOptions(delimiter=delimiter)
+        with pacsv.open_csv(pa.BufferReader(file_content), parse_options=parse_options) as reader:
+            schema = reader.schema
+        columns = ArrowProcessingService._projection(schema.names)
+        # Types are inferred from the first block only, so later blocks must not be able to contradict them:
+        # integer columns are read as floats and columns that start out empty as strings
+        column_types = {}
+        for name in columns:
+            field_type = schema.field(name).type
+            if pa.types.is_integer(field_type):
+                column_types[name] = pa.float64()
+            elif pa.types.is_null(field_type):
+                column_types[name] = pa.string()
+        # Roughly 100 bytes per statement row; a block holds a fraction of a chunk
+        read_options = pacsv.ReadOptions(block_size=max(1 << 20, min(chunk_rows * 100, 64 << 20)))
+        convert_options = pacsv.ConvertOptions(include_columns=columns, column_types=column_types)
+        return pacsv.open_csv(pa.BufferReader(file_content), read_options=read_options,
+                              parse_options=parse_options, convert_options=convert_options)
+
+    @staticmethod
+    def _parquet_batches(file_content: bytes, chunk_rows: int):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(pa.BufferReader(file_content))
+        columns = ArrowProcessingService._projection(parquet_file.schema_arrow.names)
+        return parquet_file.iter_batches(batch_size=chunk_rows, columns=columns)
+
+    @staticmethod
+    def _ipc_batches(file_content: bytes):
+        import pyarrow as pa
+
+        try:
+            reader = pa.ipc.open_file(pa.BufferReader(file_content))
+            names = reader.schema.names
+            open_reader = pa.ipc.open_file
+        except pa.ArrowInvalid:
+            names = pa.ipc.open_stream(pa.BufferReader(file_content)).schema.names
+            open_reader = pa.ipc.open_stream
+        columns = ArrowProcessingService._projection(names)
+        options = pa.ipc.IpcReadOptions(included_fields=[names.index(name) for name in columns])
+        reader = open_reader(pa.BufferReader(file_content), options=options)
+        if open_reader is pa.ipc.open_stream:
+            return iter(reader)
+        return (reader.get_batch(index) for index in range(reader.num_record_batches))
+
+    @staticmethod
+    def iter_frames(file_content: bytes, table_format: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        The projected table as DataFrames of about `chunk_rows` rows, decoded one chunk at a time.
+        Only the current chunk's rows are held besides the raw file; columns keep one dtype across chunks.
+        """
+        import pyarrow as pa
+
+        if table_format in _DELIMITERS:
+            batches = ArrowProcessingService._delimited_batches(file_content, _DELIMITERS[table_format], chunk_rows)
+        elif table_format == "parquet":
+            batches = ArrowProcessingService._parquet_batches(file_content, chunk_rows)
+        elif table_format == "arrow":
+            batches = ArrowProcessingService._ipc_batches(file_content)
+        else:
+            raise ValueError(f"Unsupported table format: {table_format}")
+
+        # Readers yield batches of their own size; they are regrouped (or sliced) into chunks of chunk_rows
+        pending, pending_rows = [], 0
+        for batch in batches:
+            offset = 0
+            while offset < batch.num_rows:
+                piece = batch.slice(offset, chunk_rows - pending_rows)
+                pending.append(piece)
+                pending_rows += piece.num_rows
+                offset += piece.num_rows
+                if pending_rows == chunk_rows:
+                    yield pa.Table.from_batches(pending).to_pandas(split_blocks=True)
+                    pending, pending_rows = [], 0
+        if pending:
+            yield pa.Table.from_batches(pending).to_pandas(split_blocks=True)
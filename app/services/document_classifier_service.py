@@ -1,29 +1,94 @@
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
 import pandas as pd
+from app.core.config import settings
+from app.core.pipeline_context import PipelineContext
 from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS, CANONICAL_DOCUMENT_TYPES
 from app.services.header_standardization_service import HeaderStandardizationService
-from rapidfuzz import fuzz
+from app.services.table_payload_service import TablePayloadService
+
+# Same clean-up as HeaderStandardizationService._normalize_header, applied to a whole block of text
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+
+class KeywordIndex:
+    """
+    Prebuilt matcher for the document-type synonyms.
+    All synonyms are normalized once and compiled into a single alternation, so a block of text is
+    scanned once for every phrase; its token set answers whether a synonym's words all appear apart.
+    Scores are on the 0-100 scale of the fuzzy matcher this replaces: 100 for the phrase itself,
+    SCATTERED_SCORE when all its words appear but not together, and below the threshold otherwise.
+    """
+
+    SCATTERED_SCORE = 80
+
+    def __init__(self, canonical_types: Dict[str, List[str]]):
+        self.canonical_types = list(canonical_types)
+        self.phrase_types: Dict[str, str] = {}
+        self.synonym_tokens: List[Tuple[str, Tuple[str, ...]]] = []
+        for doc_type, synonyms in canonical_types.items():
+            for synonym in synonyms:
+                phrase = HeaderStandardizationService._normalize_header(synonym)
+                self.phrase_types.setdefault(phrase, doc_type)
+                self.synonym_tokens.append((doc_type, tuple(phrase.split())))
+        # Longest phrases first so "statement of account" wins over a shorter overlapping synonym;
+        # words may be separated by any run of whitespace, line breaks included
+        alternatives = "|".join(
+            r"\s+".join(re.escape(token) for token in phrase.split())
+            for phrase in sorted(self.phrase_types, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return _PUNCTUATION_PATTERN.sub("", text.lower())
+
+    def scan(self, normalized_text: str, phrase_hits: Set[str], tokens: Set[str]) -> None:
+        """Adds the phrases and tokens found in one block of normalized text to the running sets."""
+        phrase_hits.update(" ".join(match.split()) for match in self.pattern.findall(normalized_text))
+        tokens.update(normalized_text.split())
+
+    def scores(self, phrase_hits: Set[str], tokens: Set[str]) -> Dict[str, float]:
+        """Per-type scores for everything scanned so far."""
+        scores = dict.fromkeys(self.canonical_types, 0.0)
+        for doc_type, synonym_tokens in self.synonym_tokens:
+            present = sum(token in tokens for token in synonym_tokens)
+            # Partial matches stay below the matching threshold
+            score = self.SCATTERED_SCORE if present == len(synonym_tokens) else 70.0 * present / len(synonym_tokens)
+            scores[doc_type] = max(scores[doc_type], score)
+        for phrase in phrase_hits:
+            scores[self.phrase_types[phrase]] = 100.0
+        return scores
+
 
 class DocumentClassifierService:
-    def __init__(self):
+    def __init__(self, scan_kb: Optional[int] = None):
         self.header_standardization_service = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS)
         self.document_type_classifier = HeaderStandardizationService(CANONICAL_DOCUMENT_TYPES, threshold=75)
+        self.keyword_index = KeywordIndex(CANONICAL_DOCUMENT_TYPES)
+        self.scan_chars = (scan_kb or settings.CLASSIFIER_SCAN_KB) * 1024
 
     def classify_document(self, document_content: Dict[str, Any]) -> str:
-        # Assuming document_content can contain 'text_content' or 'excel_data'
+        return self.classify_context(TablePayloadService.build_context("", document_content))
+
+    def classify_context(self, context: PipelineContext) -> str:
+        """Classifies the document and records the header mapping on the context for the standardizer."""
         # Prioritize structured data if available
-        if "excel_data" in document_content and isinstance(document_content["excel_data"], list):
-            df = pd.DataFrame(document_content["excel_data"])
-            return self._classify_from_dataframe(df)
-        elif "text_content" in document_content and isinstance(document_content["text_content"], str):
-            return self._classify_from_text(document_content["text_content"])
-        # Add other content types as needed (e.g., PDF text, image OCR text)
-        return "unknown"
+        if context.frame is not None:
+            context.document_type = self._classify_from_dataframe(context.frame, context)
+        elif context.text_content is not None:
+            context.document_type = self._classify_from_text(context.text_content)
+        else:
+            # Add other content types as needed (e.g., PDF text, image OCR text)
+            context.document_type = "unknown"
+        return context.document_type
 
-    def _classify_from_dataframe(self, df: pd.DataFrame) -> str:
+    def _classify_from_dataframe(self, df: pd.DataFrame, context: Optional[PipelineContext] = None) -> str:
         """Classify document type based on DataFrame headers and structure."""
         raw_headers = df.columns.tolist()
         matched_canonical_fields = self.header_standardization_service.map_headers_to_canonical(raw_headers)
+        if context is not None:
+            context.header_mapping = matched_canonical_fields
 
         # Heuristic 1: Check for a significant number of canonical bank statement fields
         bank_statement_field_count = len([f for f in matched_canonical_fields.values() if f in CANONICAL_BANK_STATEMENT_FIELDS.keys()])
@@ -34,16 +99,12 @@ class DocumentClassifierService:
 
         # Heuristic 2: Fuzzy match document type keywords in headers or first few rows
         # This part could be expanded to look into cell content as well.
+        # All headers are matched against the document type synonyms in one batch
+        matched_document_types = set(self.document_type_classifier.map_headers_to_canonical(raw_headers).values())
         document_type_scores = {}
-        for doc_type, synonyms in CANONICAL_DOCUMENT_TYPES.items():
-            highest_score = 0
-            for header in raw_headers:
-                normalized_header = self.document_type_classifier._normalize_header(header)
-                match = self.document_type_classifier.fuzzy_match_header(normalized_header) # Use the document type classifier
-                if match == doc_type: # Direct match from a header to a document type synonym
-                    highest_score = 100 # Strong match
-                    break
-            document_type_scores[doc_type] = highest_score
+        for doc_type in CANONICAL_DOCUMENT_TYPES.keys():
+            # Direct match from a header to a document type synonym is a strong match
+            document_type_scores[doc_type] = 100 if doc_type in matched_document_types else 0
         
         # Determine the best document type based on scores
         if document_type_scores:
@@ -53,24 +114,29 @@ class DocumentClassifierService:
 
         return "unknown"
 
+    def score_text(self, text_content: str, threshold: float = 75) -> Dict[str, float]:
+        """
+        Per-type scores for a text. Only the first `scan_chars` characters are scanned unless no type
+        reaches the threshold there; then the window grows fourfold each round up to the whole text.
+        """
+        phrase_hits: Set[str] = set()
+        tokens: Set[str] = set()
+        start, window = 0, self.scan_chars
+        while True:
+            stop = min(start + window, len(text_content))
+            if stop < len(text_content):
+                # Cut at whitespace so no word is split between two blocks
+                stop = max(text_content.rfind(" ", start, stop), text_content.rfind("\n", start, stop), start + 1)
+            self.keyword_index.scan(self.keyword_index.normalize(text_content[start:stop]), phrase_hits, tokens)
+            scores = self.keyword_index.scores(phrase_hits, tokens)
+            if stop >= len(text_content) or max(scores.values()) >= threshold:
+                return scores
+            # A phrase may straddle the cut, so the next block re-reads the tail of this one
+            start, window = max(stop - 64, start + 1), window * 4
+
     def _classify_from_text(self, text_content: str) -> str:
         """Classify document type based on raw text content."""
-        # This can be similar to the old string-based heuristics, but improved with fuzzy matching
-        # and potentially more advanced NLP techniques if available.
-        normalized_text = self.document_type_classifier._normalize_header(text_content) # Reuse normalization
-        
-        document_type_scores = {}
-        for doc_type, synonyms in CANONICAL_DOCUMENT_TYPES.items():
-            best_match_score = 0
-            # Check for presence of normalized synonyms in the text
-            for syn in synonyms:
-                normalized_syn = self.document_type_classifier._normalize_header(syn)
-                # Using token_set_ratio for substring matching within the document content
-                score = fuzz.token_set_ratio(normalized_syn, normalized_text)
-                if score > best_match_score:
-                    best_match_score = score
-            document_type_scores[doc_type] = best_match_score
-        
+        document_type_scores = self.score_text(text_content)
         if document_type_scores:
             best_doc_type = max(document_type_scores, key=document_type_scores.get)
             if document_type_scores[best_doc_type] >= 75: # Threshold for text content matching
@@ -82,7 +148,7 @@ class DocumentClassifierService:
         """Checks for row structure indicative of bank statement transactions."""
         # Look for a mix of numerical and date-like columns, typical of transactions
         has_date = any(field == 'date' for field in matched_canonical_fields.values())
-        has_amount = any(field in ['debit', 'credit'] for field in matched_canonical_fields.values())
+        has_amount = any(field in ['debit', 'credit', 'amount'] for field in matched_canonical_fields.values())
         has_balance = any(field == 'balance' for field in matched_canonical_fields.values())
         has_description = any(field == 'description' for field in matched_canonical_fields.values())
 
@@ -91,7 +157,7 @@ class DocumentClassifierService:
         
         # Further check: at least a few rows should have valid-looking data in these columns
         # For simplicity, let's just check for non-nulls in assumed key columns
-        key_columns = [k for k, v in matched_canonical_fields.items() if v in ['date', 'description', 'debit', 'credit', 'balance']]
+        key_columns = [k for k, v in matched_canonical_fields.items() if v in ['date', 'description', 'debit', 'credit', 'amount', 'balance']]
         if not key_columns:
             return False
         
@@ -1,11 +1,212 @@
 import pandas as pd
-from typing import Dict, Any, Union
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
 from io import BytesIO
+from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS
+from app.core.config import settings
+from app.services.header_standardization_service import HeaderStandardizationService
+
+# .xlsx/.xlsm workbooks are zip archives; anything else (legacy .xls) goes through pd.read_excel
+_ZIP_MAGIC = b"PK\x03\x04"
+# Longer cells are titles or notes, not column headers, and are left out of header matching
+_MAX_HEADER_CELL_LENGTH = 64
+# Same bar as the classifier's bank statement heuristic
+_MIN_HEADER_FIELDS = 3
+
+
+def _open_workbook(file_content: bytes):
+    # Imported on first use, like pypdf and Pillow; read-only mode streams rows instead of building every cell
+    import openpyxl
+    return openpyxl.load_workbook(BytesIO(file_content), read_only=True, data_only=True, keep_links=False)
+
+
+class SheetSample:
+    """The first rows of one worksheet, read without loading the rest of it."""
+
+    __slots__ = ("name", "rows")
+
+    def __init__(self, name: str, rows: List[Tuple[Any, ...]]):
+        self.name = name
+        self.rows = rows
+
+
+class HeaderLocation:
+    """Where a sheet's table starts: the sheet, the 0-based header row and the statement fields it maps to."""
+
+    __slots__ = ("sheet_name", "header_row", "fields")
+
+    def __init__(self, sheet_name: str, header_row: int, fields: Set[str]):
+        self.sheet_name = sheet_name
+        self.header_row = header_row
+        self.fields = fields
+
+    def to_metadata(self, sheets_scanned: int) -> Dict[str, Any]:
+        return {
+            "sheet_name": self.sheet_name,
+            "header_row": self.header_row,
+            "matched_fields": sorted(self.fields),
+            "sheets_scanned": sheets_scanned,
+        }
+
 
 class ExcelProcessingService:
+    """
+    Workbooks are read in two phases over a single read-only open. The first rows of every sheet are
+    sniffed and `detect_header` picks the sheet and row holding the statement header; `stream_sheet`
+    then converts only the needed columns of that sheet, a chunk of rows at a time, so unused columns
+    and sheets never become Python objects or DataFrame columns. `extract_table` runs the whole read
+    as one executor task.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+
+    @staticmethod
+    def sniff_sheet(worksheet, sniff_rows: Optional[int] = None) -> SheetSample:
+        sniff_rows = sniff_rows or settings.EXCEL_SNIFF_ROWS
+        return SheetSample(worksheet.title, list(worksheet.iter_rows(max_row=sniff_rows, values_only=True)))
+
+    @staticmethod
+    def sniff_workbook(workbook, sniff_rows: Optional[int] = None) -> List[SheetSample]:
+        return [ExcelProcessingService.sniff_sheet(worksheet, sniff_rows) for worksheet in workbook.worksheets]
+
+    @staticmethod
+    def detect_header(samples: List[SheetSample]) -> Optional[HeaderLocation]:
+        """
+        Scores every sniffed row of every sheet by how many distinct statement fields its cells map to,
+        matching all the cells in one batched fuzzy-match call. The best row wins, with earlier sheets
+        and rows breaking ties. When no row maps to enough fields, the first non-blank row of the first
+        non-empty sheet is the header, as before. None for a workbook without any values.
+        """
+        cells = sorted({
+            value for sample in samples for row in sample.rows for value in row
+            if isinstance(value, str) and 0 < len(value.strip()) <= _MAX_HEADER_CELL_LENGTH
+        })
+        mapping = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS).map_headers_to_canonical(cells)
+
+        best: Optional[HeaderLocation] = None
+        fallback: Optional[HeaderLocation] = None
+        for sample in samples:
+            for row_index, row in enumerate(sample.rows):
+                if fallback is None and any(value is not None for value in row):
+                    fallback = HeaderLocation(sample.name, row_index, set())
+                fields = {mapping[value] for value in row if isinstance(value, str) and value in mapping}
+                if len(fields) >= _MIN_HEADER_FIELDS and (best is None or len(fields) > len(best.fields)):
+                    best = HeaderLocation(sample.name, row_index, fields)
+        return best or fallback
+
+    @staticmethod
+    def column_names(header: Tuple[Any, ...]) -> List[Any]:
+        """Header cells as column names, with pandas' naming for blank and repeated headers."""
+        names: List[Any] = []
+        seen: Dict[Any, int] = {}
+        for position, value in enumerate(header):
+            name = f"Unnamed: {position}" if value is None else value
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(name)
+        return names
+
+    @staticmethod
+    def needed_columns(names: List[Any]) -> List[int]:
+        """
+        Positions of the columns the bank statement pipeline uses. Sheets that don't look like a
+        statement (fewer than three mapped columns) keep every column for the other document types.
+        """
+        return HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS).projection(names)
+
+    @staticmethod
+    def stream_sheet(worksheet, header_row: int, columns: List[int], names: List[Any],
+                     chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Yields DataFrames of up to `chunk_rows` data rows below the 0-based `header_row`, holding only `columns`."""
+        from app.services.xlsx_stream_reader import iter_projected_rows
+
+        chunk_rows = chunk_rows or settings.EXCEL_CHUNK_ROWS
+        column_names = [names[position] for position in columns]
+        chunk: List[Tuple[Any, ...]] = []
+        for values in iter_projected_rows(worksheet, columns, min_row=header_row + 2):
+            # Blank rows are skipped, as pd.read_excel does
+            if all(value is None for value in values):
+                continue
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame.from_records(chunk, columns=column_names)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=column_names)
+
+    @staticmethod
+    def _locate(samples: List[SheetSample]) -> Tuple[Optional[HeaderLocation], List[Any], List[int]]:
+        location = ExcelProcessingService.detect_header(samples)
+        if location is None:
+            return None, [], []
+        sample = next(sample for sample in samples if sample.name == location.sheet_name)
+        names = ExcelProcessingService.column_names(sample.rows[location.header_row])
+        return location, names, ExcelProcessingService.needed_columns(names)
+
+    @staticmethod
+    def _read_table(workbook, samples: List[SheetSample]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        location, names, columns = ExcelProcessingService._locate(samples)
+        if location is None:
+            return pd.DataFrame(), {}
+        chunks = list(ExcelProcessingService.stream_sheet(workbook[location.sheet_name], location.header_row, columns, names))
+        if not chunks:
+            frame = pd.DataFrame(columns=[names[position] for position in columns])
+        else:
+            frame = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return frame, location.to_metadata(len(samples))
+
+    @staticmethod
+    def read_workbook(file_content: bytes) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """The statement table of the workbook and where it was found (empty for legacy .xls files)."""
+        if not file_content.startswith(_ZIP_MAGIC):
+            return pd.read_excel(BytesIO(file_content)), {}
+        workbook = _open_workbook(file_content)
+        try:
+            return ExcelProcessingService._read_table(workbook, ExcelProcessingService.sniff_workbook(workbook))
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def iter_frames(file_content: bytes, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        The statement table of an .xlsx workbook as DataFrames of up to `chunk_rows` rows, for workbooks
+        too large to hold as one frame. Every call opens the workbook and locates the header again.
+        """
+        workbook = _open_workbook(file_content)
+        try:
+            location, names, columns = ExcelProcessingService._locate(ExcelProcessingService.sniff_workbook(workbook))
+            if location is not None:
+                yield from ExcelProcessingService.stream_sheet(workbook[location.sheet_name], location.header_row,
+                                                               columns, names, chunk_rows)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def is_streamable(file_content: bytes) -> bool:
+        """Only .xlsx workbooks can be streamed; legacy .xls files are read whole by pd.read_excel."""
+        return file_content.startswith(_ZIP_MAGIC)
+
+    @staticmethod
+    def read_excel_frame(file_content: bytes) -> pd.DataFrame:
+        """Parses the workbook into a DataFrame that the pipeline can consume directly."""
+        return ExcelProcessingService.read_workbook(file_content)[0]
+
+    async def extract_table(self, file_content: bytes) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        read_workbook on the executor's threads, as a single task whatever the number of sheets: sniffing
+        is pure Python that holds the GIL and every sheet reads the same archive, so per-sheet tasks would
+        only use up the executor's pending slots (a workbook with more sheets than slots could never load).
+        """
+        if self.executor is None:
+            return self.read_workbook(file_content)
+        return await self.executor.run_in_thread(self.read_workbook, file_content)
+
     @staticmethod
     def process_excel_file(file_content: bytes, document_type: str = "auto") -> Dict[str, Any]:
-        df = pd.read_excel(BytesIO(file_content))
+        df = ExcelProcessingService.read_excel_frame(file_content)
 
         if not df.empty:
             return {"excel_data": df.to_dict(orient='records')}
@@ -1,20 +1,100 @@
-from typing import Dict, Any, Optional
+from functools import partial
+from typing import Callable, Dict, Any, Iterator, Optional
+import pandas as pd
+from app.core.config import settings
+from app.core.executor import TaskExecutor, get_executor
+from app.core.pipeline_context import PipelineContext
 from app.services.pdf_processing_service import PdfProcessingService
 from app.services.excel_processing_service import ExcelProcessingService
 from app.services.image_processing_service import ImageProcessingService
+from app.services.arrow_processing_service import ArrowProcessingService
+
+# Rough ratio of the memory a table takes once parsed and turned into response rows to its file size;
+# compressed and zipped formats expand the most
+_PARSED_SIZE_FACTOR = {"csv": 12, "tsv": 12, "arrow": 8, "parquet": 30, "excel": 40}
+
+
+def _first_chunk(chunk_source: Callable[[], Iterator[pd.DataFrame]]) -> pd.DataFrame:
+    chunks = chunk_source()
+    try:
+        return next(chunks, None)
+    finally:
+        chunks.close()
+
 
 class FileFormatHandlerService:
-    def __init__(self):
-        self.pdf_processor = PdfProcessingService()
-        self.excel_processor = ExcelProcessingService()
+    def __init__(self, executor: Optional[TaskExecutor] = None):
+        # pypdf is pure Python, so PDF page ranges go to worker processes; pandas and Pillow run on threads
+        self.executor = executor or get_executor()
+        self.pdf_processor = PdfProcessingService(self.executor)
+        self.excel_processor = ExcelProcessingService(self.executor)
         self.image_processor = ImageProcessingService()
+        # pyarrow's readers release the GIL and use their own thread pool
+        self.arrow_processor = ArrowProcessingService()
 
     async def process_file(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         if filename.endswith('.pdf'):
-            return self.pdf_processor.process_pdf_file(file_content)
+            return await self.pdf_processor.extract_text(file_content)
         elif filename.endswith(('.xls', '.xlsx')):
-            return self.excel_processor.process_excel_file(file_content)
+            return await self.executor.run_in_thread(self.excel_processor.process_excel_file, file_content)
         elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')):
-            return self.image_processor.process_image_file(file_content)
+            return await self.executor.run_in_thread(self.image_processor.process_image_file, file_content)
+        elif self.arrow_processor.format_of(filename):
+            df, _ = await self.executor.run_in_thread(self.arrow_processor.read_frame, file_content, self.arrow_processor.format_of(filename))
+            return {"excel_data": df.to_dict(orient='records')}
         else:
             return {"error": "Unsupported file format"}
+
+    def chunk_source(self, file_content: bytes, table_format: str) -> Optional[Callable[[], Iterator[pd.DataFrame]]]:
+        """
+        A re-readable chunk iterator for tables whose estimated parsed size exceeds MAX_MEMORY_MB,
+        or None when the table can be held whole.
+        """
+        if settings.MAX_MEMORY_MB <= 0:
+            return None
+        if len(file_content) * _PARSED_SIZE_FACTOR[table_format] <= settings.MAX_MEMORY_MB * 2 ** 20:
+            return None
+        if table_format == "excel":
+            if not self.excel_processor.is_streamable(file_content):
+                return None
+            return partial(self.excel_processor.iter_frames, file_content, settings.OUT_OF_CORE_CHUNK_ROWS)
+        return partial(self.arrow_processor.iter_frames, file_content, table_format, settings.OUT_OF_CORE_CHUNK_ROWS)
+
+    async def _build_chunked_context(self, filename: str, metadata: Optional[Dict[str, Any]],
+                                     chunk_source: Callable[[], Iterator[pd.DataFrame]]) -> PipelineContext:
+        try:
+            first_chunk = await self.executor.run_in_thread(_first_chunk, chunk_source)
+        except ValueError as e:
+            return PipelineContext(document_id=filename, content={"error": str(e)}, metadata=metadata)
+        return PipelineContext(
+            document_id=filename,
+            metadata={**(metadata or {}), "chunked": {"chunk_rows": settings.OUT_OF_CORE_CHUNK_ROWS}},
+            frame=first_chunk if first_chunk is not None else pd.DataFrame(),
+            chunk_source=chunk_source
+        )
+
+    async def build_context(self, file_content: bytes, filename: str, metadata: Optional[Dict[str, Any]] = None) -> PipelineContext:
+        """
+        Parses an uploaded file into a pipeline context; spreadsheets and data exports stay as a DataFrame.
+        Tables above the memory ceiling are not parsed here but handed over as a chunk source.
+        """
+        table_format = self.arrow_processor.format_of(filename)
+        if table_format or filename.endswith(('.xls', '.xlsx')):
+            chunk_source = self.chunk_source(file_content, table_format or "excel")
+            if chunk_source is not None:
+                return await self._build_chunked_context(filename, metadata, chunk_source)
+        if table_format:
+            try:
+                df, table_metadata = await self.executor.run_in_thread(self.arrow_processor.read_frame, file_content, table_format)
+            except ValueError as e:
+                # pyarrow's ArrowInvalid is a ValueError: a malformed export is a client error
+                return PipelineContext(document_id=filename, content={"error": str(e)}, metadata=metadata)
+            return PipelineContext(document_id=filename, metadata={**(metadata or {}), "table": table_metadata}, frame=df)
+        if filename.endswith(('.xls', '.xlsx')):
+            df, table_metadata = await self.excel_processor.extract_table(file_content)
+            if table_metadata:
+                # Which sheet and header row the table was read from, reported back in the response
+                metadata = {**(metadata or {}), "excel": table_metadata}
+            return PipelineContext(document_id=filename, metadata=metadata, frame=df)
+        processed_data = await self.process_file(file_content, filename)
+        return PipelineContext(document_id=filename, content=processed_data, metadata=metadata)
@@ -0,0 +1,109 @@
+from typing import Sequence
+import numpy as np
+
+FORECAST_MODELS = ("rolling_mean", "ewma", "holt")
+
+
+class ForecastEngine:
+    """
+    NumPy forecasting models over daily series.
+    Every model runs on a 2-D array (series x days) so a batch of accounts is forecast together;
+    shorter series are left-padded with NaN so all of them end on the same step.
+    """
+
+    def __init__(self, window: int = 3, alpha: float = 0.3, beta: float = 0.1):
+        self.window = window
+        self.alpha = alpha
+        self.beta = beta
+
+    @staticmethod
+    def daily_series(dates: np.ndarray, amounts: np.ndarray) -> tuple:
+        """
+        Sums amounts per calendar day over the full date range, so several transactions on
+        the same day are added up and days without activity count as zero.
+        Returns (first_day, values).
+        """
+        days = np.asarray(dates, dtype="datetime64[D]")
+        if not len(days):
+            return None, np.zeros(0)
+        day_codes = days.astype(np.int64)
+        first_code = int(day_codes.min())
+        values = np.bincount(day_codes - first_code, weights=np.nan_to_num(np.asarray(amounts, dtype=np.float64)))
+        return np.datetime64(first_code, "D"), values
+
+    @staticmethod
+    def stack(series: Sequence[np.ndarray]) -> np.ndarray:
+        """Left-pads series with NaN into one (series x days) array."""
+        length = max((len(values) for values in series), default=0)
+        stacked = np.full((len(series), length), np.nan)
+        for row, values in enumerate(series):
+            if len(values):
+                stacked[row, length - len(values):] = values
+        return stacked
+
+    def rolling_mean(self, values: np.ndarray) -> np.ndarray:
+        """Trailing NaN-aware mean over `window` days for every step, via cumulative sums."""
+        values = np.atleast_2d(values)
+        valid = ~np.isnan(values)
+        sums = np.cumsum(np.where(valid, values, 0.0), axis=1)
+        counts = np.cumsum(valid, axis=1)
+        lagged_sums = np.zeros_like(sums)
+        lagged_counts = np.zeros_like(counts)
+        lagged_sums[:, self.window:] = sums[:, :-self.window]
+        lagged_counts[:, self.window:] = counts[:, :-self.window]
+        window_counts = counts - lagged_counts
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(window_counts > 0, (sums - lagged_sums) / window_counts, np.nan)
+
+    def ewma(self, values: np.ndarray) -> np.ndarray:
+        """Exponentially weighted level for every step; the loop runs over days, vectorized across series."""
+        values = np.atleast_2d(values)
+        levels = np.full(values.shape, np.nan)
+        level = np.full(values.shape[0], np.nan)
+        for step in range(values.shape[1]):
+            observed = values[:, step]
+            updated = self.alpha * observed + (1 - self.alpha) * level
+            level = np.where(np.isnan(observed), level, np.where(np.isnan(level), observed, updated))
+            levels[:, step] = level
+        return levels
+
+    def holt(self, values: np.ndarray) -> tuple:
+        """
+        Holt's linear trend: returns the final (level, trend) of every series.
+        Each series starts from its first observation, with the first difference as initial trend.
+        """
+        values = np.atleast_2d(values)
+        level = np.full(values.shape[0], np.nan)
+        trend = np.zeros(values.shape[0])
+        observations = np.zeros(values.shape[0], dtype=np.int64)
+        for step in range(values.shape[1]):
+            observed = values[:, step]
+            has_observation = ~np.isnan(observed)
+            new_level = self.alpha * observed + (1 - self.alpha) * (level + trend)
+            new_trend = self.beta * (new_level - level) + (1 - self.beta) * trend
+            first = has_observation & (observations == 0)
+            second = has_observation & (observations == 1)
+            later = has_observation & (observations >= 2)
+            trend = np.where(second, observed - level, np.where(later, new_trend, trend))
+            level = np.where(first | second, observed, np.where(later, new_level, level))
+            observations += has_observation
+        return level, trend
+
+    def forecast_many(self, series: Sequence[np.ndarray], horizon: int, model: str = "holt") -> np.ndarray:
+        """Forecasts `horizon` days ahead for every series at once; returns a (series x horizon) array."""
+        values = self.stack(series)
+        if values.shape[1] == 0:
+            return np.full((len(series), horizon), np.nan)
+        if model == "holt":
+            level, trend = self.holt(values)
+            return level[:, None] + trend[:, None] * np.arange(1, horizon + 1)
+        if model == "ewma":
+            last_level = self.ewma(values)[:, -1]
+        elif model == "rolling_mean":
+            last_level = self.rolling_mean(values)[:, -1]
+        else:
+            raise ValueError(f"Unknown forecast model: {model}. Expected one of {FORECAST_MODELS}.")
+        return np.repeat(last_level[:, None], horizon, axis=1)
+
+    def forecast(self, values: np.ndarray, horizon: int, model: str = "holt") -> np.ndarray:
+        return self.forecast_many([values], horizon, model)[0]
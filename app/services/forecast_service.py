@@ -1,9 +1,31 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from app.schema.output_schema import ForecastOutputs
-from datetime import date
-import pandas as pd
+from app.core.config import settings
+from datetime import date, timedelta
+import numpy as np
+from app.services.forecast_engine import ForecastEngine
+from app.schema.period_rollup import PeriodRollup
+from app.services.stress_test_service import StressTestService
 
 class ForecastService:
+    def __init__(self,
+                 model: Optional[str] = None,
+                 horizon_days: Optional[int] = None,
+                 long_term_days: Optional[int] = None):
+        self.model = model or settings.FORECAST_MODEL
+        self.horizon_days = horizon_days or settings.FORECAST_HORIZON_DAYS
+        self.long_term_days = long_term_days or settings.FORECAST_LONG_TERM_DAYS
+        self.engine = ForecastEngine()
+        self.stress_test_service = StressTestService()
+
+    async def get_forecast_from_rollup(self, daily_rollup: Optional[PeriodRollup]) -> ForecastOutputs:
+        """Forecasts from daily buckets already built by RollupService."""
+        if daily_rollup is None:
+            return await self.get_forecast({})
+        outputs = self._build_outputs(daily_rollup.period_starts[0].astype(date), daily_rollup.net)
+        # The stress test bootstraps from the same daily buckets
+        outputs.liquidity_stress_test_results = self.stress_test_service.run(daily_rollup)
+        return outputs
 
     async def get_forecast(self, time_series_data: Dict[date, float]) -> ForecastOutputs:
         if not time_series_data:
@@ -12,36 +34,36 @@ class ForecastService:
                 long_term_revenue_projection={},
                 liquidity_stress_test_results={}
             )
-            
-        dates = sorted(time_series_data.keys())
-        values = [time_series_data[d] for d in dates]
-
-        # Helper to convert float to None if it's NaN
-        def to_none_if_nan(val: float) -> Optional[float]:
-            return val if pd.notna(val) else None
-
-        short_term_forecast = {}
-        if len(values) >= 3:
-            for i in range(len(values)):
-                if i + 1 < len(values):
-                    forecast_value = None
-                    if i >= 2:
-                        # Calculate average, then convert to None if NaN
-                        avg = sum(v for v in values[i-2:i+1] if pd.notna(v)) / len([v for v in values[i-2:i+1] if pd.notna(v)]) if len([v for v in values[i-2:i+1] if pd.notna(v)]) > 0 else None
-                        forecast_value = to_none_if_nan(avg)
-                    else:
-                        forecast_value = to_none_if_nan(values[i])
-                    short_term_forecast[dates[i+1]] = forecast_value
-
-        long_term_projection_value = to_none_if_nan(values[-1] * 1.05 if values else None)
-        if dates and long_term_projection_value is not None:
-            long_term_revenue_projection = {dates[-1]: long_term_projection_value}
+
+        first_day, values = self.engine.daily_series(
+            np.array(list(time_series_data.keys()), dtype="datetime64[D]"),
+            np.array([v if v is not None else np.nan for v in time_series_data.values()], dtype=np.float64)
+        )
+        return self._build_outputs(first_day.astype(date), values)
+
+    def forecast_batch(self, series: Sequence[np.ndarray], horizon: Optional[int] = None, model: Optional[str] = None) -> np.ndarray:
+        """Forecasts many accounts' daily net cashflow series in one call; returns a (series x horizon) array."""
+        return self.engine.forecast_many(series, horizon or self.horizon_days, model or self.model)
+
+    def _build_outputs(self, first_day: date, values: np.ndarray) -> ForecastOutputs:
+        last_day = first_day + timedelta(days=len(values) - 1)
+        # One run covers both horizons; the long-term point is the last step of the longer projection
+        projection = self.engine.forecast(values, max(self.horizon_days, self.long_term_days), self.model)
+
+        short_term_forecast = {
+            last_day + timedelta(days=step + 1): projection[step]
+            for step in range(self.horizon_days)
+        }
+        # Steps the model can't project stay NaN and are returned as null
+        long_term_projection_value = projection[self.long_term_days - 1]
+        if not np.isnan(long_term_projection_value):
+            long_term_revenue_projection = {last_day + timedelta(days=self.long_term_days): long_term_projection_value}
         else:
             long_term_revenue_projection = {}
 
         return ForecastOutputs(
             short_term_cashflow_forecast=short_term_forecast,
             long_term_revenue_projection=long_term_revenue_projection,
-            liquidity_stress_test_results={"scenario_a": "pass", "scenario_b": "fail"}
+            # Without separate daily inflows, outflows and balances there is nothing to bootstrap from
+            liquidity_stress_test_results={"status": "insufficient_data"}
         )
-
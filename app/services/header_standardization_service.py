@@ -1,20 +1,123 @@
 import re
+from collections import OrderedDict
+from threading import Lock
 from rapidfuzz import process, fuzz
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+# Compiled synonym indexes are shared by every service built over the same canonical table
+_COMPILED_INDEXES: Dict[Tuple, "CompiledSynonymIndex"] = {}
+_COMPILED_INDEXES_LOCK = Lock()
+
+
+class CompiledSynonymIndex:
+    """
+    Precomputed matcher for one canonical table.
+    Synonyms are normalized once; exact synonyms resolve through a dict lookup,
+    everything else is scored with RapidFuzz against the prebuilt choice list.
+    """
+
+    def __init__(self, canonical_fields: Dict[str, List[str]], threshold: int, cache_size: int = 1024):
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.choices: List[str] = []
+        self.choice_to_canonical: List[str] = []
+        self.exact_matches: Dict[str, str] = {}
+        for canonical_field, synonyms in canonical_fields.items():
+            for synonym in synonyms:
+                normalized_synonym = HeaderStandardizationService._normalize_header(synonym)
+                self.choices.append(normalized_synonym)
+                self.choice_to_canonical.append(canonical_field)
+                # First canonical field listing a synonym wins, same as extractOne's ordering
+                self.exact_matches.setdefault(normalized_synonym, canonical_field)
+        self._cache: "OrderedDict[Any, str | None]" = OrderedDict()
+        self._cache_lock = Lock()
+
+    def _cache_get(self, raw_header: Any) -> Tuple[bool, str | None]:
+        with self._cache_lock:
+            if raw_header in self._cache:
+                self._cache.move_to_end(raw_header)
+                return True, self._cache[raw_header]
+        return False, None
+
+    def _cache_put(self, raw_header: Any, canonical_field: str | None) -> None:
+        with self._cache_lock:
+            self._cache[raw_header] = canonical_field
+            self._cache.move_to_end(raw_header)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def match(self, raw_header: Any) -> str | None:
+        found, canonical_field = self._cache_get(raw_header)
+        if found:
+            return canonical_field
+        return self.match_many([raw_header])[0]
+
+    def match_many(self, raw_headers: List[Any]) -> List[str | None]:
+        """
+        Resolves a batch of headers: cache hits and exact synonyms first,
+        then all remaining headers are scored against all synonyms in a single cdist call.
+        """
+        results: List[str | None] = [None] * len(raw_headers)
+        pending_positions: List[int] = []
+        pending_headers: List[str] = []
+
+        for position, raw_header in enumerate(raw_headers):
+            found, canonical_field = self._cache_get(raw_header)
+            if found:
+                results[position] = canonical_field
+                continue
+            normalized_header = HeaderStandardizationService._normalize_header(str(raw_header))
+            exact_match = self.exact_matches.get(normalized_header)
+            if exact_match is not None:
+                results[position] = exact_match
+                self._cache_put(raw_header, exact_match)
+                continue
+            pending_positions.append(position)
+            pending_headers.append(normalized_header)
+
+        if pending_headers and self.choices:
+            scores = process.cdist(
+                pending_headers,
+                self.choices,
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=self.threshold,
+                workers=1
+            )
+            best_choices = scores.argmax(axis=1)
+            for row, position in enumerate(pending_positions):
+                best_choice = best_choices[row]
+                canonical_field = None
+                if scores[row, best_choice] >= self.threshold:
+                    canonical_field = self.choice_to_canonical[best_choice]
+                results[position] = canonical_field
+                self._cache_put(raw_headers[position], canonical_field)
+
+        return results
+
+
+def get_compiled_index(canonical_fields: Dict[str, List[str]], threshold: int) -> CompiledSynonymIndex:
+    """Returns the shared compiled index for a canonical table, building it on first use."""
+    key = (tuple((field, tuple(synonyms)) for field, synonyms in canonical_fields.items()), threshold)
+    index = _COMPILED_INDEXES.get(key)
+    if index is None:
+        with _COMPILED_INDEXES_LOCK:
+            index = _COMPILED_INDEXES.get(key)
+            if index is None:
+                index = CompiledSynonymIndex(canonical_fields, threshold)
+                _COMPILED_INDEXES[key] = index
+    return index
+
 
 class HeaderStandardizationService:
     def __init__(self, canonical_fields: Dict[str, List[str]], threshold: int = 80):
         self.canonical_fields = canonical_fields
         self.threshold = threshold
+        self.index = get_compiled_index(canonical_fields, threshold)
         self.canonical_to_synonyms_map = self._build_canonical_to_synonyms_map()
 
     def _build_canonical_to_synonyms_map(self) -> Dict[str, str]:
         """Creates a mapping from all synonyms back to their canonical field."""
-        mapping = {}
-        for canonical_field, synonyms in self.canonical_fields.items():
-            for synonym in synonyms:
-                mapping[self._normalize_header(synonym)] = canonical_field
-        return mapping
+        return dict(self.index.exact_matches)
 
     @staticmethod
     def _normalize_header(header: str) -> str:
@@ -30,44 +133,25 @@ class HeaderStandardizationService:
         Fuzzy matches a raw header to a canonical field using RapidFuzz.
         Returns the canonical field if a match is found above the threshold, otherwise None.
         """
-        normalized_raw_header = self._normalize_header(raw_header)
-        
-        best_match = None
-        highest_score = -1
-
-        all_synonyms = []
-        for synonyms_list in self.canonical_fields.values():
-            all_synonyms.extend([self._normalize_header(s) for s in synonyms_list])
-
-        if not all_synonyms:
-            return None
-
-        # Use process.extractOne to find the best match from all synonyms
-        match_result = process.extractOne(
-            normalized_raw_header, 
-            all_synonyms, 
-            scorer=fuzz.token_set_ratio, 
-            score_cutoff=self.threshold
-        )
-
-        if match_result:
-            matched_synonym, score, _ = match_result
-            if score >= highest_score:
-                highest_score = score
-                # Map the matched synonym back to its canonical field
-                best_match = self.canonical_to_synonyms_map.get(matched_synonym)
-        
-        return best_match
+        return self.index.match(raw_header)
 
     def map_headers_to_canonical(self, raw_headers: List[str]) -> Dict[str, str]:
         """
         Maps a list of raw headers to their canonical fields.
         Output: { "raw_header": "canonical_field" }
         """
-        mapped_headers = {}
-        for header in raw_headers:
-            canonical_field = self.fuzzy_match_header(header)
-            if canonical_field:
-                mapped_headers[header] = canonical_field
-        return mapped_headers
+        canonical_fields = self.index.match_many(raw_headers)
+        return {
+            header: canonical_field
+            for header, canonical_field in zip(raw_headers, canonical_fields)
+            if canonical_field
+        }
 
+    def projection(self, raw_headers: List[Any], min_matches: int = 3) -> List[int]:
+        """
+        Positions of the headers that map to a canonical field, so readers can decode only those columns.
+        Tables with fewer than `min_matches` mapped headers are probably something else and keep every column.
+        """
+        canonical_fields = self.index.match_many(raw_headers)
+        positions = [position for position, canonical_field in enumerate(canonical_fields) if canonical_field]
+        return positions if len(positions) >= min_matches else list(range(len(raw_headers)))
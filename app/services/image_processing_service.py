@@ -1,11 +1,13 @@
 from typing import Dict, Any
 from io import BytesIO
-from PIL import Image
 import base64
 
 class ImageProcessingService:
     @staticmethod
     def process_image_file(file_content: bytes) -> Dict[str, Any]:
+        # Imported on first use so processes that never see an image don't pay for it at startup
+        from PIL import Image
+
         try:
             image = Image.open(BytesIO(file_content))
             image.verify() # Verify that this is indeed an image
@@ -2,8 +2,15 @@ from app.schema.bank_statement_schema import BankStatementInput
 from app.schema.credit_bureau_schema import CreditBureauInput
 from app.schema.kyb_kyc_schema import KybKycInput
 from app.schema.output_schema import UnifiedDocumentResponse, CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators, LlmSummaryOutput, ForecastOutputs, RiskEngineOutput
-from app.core.models import DocumentAnalysisRequest, CvOutput, RagOutput, AnomalyOutput
+from app.core.models import DocumentAnalysisRequest, DocumentInput, CvOutput, RagOutput, AnomalyOutput
+from app.core.pipeline_context import PipelineContext
+from app.core.response_fields import ResponseFields
+from app.core.executor import TaskExecutor, get_executor
+from app.schema.account_state_schema import MetricsAggregateState
+from app.schema.transaction_frame import TransactionFrame
 
+import asyncio
+from typing import Any, Dict, Optional, Union
 import pandas as pd
 
 from app.services.cv_service import CvService
@@ -13,11 +20,18 @@ from app.services.forecast_service import ForecastService
 from app.services.risk_engine import RiskEngine
 from app.services.document_classifier_service import DocumentClassifierService
 from app.services.standardization_service import StandardizationService
-from app.services.metrics_service import MetricsService
+from app.services.metrics_service import MetricsService, StatementAggregates
+from app.services.rollup_service import RollupService
+from app.services.pdf_table_extraction_service import PdfTableExtractionService
+from app.services.table_payload_service import TablePayloadService
+
+# Metadata keys the pipeline adds about the input; the caller's own metadata is not echoed back
+DETECTED_METADATA_KEYS = ("excel", "table", "chunked")
 
 
 class IngestionService:
-    def __init__(self):
+    def __init__(self, executor: Optional[TaskExecutor] = None):
+        self.executor = executor or get_executor()
         self.cv_service = CvService()
         self.rag_service = RagService()
         self.anomaly_service = AnomalyService()
@@ -26,56 +40,103 @@ class IngestionService:
         self.document_classifier = DocumentClassifierService()
         self.standardization_service = StandardizationService()
         self.metrics_service = MetricsService()
+        self.rollup_service = RollupService()
+        self.table_extractor = PdfTableExtractionService()
+
+    async def process_document(self, request: DocumentAnalysisRequest, fields: Optional[ResponseFields] = None) -> UnifiedDocumentResponse:
+        # Building the frame from the JSON records is CPU work too, so it also happens on the worker
+        return await self.executor.run_in_thread(self._analyze_blocking, request.document, fields)
+
+    async def process_context(self, context: PipelineContext, fields: Optional[ResponseFields] = None) -> UnifiedDocumentResponse:
+        """
+        Runs the analysis on the executor's thread pool so the event loop keeps serving other requests.
+        Only the response sections in `fields` are computed (all of them by default).
+        """
+        return await self.executor.run_in_thread(self._analyze_blocking, context, fields)
+
+    def _analyze_blocking(self, document: Union[PipelineContext, DocumentInput], fields: Optional[ResponseFields] = None) -> UnifiedDocumentResponse:
+        if isinstance(document, PipelineContext):
+            context = document
+        else:
+            context = TablePayloadService.build_context(document.document_id, document.content, document.metadata)
+        # The pipeline steps are coroutines; on the worker thread they run on a private event loop
+        response = asyncio.run(self._analyze(context, fields or ResponseFields()))
+        # What was learned about the input on the way in (e.g. the sheet and header row of a workbook)
+        detected = {key: context.metadata[key] for key in DETECTED_METADATA_KEYS if key in context.metadata}
+        response.metadata = detected or None
+        return response
+
+    @staticmethod
+    def _extracted_data(context: PipelineContext, fields: ResponseFields) -> Optional[Dict[str, Any]]:
+        # The input is only echoed back on request; building its row dicts is the costliest part of a response
+        if not fields.wants("extracted_data"):
+            return None
+        if fields.includes("extracted_data"):
+            return context.content
+        return context.content_summary()
 
-    async def process_document(self, request: DocumentAnalysisRequest) -> UnifiedDocumentResponse:
-        document_id = request.document.document_id
-        raw_content = request.document.content
+    async def _analyze(self, context: PipelineContext, fields: ResponseFields) -> UnifiedDocumentResponse:
+        document_id = context.document_id
 
-        # Prepare content for classification and standardization
-        # Assuming raw_content can be a dict with 'excel_data' (list of dicts) or 'text_content' (str)
-        document_type = self.document_classifier.classify_document(raw_content)
+        # The classifier records the header mapping on the context for the standardizer to reuse
+        document_type = self.document_classifier.classify_context(context)
 
         if document_type == "bank_statement":
-            return await self._process_bank_statement(document_id, raw_content)
+            if context.chunk_source is not None:
+                return await self._process_bank_statement_chunked(context, fields)
+            return await self._process_bank_statement(context, fields)
         elif document_type == "credit_bureau":
-            return await self._process_credit_bureau(document_id, raw_content)
+            return await self._process_credit_bureau(document_id, context.content, self._extracted_data(context, fields))
         elif document_type == "kyb_kyc":
-            return await self._process_kyb_kyc(document_id, raw_content)
+            return await self._process_kyb_kyc(document_id, context.content, self._extracted_data(context, fields))
         else:
             return UnifiedDocumentResponse(
                 document_type="unknown",
-                extracted_data=raw_content,
+                extracted_data=self._extracted_data(context, fields),
                 llm_summary=LlmSummaryOutput(summary_text="Could not classify document type.", key_insights=[], red_flags_identified=[])
             )
 
-    async def _process_bank_statement(self, document_id: str, raw_content: dict) -> UnifiedDocumentResponse:
-        df = pd.DataFrame(raw_content["excel_data"]) if "excel_data" in raw_content else pd.DataFrame()
-        bank_statement_input = self.standardization_service.standardize_bank_statement(df)
+    async def _process_bank_statement(self, context: PipelineContext, fields: ResponseFields) -> UnifiedDocumentResponse:
+        if context.frame is None and context.text_content:
+            # Text statements (PDFs) join the columnar path once their table rows are extracted
+            context.frame = self.table_extractor.extract_frame(context.text_content)
+            if context.frame is not None:
+                context.header_mapping = {column: column for column in context.frame.columns}
+        df = context.frame if context.frame is not None else pd.DataFrame()
+        context.bank_statement_frame = self.standardization_service.standardize_bank_statement_frame(df, context.header_mapping)
+        context.transactions = self.standardization_service.build_transaction_frame(context.bank_statement_frame)
+        transactions = context.transactions
 
-        cashflow_metrics = self.metrics_service.calculate_cashflow_metrics(bank_statement_input)
-        liquidity_metrics = self.metrics_service.calculate_liquidity_metrics(bank_statement_input)
-        financial_discipline_metrics = self.metrics_service.calculate_financial_discipline_metrics(bank_statement_input)
-        debt_servicing_metrics = self.metrics_service.calculate_debt_servicing_metrics(bank_statement_input)
-        risk_indicators = self.metrics_service.identify_risk_indicators(bank_statement_input)
+        context.daily_rollup = self.rollup_service.rollup(transactions, "D")
+        context.monthly_rollup = self.rollup_service.rollup(transactions, "M")
 
-        # cv_output = await self.cv_service.analyze_document(raw_content)
-        # rag_output = await self.rag_service.process_document(raw_content)
-        # anomaly_output = await self.anomaly_service.detect_anomaly(raw_content)
-        
-        # Ensure time_series_data values are float or None
-        time_series_data = {
-            t.date: (float(t.amount) if pd.notna(t.amount) else None) if t.type == 'credit'
-                      else (float(-t.amount) if pd.notna(t.amount) else None)
-            for t in bank_statement_input.transactions
-        }
-        forecast_outputs = await self.forecast_service.get_forecast(time_series_data)
-
-        risk_engine_output = await self.risk_engine.compute_risk_score(
-            cashflow_metrics, liquidity_metrics, financial_discipline_metrics, debt_servicing_metrics, risk_indicators
+        # All metric families come out of a single aggregation pass over the arrays
+        metrics = self.metrics_service.calculate_all_metrics(
+            transactions, monthly_rollup=context.monthly_rollup, daily_rollup=context.daily_rollup
         )
+        cashflow_metrics = metrics.cashflow_metrics
+        liquidity_metrics = metrics.liquidity_metrics
+        financial_discipline_metrics = metrics.financial_discipline_metrics
+        debt_servicing_metrics = metrics.debt_servicing_metrics
+        risk_indicators = metrics.risk_indicators
 
-        # Explicitly ensure risk_score is float or None before passing to UnifiedDocumentResponse
-        final_risk_score = float(risk_engine_output.score) if pd.notna(risk_engine_output.score) else None
+        # cv_output = await self.cv_service.analyze_document(context.content)
+        # rag_output = await self.rag_service.process_document(context.content)
+        # anomaly_output = await self.anomaly_service.detect_anomaly(context.content)
+        
+        # The forecast reuses the daily buckets built for the metrics
+        forecast_outputs = None
+        if fields.wants("forecasts"):
+            forecast_outputs = await self.forecast_service.get_forecast_from_rollup(context.daily_rollup)
+
+        final_risk_score, risk_factors = None, None
+        if fields.wants_any("risk_score", "risk_factors"):
+            risk_engine_output = await self.risk_engine.compute_risk_score(
+                cashflow_metrics, liquidity_metrics, financial_discipline_metrics, debt_servicing_metrics, risk_indicators,
+                transactions=transactions
+            )
+            final_risk_score = risk_engine_output.score
+            risk_factors = risk_engine_output.rationale
 
         llm_summary = LlmSummaryOutput(
             summary_text="Bank statement analysis complete.",
@@ -85,7 +146,7 @@ class IngestionService:
 
         return UnifiedDocumentResponse(
             document_type="bank_statement",
-            extracted_data=raw_content,
+            extracted_data=self._extracted_data(context, fields),
             cashflow_metrics=cashflow_metrics,
             liquidity_metrics=liquidity_metrics,
             financial_discipline_metrics=financial_discipline_metrics,
@@ -93,11 +154,88 @@ class IngestionService:
             risk_indicators=risk_indicators,
             llm_summary=llm_summary,
             forecasts=forecast_outputs,
-            risk_score=final_risk_score, # Use the strictly converted value
-            risk_factors=risk_engine_output.rationale
+            risk_score=final_risk_score,
+            risk_factors=risk_factors
+        )
+
+    def _chunk_transactions(self, chunk: pd.DataFrame, header_mapping) -> Optional[TransactionFrame]:
+        try:
+            return self.standardization_service.build_transaction_frame(
+                self.standardization_service.standardize_bank_statement_frame(chunk, header_mapping)
+            )
+        except ValueError:
+            # A chunk of nothing but blank or junk rows; the statement as a whole is checked below
+            return None
+
+    async def _process_bank_statement_chunked(self, context: PipelineContext, fields: ResponseFields) -> UnifiedDocumentResponse:
+        """
+        Out-of-core counterpart of _process_bank_statement. Each chunk is standardized and folded into the
+        mergeable metric state, the daily and monthly rollups and the transaction rule hits, then dropped.
+        High risk rows are relative to the statement-wide average debit, so they take a second pass over
+        the source once that is known. The rows can't be echoed back: extracted_data holds the row and
+        chunk counts.
+        """
+        wants_risk = fields.wants_any("risk_score", "risk_factors")
+        rule_set = self.risk_engine.rule_set
+        state = MetricsAggregateState()
+        daily_rollup = monthly_rollup = None
+        rule_hits = {}
+        row_count = chunk_count = 0
+        for chunk in context.chunk_source():
+            transactions = self._chunk_transactions(chunk, context.header_mapping)
+            chunk_count += 1
+            if transactions is None:
+                continue
+            row_count += len(transactions)
+            state = self.metrics_service.merge_states(state, self.metrics_service.aggregate_state(transactions))
+            daily_rollup = self.rollup_service.merge(daily_rollup, self.rollup_service.rollup(transactions, "D"))
+            monthly_rollup = self.rollup_service.merge(monthly_rollup, self.rollup_service.rollup(transactions, "M"))
+            if wants_risk:
+                rule_hits = self.risk_engine.transaction_rule_hits(transactions, rule_set, rule_hits)
+        if not row_count:
+            raise ValueError("No valid transaction data found after standardization.")
+
+        high_risk_transactions = []
+        average_debit = StatementAggregates.from_state(state).average_debit
+        if average_debit is not None:
+            for chunk in context.chunk_source():
+                transactions = self._chunk_transactions(chunk, context.header_mapping)
+                if transactions is not None:
+                    high_risk_transactions.extend(self.metrics_service.high_risk_records(transactions, average_debit))
+
+        context.daily_rollup, context.monthly_rollup = daily_rollup, monthly_rollup
+        metrics = self.metrics_service.metrics_from_state(state, monthly_rollup, daily_rollup, high_risk_transactions)
+        forecast_outputs = None
+        if fields.wants("forecasts"):
+            forecast_outputs = await self.forecast_service.get_forecast_from_rollup(daily_rollup)
+        risk_engine_output = None
+        if wants_risk:
+            risk_engine_output = await self.risk_engine.compute_risk_score(
+                metrics.cashflow_metrics, metrics.liquidity_metrics, metrics.financial_discipline_metrics,
+                metrics.debt_servicing_metrics, metrics.risk_indicators,
+                transaction_rule_hits=rule_hits, rule_set=rule_set
+            )
+        context.metadata["chunked"] = {**context.metadata.get("chunked", {}), "rows": row_count, "chunks": chunk_count}
+
+        return UnifiedDocumentResponse(
+            document_type="bank_statement",
+            extracted_data={"row_count": row_count, "chunk_count": chunk_count} if fields.wants("extracted_data") else None,
+            cashflow_metrics=metrics.cashflow_metrics,
+            liquidity_metrics=metrics.liquidity_metrics,
+            financial_discipline_metrics=metrics.financial_discipline_metrics,
+            debt_servicing_metrics=metrics.debt_servicing_metrics,
+            risk_indicators=metrics.risk_indicators,
+            llm_summary=LlmSummaryOutput(
+                summary_text="Bank statement analysis complete.",
+                key_insights=["Positive cashflow", "Good liquidity"],
+                red_flags_identified=[]
+            ),
+            forecasts=forecast_outputs,
+            risk_score=risk_engine_output.score if risk_engine_output else None,
+            risk_factors=risk_engine_output.rationale if risk_engine_output else None
         )
 
-    async def _process_credit_bureau(self, document_id: str, raw_content: dict) -> UnifiedDocumentResponse:
+    async def _process_credit_bureau(self, document_id: str, raw_content: dict, extracted_data: Optional[dict]) -> UnifiedDocumentResponse:
         credit_bureau_input = self.standardization_service.standardize_credit_bureau(raw_content)
 
         risk_indicators = RiskIndicators(
@@ -115,14 +253,14 @@ class IngestionService:
 
         return UnifiedDocumentResponse(
             document_type="credit_bureau",
-            extracted_data=raw_content,
+            extracted_data=extracted_data,
             risk_indicators=risk_indicators,
             llm_summary=llm_summary,
             risk_score=risk_engine_output.score,
             risk_factors=risk_engine_output.rationale
         )
 
-    async def _process_kyb_kyc(self, document_id: str, raw_content: dict) -> UnifiedDocumentResponse:
+    async def _process_kyb_kyc(self, document_id: str, raw_content: dict, extracted_data: Optional[dict]) -> UnifiedDocumentResponse:
         kyb_kyc_input = self.standardization_service.standardize_kyb_kyc(raw_content)
 
         risk_indicators = RiskIndicators(
@@ -140,7 +278,7 @@ class IngestionService:
 
         return UnifiedDocumentResponse(
             document_type="kyb_kyc",
-            extracted_data=raw_content,
+            extracted_data=extracted_data,
             risk_indicators=risk_indicators,
             llm_summary=llm_summary,
             risk_score=risk_engine_output.score,
@@ -1,29 +1,275 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from datetime import date
-from app.schema.output_schema import CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators
+import numpy as np
+from app.schema.output_schema import CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators, BankStatementMetrics
 from app.schema.bank_statement_schema import BankStatementInput, Transaction
+from app.schema.transaction_frame import TransactionFrame, as_transaction_frame
+from app.schema.account_state_schema import MetricsAggregateState
+from app.schema.period_rollup import PeriodRollup
+from app.services.rollup_service import RollupService
+
+# Services accept the columnar frame directly; pydantic statements are converted once on entry
+StatementData = Union[TransactionFrame, BankStatementInput]
+
+
+def _monthly_net_from_state(state: MetricsAggregateState) -> np.ndarray | None:
+    """Expands the stored YYYY-MM net cashflows into a contiguous monthly array, quiet months as zero."""
+    if not state.monthly_net_cashflow:
+        return None
+    codes = np.array(list(state.monthly_net_cashflow.keys()), dtype="datetime64[M]").astype(np.int64)
+    monthly_net = np.zeros(int(codes.max() - codes.min()) + 1)
+    monthly_net[codes - codes.min()] = list(state.monthly_net_cashflow.values())
+    return monthly_net
+
+
+def _last_valid(values: np.ndarray, mask: np.ndarray) -> float | None:
+    """Returns the last non-NaN value among the masked positions, if any."""
+    positions = np.flatnonzero(mask & ~np.isnan(values))
+    return float(values[positions[-1]]) if len(positions) else None
+
+
+class StatementAggregates:
+    """Sums, counts and last balances that every metric family is derived from."""
+
+    __slots__ = ("transaction_count", "total_inflow", "total_outflow", "debit_count", "last_balance", "last_credit_balance", "last_debit_balance")
+
+    def __init__(self,
+                 transaction_count: int,
+                 total_inflow: float,
+                 total_outflow: float,
+                 debit_count: int,
+                 last_balance: float | None,
+                 last_credit_balance: float | None,
+                 last_debit_balance: float | None):
+        self.transaction_count = transaction_count
+        self.total_inflow = total_inflow
+        self.total_outflow = total_outflow
+        self.debit_count = debit_count
+        self.last_balance = last_balance
+        self.last_credit_balance = last_credit_balance
+        self.last_debit_balance = last_debit_balance
+
+    @classmethod
+    def from_state(cls, state: MetricsAggregateState) -> "StatementAggregates":
+        return cls(
+            transaction_count=state.transaction_count,
+            total_inflow=state.total_inflow,
+            total_outflow=state.total_outflow,
+            debit_count=state.debit_count,
+            last_balance=state.last_balance,
+            last_credit_balance=state.last_credit_balance,
+            last_debit_balance=state.last_debit_balance
+        )
+
+    @property
+    def average_debit(self) -> float | None:
+        return self.total_outflow / self.debit_count if self.debit_count else None
+
+    @classmethod
+    def from_frame(cls, transactions: TransactionFrame) -> "StatementAggregates":
+        """One scan of the arrays: a single bincount yields per-type sums and counts."""
+        valid_amounts = ~np.isnan(transactions.amounts)
+        # Type codes -1/0/1 become bins 0/1/2
+        type_bins = transactions.type_codes.astype(np.intp) + 1
+        sums = np.bincount(type_bins, weights=np.where(valid_amounts, transactions.amounts, 0.0), minlength=3)
+        counts = np.bincount(type_bins, weights=valid_amounts, minlength=3)
+        return cls(
+            transaction_count=len(transactions),
+            total_inflow=float(sums[2]),
+            # Amounts are signed, so outflow is the negated sum of debits
+            total_outflow=float(-sums[0]),
+            debit_count=int(counts[0]),
+            last_balance=_last_valid(transactions.balances, np.ones(len(transactions), dtype=bool)),
+            last_credit_balance=_last_valid(transactions.balances, transactions.is_credit),
+            last_debit_balance=_last_valid(transactions.balances, transactions.is_debit)
+        )
+
 
 class MetricsService:
     @staticmethod
-    def calculate_cashflow_metrics(bank_statement: BankStatementInput) -> CashflowMetrics:
-        transactions = bank_statement.transactions
-        if not transactions:
+    def calculate_all_metrics(bank_statement: StatementData,
+                              total_debt: float = 0.0,
+                              credit_score_change: float = 0.0,
+                              negative_news_mentions: int = 0,
+                              bankruptcy_flags: bool = False,
+                              monthly_rollup: Optional[PeriodRollup] = None,
+                              daily_rollup: Optional[PeriodRollup] = None) -> BankStatementMetrics:
+        """
+        Fused kernel: aggregates the transaction arrays once and derives all five metric families from it,
+        instead of every calculate_* method rescanning the transactions for the same totals.
+        Rollups already built by the caller (e.g. for the forecast) are reused rather than recomputed.
+        """
+        transactions = as_transaction_frame(bank_statement)
+        aggregates = StatementAggregates.from_frame(transactions) if len(transactions) else None
+        if monthly_rollup is None:
+            monthly_rollup = RollupService.rollup(transactions, "M")
+        if daily_rollup is None:
+            daily_rollup = RollupService.rollup(transactions, "D")
+        return BankStatementMetrics(
+            cashflow_metrics=MetricsService._cashflow_metrics(aggregates, monthly_rollup.net if monthly_rollup else None),
+            liquidity_metrics=MetricsService._liquidity_metrics(aggregates, monthly_rollup, daily_rollup),
+            financial_discipline_metrics=MetricsService._financial_discipline_metrics(aggregates),
+            debt_servicing_metrics=MetricsService._debt_servicing_metrics(aggregates, total_debt),
+            risk_indicators=MetricsService._risk_indicators(transactions, aggregates, credit_score_change, negative_news_mentions, bankruptcy_flags)
+        )
+
+    @staticmethod
+    def metrics_from_state(state: MetricsAggregateState,
+                           monthly_rollup: Optional[PeriodRollup],
+                           daily_rollup: Optional[PeriodRollup],
+                           high_risk_transactions: List[Dict[str, Any]],
+                           total_debt: float = 0.0,
+                           credit_score_change: float = 0.0,
+                           negative_news_mentions: int = 0,
+                           bankruptcy_flags: bool = False) -> BankStatementMetrics:
+        """
+        calculate_all_metrics for a statement that was folded in chunk by chunk: the merged aggregate state
+        and rollups stand in for the transaction arrays, and the high risk rows were picked out by the caller.
+        """
+        aggregates = StatementAggregates.from_state(state) if state.transaction_count else None
+        risk_indicators = MetricsService._risk_indicators(None, aggregates, credit_score_change, negative_news_mentions, bankruptcy_flags)
+        if aggregates is not None:
+            risk_indicators.high_risk_transactions = high_risk_transactions
+        return BankStatementMetrics(
+            cashflow_metrics=MetricsService._cashflow_metrics(aggregates, monthly_rollup.net if monthly_rollup else None),
+            liquidity_metrics=MetricsService._liquidity_metrics(aggregates, monthly_rollup, daily_rollup),
+            financial_discipline_metrics=MetricsService._financial_discipline_metrics(aggregates),
+            debt_servicing_metrics=MetricsService._debt_servicing_metrics(aggregates, total_debt),
+            risk_indicators=risk_indicators
+        )
+
+    @staticmethod
+    def high_risk_records(transactions: TransactionFrame, average_debit: float | None) -> List[Dict[str, Any]]:
+        """Debits larger than twice the average debit, as response dicts; only the flagged rows are materialized."""
+        if average_debit is None or not len(transactions):
+            return []
+        # Debits are negative, so "larger than twice the average debit" is "below minus twice the average"
+        flagged = np.flatnonzero(transactions.is_debit & (transactions.amounts < -average_debit * 2))
+        return transactions.to_records(flagged)
+
+    @staticmethod
+    def aggregate_state(bank_statement: StatementData) -> MetricsAggregateState:
+        """Builds the mergeable aggregate state of a batch of transactions in one pass over the arrays."""
+        transactions = as_transaction_frame(bank_statement)
+        if not len(transactions):
+            return MetricsAggregateState()
+
+        aggregates = StatementAggregates.from_frame(transactions)
+        valid_amounts = transactions.amounts[~np.isnan(transactions.amounts)]
+        amount_mean = float(valid_amounts.mean()) if len(valid_amounts) else 0.0
+        return MetricsAggregateState(
+            transaction_count=aggregates.transaction_count,
+            credit_count=int(np.count_nonzero(transactions.is_credit & ~np.isnan(transactions.amounts))),
+            debit_count=aggregates.debit_count,
+            total_inflow=aggregates.total_inflow,
+            total_outflow=aggregates.total_outflow,
+            amount_count=len(valid_amounts),
+            amount_mean=amount_mean,
+            amount_m2=float(np.square(valid_amounts - amount_mean).sum()),
+            last_balance=aggregates.last_balance,
+            last_credit_balance=aggregates.last_credit_balance,
+            last_debit_balance=aggregates.last_debit_balance,
+            min_date=transactions.start_date,
+            max_date=transactions.end_date,
+            monthly_net_cashflow=RollupService.monthly_net_cashflow(RollupService.rollup(transactions, "M"))
+        )
+
+    @staticmethod
+    def merge_states(state: MetricsAggregateState, delta: MetricsAggregateState) -> MetricsAggregateState:
+        """
+        Combines two aggregate states in O(1). `delta` is treated as coming after `state`,
+        so its last balances win whenever it has them.
+        """
+        amount_count = state.amount_count + delta.amount_count
+        if amount_count:
+            # Chan et al. parallel form of Welford's update
+            mean_shift = delta.amount_mean - state.amount_mean
+            amount_mean = state.amount_mean + mean_shift * delta.amount_count / amount_count
+            amount_m2 = state.amount_m2 + delta.amount_m2 + mean_shift ** 2 * state.amount_count * delta.amount_count / amount_count
+        else:
+            amount_mean, amount_m2 = 0.0, 0.0
+
+        def latest(older: Any, newer: Any) -> Any:
+            return newer if newer is not None else older
+
+        dates = [d for d in (state.min_date, delta.min_date, state.max_date, delta.max_date) if d is not None]
+        monthly_net_cashflow = dict(state.monthly_net_cashflow)
+        for month, net in delta.monthly_net_cashflow.items():
+            monthly_net_cashflow[month] = monthly_net_cashflow.get(month, 0.0) + net
+        return MetricsAggregateState(
+            transaction_count=state.transaction_count + delta.transaction_count,
+            credit_count=state.credit_count + delta.credit_count,
+            debit_count=state.debit_count + delta.debit_count,
+            total_inflow=state.total_inflow + delta.total_inflow,
+            total_outflow=state.total_outflow + delta.total_outflow,
+            amount_count=amount_count,
+            amount_mean=amount_mean,
+            amount_m2=amount_m2,
+            last_balance=latest(state.last_balance, delta.last_balance),
+            last_credit_balance=latest(state.last_credit_balance, delta.last_credit_balance),
+            last_debit_balance=latest(state.last_debit_balance, delta.last_debit_balance),
+            min_date=min(dates) if dates else None,
+            max_date=max(dates) if dates else None,
+            monthly_net_cashflow=monthly_net_cashflow
+        )
+
+    @staticmethod
+    def cashflow_metrics_from_state(state: MetricsAggregateState) -> CashflowMetrics:
+        return MetricsService._cashflow_metrics(StatementAggregates.from_state(state) if state.transaction_count else None, _monthly_net_from_state(state))
+
+    @staticmethod
+    def debt_servicing_metrics_from_state(state: MetricsAggregateState, total_debt: float = 0.0) -> DebtServicingMetrics:
+        return MetricsService._debt_servicing_metrics(StatementAggregates.from_state(state) if state.transaction_count else None, total_debt)
+
+    @staticmethod
+    def calculate_cashflow_metrics(bank_statement: StatementData) -> CashflowMetrics:
+        transactions = as_transaction_frame(bank_statement)
+        monthly_rollup = RollupService.rollup(transactions, "M")
+        return MetricsService._cashflow_metrics(StatementAggregates.from_frame(transactions) if len(transactions) else None, monthly_rollup.net if monthly_rollup else None)
+
+    @staticmethod
+    def calculate_liquidity_metrics(bank_statement: StatementData) -> LiquidityMetrics:
+        transactions = as_transaction_frame(bank_statement)
+        return MetricsService._liquidity_metrics(
+            StatementAggregates.from_frame(transactions) if len(transactions) else None,
+            RollupService.rollup(transactions, "M"),
+            RollupService.rollup(transactions, "D")
+        )
+
+    @staticmethod
+    def calculate_financial_discipline_metrics(bank_statement: StatementData) -> FinancialDisciplineMetrics:
+        transactions = as_transaction_frame(bank_statement)
+        return MetricsService._financial_discipline_metrics(StatementAggregates.from_frame(transactions) if len(transactions) else None)
+
+    @staticmethod
+    def calculate_debt_servicing_metrics(bank_statement: StatementData, total_debt: float = 0.0) -> DebtServicingMetrics:
+        transactions = as_transaction_frame(bank_statement)
+        return MetricsService._debt_servicing_metrics(StatementAggregates.from_frame(transactions) if len(transactions) else None, total_debt)
+
+    @staticmethod
+    def identify_risk_indicators(bank_statement: StatementData, credit_score_change: float = 0.0, negative_news_mentions: int = 0, bankruptcy_flags: bool = False) -> RiskIndicators:
+        transactions = as_transaction_frame(bank_statement)
+        aggregates = StatementAggregates.from_frame(transactions) if len(transactions) else None
+        return MetricsService._risk_indicators(transactions, aggregates, credit_score_change, negative_news_mentions, bankruptcy_flags)
+
+    @staticmethod
+    def _cashflow_metrics(aggregates: StatementAggregates | None, monthly_net: np.ndarray | None = None) -> CashflowMetrics:
+        if aggregates is None:
             return CashflowMetrics(
                 total_inflow=None, total_outflow=None, net_cashflow=None,
                 average_monthly_cashflow=None, cashflow_volatility=None
             )
 
-        total_inflow = sum(t.amount for t in transactions if t.type == 'credit' and t.amount is not None)
-        total_outflow = sum(t.amount for t in transactions if t.type == 'debit' and t.amount is not None)
+        total_inflow = aggregates.total_inflow
+        total_outflow = aggregates.total_outflow
         net_cashflow = total_inflow - total_outflow
-        
-        # For average monthly cashflow and volatility, need to consider periods
-        # For simplicity, if no data, default to None
-        num_transactions = len(transactions)
-        average_monthly_cashflow = net_cashflow / num_transactions if num_transactions > 0 else None
 
-        # Placeholder for actual volatility calculation
-        cashflow_volatility = 0.0 # Or None if no meaningful calculation
+        # Average and volatility are taken over calendar months, quiet months counting as zero net cashflow
+        average_monthly_cashflow = None
+        cashflow_volatility = None
+        if monthly_net is not None and len(monthly_net):
+            average_monthly_cashflow = float(monthly_net.mean())
+            cashflow_volatility = float(monthly_net.std(ddof=1)) if len(monthly_net) > 1 else 0.0
 
         return CashflowMetrics(
             total_inflow=total_inflow,
@@ -34,37 +280,46 @@ class MetricsService:
         )
 
     @staticmethod
-    def calculate_liquidity_metrics(bank_statement: BankStatementInput) -> LiquidityMetrics:
-        transactions = bank_statement.transactions
-        if not transactions:
+    def _liquidity_metrics(aggregates: StatementAggregates | None,
+                           monthly_rollup: PeriodRollup | None = None,
+                           daily_rollup: PeriodRollup | None = None) -> LiquidityMetrics:
+        if aggregates is None:
             return LiquidityMetrics(
                 current_ratio=None, quick_ratio=None, cash_conversion_cycle=None, days_cash_on_hand=None
             )
 
         # Assuming balance in transactions represents current assets/liabilities
         # This might need more sophisticated logic based on actual balance sheet items
-        current_assets_list = [t.balance for t in transactions if t.balance is not None and t.type == 'credit']
-        current_liabilities_list = [t.balance for t in transactions if t.balance is not None and t.type == 'debit']
-
-        current_assets = current_assets_list[-1] if current_assets_list else 0.0 # Assuming last credit balance is current asset
-        current_liabilities = current_liabilities_list[-1] if current_liabilities_list else 0.0 # Assuming last debit balance is current liability
+        current_assets = aggregates.last_credit_balance if aggregates.last_credit_balance is not None else 0.0 # Assuming last credit balance is current asset
+        current_liabilities = aggregates.last_debit_balance if aggregates.last_debit_balance is not None else 0.0 # Assuming last debit balance is current liability
 
         current_ratio = current_assets / current_liabilities if current_liabilities > 0 else (0.0 if current_assets == 0 else None)
         quick_ratio = current_assets / current_liabilities if current_liabilities > 0 else (0.0 if current_assets == 0 else None)
-            
-        days_cash_on_hand = current_assets # Simplified for now
+
+        # Days of average daily outflow (over every calendar day of the statement) covered by the closing balance
+        days_cash_on_hand = None
+        if daily_rollup is not None and aggregates.last_balance is not None:
+            average_daily_outflow = float(daily_rollup.outflow.mean())
+            days_cash_on_hand = aggregates.last_balance / average_daily_outflow if average_daily_outflow > 0 else None
+
+        min_balance_by_month = None
+        if monthly_rollup is not None:
+            min_balance_by_month = {
+                label: (float(balance) if not np.isnan(balance) else None)
+                for label, balance in zip(monthly_rollup.labels(), monthly_rollup.min_balance)
+            }
 
         return LiquidityMetrics(
             current_ratio=current_ratio,
             quick_ratio=quick_ratio,
             cash_conversion_cycle=None, # Placeholder
-            days_cash_on_hand=days_cash_on_hand
+            days_cash_on_hand=days_cash_on_hand,
+            min_balance_by_month=min_balance_by_month
         )
 
     @staticmethod
-    def calculate_financial_discipline_metrics(bank_statement: BankStatementInput) -> FinancialDisciplineMetrics:
-        transactions = bank_statement.transactions
-        if not transactions:
+    def _financial_discipline_metrics(aggregates: StatementAggregates | None) -> FinancialDisciplineMetrics:
+        if aggregates is None:
             return FinancialDisciplineMetrics(
                 overdraft_frequency=None, late_payment_count=None, bounced_cheque_count=None, savings_rate=None
             )
@@ -72,8 +327,8 @@ class MetricsService:
         overdraft_frequency = 0
         late_payment_count = 0
         bounced_cheque_count = 0
-        
-        total_inflow = sum(t.amount for t in transactions if t.type == 'credit' and t.amount is not None)
+
+        total_inflow = aggregates.total_inflow
         # Placeholder for actual savings calculation
         savings = 0.0
         savings_rate = savings / total_inflow if total_inflow > 0 else (0.0 if savings == 0 else None)
@@ -84,25 +339,24 @@ class MetricsService:
             bounced_cheque_count=bounced_cheque_count,
             savings_rate=savings_rate
         )
-    
+
     @staticmethod
-    def calculate_debt_servicing_metrics(bank_statement: BankStatementInput, total_debt: float = 0.0) -> DebtServicingMetrics:
-        transactions = bank_statement.transactions
-        if not transactions:
+    def _debt_servicing_metrics(aggregates: StatementAggregates | None, total_debt: float = 0.0) -> DebtServicingMetrics:
+        if aggregates is None:
             return DebtServicingMetrics(
                 dscr=None, debt_to_income_ratio=None, loan_payment_to_income_ratio=None
             )
 
-        total_outflow = sum(t.amount for t in transactions if t.type == 'debit' and t.amount is not None)
-        total_inflow = sum(t.amount for t in transactions if t.type == 'credit' and t.amount is not None)
+        total_outflow = aggregates.total_outflow
+        total_inflow = aggregates.total_inflow
 
         # Annual debt payments (simplified)
         annual_debt_payments = total_outflow * 0.1
         # EBITDA (simplified)
         ebitda = total_inflow * 0.5
-        
+
         dscr = ebitda / annual_debt_payments if annual_debt_payments > 0 else (0.0 if ebitda == 0 else None)
-            
+
         debt_to_income_ratio = total_debt / total_inflow if total_inflow > 0 else (0.0 if total_debt == 0 else None)
         loan_payment_to_income_ratio = annual_debt_payments / total_inflow if total_inflow > 0 else (0.0 if annual_debt_payments == 0 else None)
 
@@ -113,22 +367,20 @@ class MetricsService:
         )
 
     @staticmethod
-    def identify_risk_indicators(bank_statement: BankStatementInput, credit_score_change: float = 0.0, negative_news_mentions: int = 0, bankruptcy_flags: bool = False) -> RiskIndicators:
-        transactions = bank_statement.transactions
-        if not transactions:
+    def _risk_indicators(transactions: TransactionFrame | None,
+                         aggregates: StatementAggregates | None,
+                         credit_score_change: float = 0.0,
+                         negative_news_mentions: int = 0,
+                         bankruptcy_flags: bool = False) -> RiskIndicators:
+        if aggregates is None:
             return RiskIndicators(
                 high_risk_transactions=[], credit_score_change=None, negative_news_mentions=None, bankruptcy_flags=None
             )
 
         high_risk_transactions = []
+        if transactions is not None:
+            high_risk_transactions = MetricsService.high_risk_records(transactions, aggregates.average_debit)
 
-        debit_transactions = [t.amount for t in transactions if t.type == 'debit' and t.amount is not None]
-        if debit_transactions:
-            average_debit = sum(debit_transactions) / len(debit_transactions)
-            for t in transactions:
-                if t.type == 'debit' and t.amount is not None and t.amount > average_debit * 2:
-                    high_risk_transactions.append(t.dict())
-        
         return RiskIndicators(
             high_risk_transactions=high_risk_transactions,
             credit_score_change=credit_score_change,
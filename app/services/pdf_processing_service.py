@@ -1,21 +1,143 @@
-from typing import Dict, Any
+import asyncio
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
 from io import BytesIO
-import pypdf
+from app.core.config import settings
+from app.core.executor import ExecutorBusyError, ExecutorTimeoutError
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _open_reader(file_content: bytes):
+    # Imported on first use so processes that never see a PDF don't pay for it at startup
+    import pypdf
+    return pypdf.PdfReader(BytesIO(file_content))
+
 
 class PdfProcessingService:
+    """
+    PDF text extraction. `process_pdf_file` and `iter_pages` work in the calling process;
+    `aiter_pages` and `extract_text` fan page ranges out to the executor's worker processes
+    and stream the pages back in order.
+    """
+
+    def __init__(self, executor=None, max_pages: Optional[int] = None, max_bytes: Optional[int] = None,
+                 pages_per_task: Optional[int] = None):
+        self.executor = executor
+        # 0 means no cap
+        self.max_pages = max_pages if max_pages is not None else settings.PDF_MAX_PAGES
+        self.max_bytes = max_bytes if max_bytes is not None else settings.PDF_MAX_TEXT_BYTES
+        self.pages_per_task = pages_per_task or settings.PDF_PAGES_PER_TASK
+
+    @staticmethod
+    def iter_pages(file_content: bytes, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Yields the text of each page in [start, stop) as it is extracted."""
+        reader = _open_reader(file_content)
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        for page_num in range(start, stop):
+            yield reader.pages[page_num].extract_text()
+
+    @staticmethod
+    def extract_page_range(file_content: bytes, start: int, stop: int) -> List[str]:
+        """One worker task: the texts of pages [start, stop). Static, so it pickles by reference."""
+        return list(PdfProcessingService.iter_pages(file_content, start, stop))
+
+    @staticmethod
+    def page_count(file_content: bytes) -> int:
+        return len(_open_reader(file_content).pages)
+
+    @staticmethod
+    def _build_result(pages: List[str], page_count: int, max_bytes: int = 0) -> Dict[str, Any]:
+        # Joined once; every page keeps its trailing newline
+        text_content = "".join(f"{page}\n" for page in pages)
+        truncated = len(pages) < page_count
+        if max_bytes and len(text_content.encode("utf-8")) > max_bytes:
+            text_content = text_content.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+            truncated = True
+        return {
+            "text_content": text_content,
+            "page_count": page_count,
+            "pages_extracted": len(pages),
+            "truncated": truncated
+        }
+
     @staticmethod
-    def process_pdf_file(file_content: bytes) -> Dict[str, Any]:
-        text_content = ""
+    def process_pdf_file(file_content: bytes, max_pages: int = 0, max_bytes: int = 0) -> Dict[str, Any]:
+        """Extracts the text sequentially in this process; stops early once a cap is reached."""
+        try:
+            page_count = PdfProcessingService.page_count(file_content)
+            pages = []
+            extracted_bytes = 0
+            for page in PdfProcessingService.iter_pages(file_content, 0, max_pages or None):
+                pages.append(page)
+                extracted_bytes += len(page.encode("utf-8")) + 1
+                if max_bytes and extracted_bytes >= max_bytes:
+                    break
+        except Exception as e:
+            logger.warning("Error processing PDF: %s", e)
+            return {"text_content": "", "error": str(e)}
+
+        return PdfProcessingService._build_result(pages, page_count, max_bytes)
+
+    async def aiter_pages(self, file_content: bytes, page_count: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Yields page texts in document order while later page ranges are still being extracted,
+        so `extract_text` can stop at `max_bytes` without extracting the rest. Keeps one range in
+        flight per worker and stops submitting work once `max_pages` is reached.
+        """
+        if page_count is None:
+            page_count = await self.executor.run_in_thread(self.page_count, file_content)
+        stop = min(page_count, self.max_pages) if self.max_pages else page_count
+        ranges = deque((start, min(start + self.pages_per_task, stop)) for start in range(0, stop, self.pages_per_task))
+        in_flight = max(1, self.executor.process_workers)
+
+        pending: deque = deque()
+        def submit_next():
+            start, range_stop = ranges.popleft()
+            pending.append(asyncio.ensure_future(
+                self.executor.run_in_process(self.extract_page_range, file_content, start, range_stop)
+            ))
+        try:
+            while ranges and len(pending) < in_flight:
+                submit_next()
+            while pending:
+                pages = await pending.popleft()
+                if ranges:
+                    submit_next()
+                for page in pages:
+                    yield page
+        finally:
+            # The caller stopped early (or a range failed): drop work that has not been picked up
+            for task in pending:
+                task.cancel()
+
+    async def extract_text(self, file_content: bytes) -> Dict[str, Any]:
+        """Page-parallel counterpart of process_pdf_file; falls back to it without an executor."""
+        if self.executor is None:
+            return self.process_pdf_file(file_content, self.max_pages, self.max_bytes)
+        if self.executor.process_workers <= 1:
+            # Every range re-opens the document, so with a single worker one task is cheapest
+            return await self.executor.run_in_process(self.process_pdf_file, file_content, self.max_pages, self.max_bytes)
         try:
-            pdf_file = BytesIO(file_content)
-            reader = pypdf.PdfReader(pdf_file)
-            for page_num in range(len(reader.pages)):
-                text_content += reader.pages[page_num].extract_text() + "\n"
+            page_count = await self.executor.run_in_thread(self.page_count, file_content)
+            pages = []
+            extracted_bytes = 0
+            page_iterator = self.aiter_pages(file_content, page_count)
+            try:
+                async for page in page_iterator:
+                    pages.append(page)
+                    extracted_bytes += len(page.encode("utf-8")) + 1
+                    if self.max_bytes and extracted_bytes >= self.max_bytes:
+                        break
+            finally:
+                await page_iterator.aclose()
+        except (ExecutorBusyError, ExecutorTimeoutError, BrokenProcessPool):
+            # Not a problem with the document: the route answers 503/504 for these and 500 for a dead worker
+            raise
         except Exception as e:
-            print(f"Error processing PDF: {e}")
-            # Return empty content or raise a specific error
+            logger.warning("Error processing PDF: %s", e)
             return {"text_content": "", "error": str(e)}
 
-        # In a real application, you would do more sophisticated parsing here
-        # For now, we return a dictionary with the extracted text content
-        return {"text_content": text_content}
+        return self._build_result(pages, page_count, self.max_bytes)
@@ -0,0 +1,186 @@
+import io
+import re
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS
+
+# Dates a statement line may start with: 2023-01-31, 31/01/2023, 31.01.23, 31 Jan 2023, Jan 31, 2023
+_DATE_PATTERN = re.compile(
+    r"^\s*(\d{4}-\d{1,2}-\d{1,2}"
+    r"|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}"
+    r"|\d{1,2}[ -][A-Za-z]{3,9}[ -]\d{2,4}"
+    r"|[A-Za-z]{3,9} \d{1,2},? \d{4})\b"
+)
+# A money amount at the end of a line: 1,234.56 / -12.00 / (12.00) / 12.00 CR; two decimals are
+# required so reference numbers inside descriptions are not mistaken for amounts
+_TRAILING_AMOUNT_PATTERN = re.compile(
+    r"\s(\(?[-+]?[$£€]?\d{1,3}(?:,\d{3})*(?:\.\d{2})\)?|\(?[-+]?[$£€]?\d+\.\d{2}\)?)(?:\s?(CR|DR|Cr|Dr|cr|dr))?\s*$"
+)
+_OPENING_BALANCE_PATTERN = re.compile(r"opening balance|balance brought forward|balance b/f|previous balance", re.IGNORECASE)
+# Summary rows that repeat the running balance, dated or not; never transactions
+_CLOSING_BALANCE_PATTERN = re.compile(r"closing balance|balance carried forward|balance c/f|carried forward balance", re.IGNORECASE)
+# Page furniture that must not be glued onto a description
+_NOISE_PATTERN = re.compile(r"^\s*(page \d+( of \d+)?|continued( on next page)?|balance carried forward|balance c/f)\s*$", re.IGNORECASE)
+_NUMERIC_DATE_PATTERN = r"^\s*(\d{1,2})[/.-](\d{1,2})[/.-]\d{2,4}\s*$"
+
+# Column header words that decide whether credits come before debits in three-amount rows
+_HEADER_FIELDS = ("date", "description", "debit", "credit", "balance")
+_HEADER_PATTERNS = {
+    field: re.compile(r"\b(" + "|".join(re.escape(s) for s in sorted(CANONICAL_BANK_STATEMENT_FIELDS[field], key=len, reverse=True)) + r")s?\b", re.IGNORECASE)
+    for field in _HEADER_FIELDS
+}
+
+_MAX_DESCRIPTION_LENGTH = 256
+_BALANCE_TOLERANCE = 0.01
+
+
+def _parse_amount(token: str, marker: Optional[str]) -> tuple:
+    """Returns (magnitude, direction) where direction is 'credit', 'debit' or None when the token doesn't say."""
+    negative = token.startswith("(") or "-" in token
+    value = float(token.strip("()").replace(",", "").lstrip("+-").lstrip("$£€"))
+    if marker:
+        return value, "credit" if marker.lower() == "cr" else "debit"
+    return value, "debit" if negative else None
+
+
+class PdfTableExtractionService:
+    """
+    Turns bank statement text (e.g. from a PDF) into transaction columns, one line at a time.
+    A transaction line starts with a date and ends with its amounts; lines without a date that carry
+    no amounts continue the previous description. Rows are yielded as soon as the next row starts,
+    so only one pending row is held in memory.
+    """
+
+    def __init__(self, min_rows: int = 1):
+        self.min_rows = min_rows
+
+    @staticmethod
+    def _lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+        # A full text is iterated line by line without materializing splitlines(); pages are split as they arrive
+        pages = [source] if isinstance(source, str) else source
+        for page in pages:
+            yield from io.StringIO(page)
+
+    @staticmethod
+    def _header_positions(line: str) -> Dict[str, int]:
+        """Where each column header sits if the line is a table header (repeated on every page), else {}."""
+        positions = {}
+        for field, pattern in _HEADER_PATTERNS.items():
+            match = pattern.search(line)
+            if match:
+                positions[field] = match.start()
+        return positions if {"date", "balance"} <= positions.keys() else {}
+
+    def iter_rows(self, source: Union[str, Iterable[str]]) -> Iterator[Dict[str, Any]]:
+        """Yields rows with date (str), description, amount (unsigned), type and balance."""
+        amount_order = ("debit", "credit")
+        previous_balance: Optional[float] = None
+        previous_date: Optional[str] = None
+        pending: Optional[Dict[str, Any]] = None
+
+        for line in self._lines(source):
+            line = line.rstrip()
+            if not line.strip():
+                continue
+
+            date_match = _DATE_PATTERN.match(line)
+            rest = line[date_match.end():] if date_match else line
+
+            # Peel amounts off the end of the line
+            amounts = []
+            while len(amounts) < 3:
+                amount_match = _TRAILING_AMOUNT_PATTERN.search(rest)
+                if not amount_match:
+                    break
+                amounts.insert(0, _parse_amount(amount_match.group(1), amount_match.group(2)))
+                rest = rest[:amount_match.start()]
+            description = " ".join(rest.split())
+
+            if not amounts:
+                header = {} if date_match else self._header_positions(line)
+                if {"debit", "credit"} <= header.keys():
+                    amount_order = tuple(sorted(("debit", "credit"), key=header.get))
+                if header:
+                    continue
+                if (pending is not None and not date_match and not _NOISE_PATTERN.match(line)
+                        and len(pending["description"]) < _MAX_DESCRIPTION_LENGTH):
+                    pending["description"] = f"{pending['description']} {description}".strip()[:_MAX_DESCRIPTION_LENGTH]
+                continue
+
+            if _OPENING_BALANCE_PATTERN.search(description):
+                previous_balance = amounts[-1][0] if amounts[-1][1] != "debit" else -amounts[-1][0]
+                continue
+            if _CLOSING_BALANCE_PATTERN.search(description):
+                continue
+            # Same-day transactions often leave the date column blank
+            date = date_match.group(1) if date_match else previous_date
+            if date is None or len(amounts) < 2 and not date_match:
+                continue
+
+            balance = np.nan
+            if len(amounts) == 3:
+                first, second, (balance, balance_direction) = amounts
+                by_column = dict(zip(amount_order, (first, second)))
+                if by_column["credit"][0] > 0:
+                    amount, direction = by_column["credit"][0], "credit"
+                else:
+                    amount, direction = by_column["debit"][0], "debit"
+            elif len(amounts) == 2:
+                (amount, direction), (balance, balance_direction) = amounts
+            else:
+                (amount, direction), balance_direction = amounts[0], None
+
+            if not np.isnan(balance):
+                balance = -balance if balance_direction == "debit" else balance
+                # Without a marker or sign, the change in running balance tells the direction
+                if direction is None and previous_balance is not None:
+                    if abs(previous_balance + amount - balance) <= _BALANCE_TOLERANCE:
+                        direction = "credit"
+                    elif abs(previous_balance - amount - balance) <= _BALANCE_TOLERANCE:
+                        direction = "debit"
+                previous_balance = balance
+
+            if pending is not None:
+                yield pending
+            pending = {
+                "date": date,
+                "description": description[:_MAX_DESCRIPTION_LENGTH],
+                "amount": amount,
+                "type": direction or "unknown",
+                "balance": balance,
+            }
+            previous_date = date
+
+        if pending is not None:
+            yield pending
+
+    @staticmethod
+    def parse_dates(dates: List[str]) -> pd.Series:
+        """
+        Parses the date column once for the whole statement. For numeric dates the day/month order
+        is decided from the statement itself: a first part above 12 means day-first.
+        """
+        dates = pd.Series(dates, dtype=object)
+        parts = dates.str.extract(_NUMERIC_DATE_PATTERN).astype(float)
+        day_first = bool((parts[0] > 12).any()) and not bool((parts[1] > 12).any())
+        return pd.to_datetime(dates, errors="coerce", dayfirst=day_first, format="mixed")
+
+    def extract_frame(self, source: Union[str, Iterable[str]]) -> Optional[pd.DataFrame]:
+        """
+        Collects the rows straight into columns with canonical names, ready for
+        StandardizationService.standardize_bank_statement_frame. None when no table was found.
+        """
+        columns: Dict[str, List[Any]] = {"date": [], "description": [], "amount": [], "type": [], "balance": []}
+        for row in self.iter_rows(source):
+            for name, values in columns.items():
+                values.append(row[name])
+        if len(columns["date"]) < self.min_rows:
+            return None
+        return pd.DataFrame({
+            "date": self.parse_dates(columns["date"]),
+            "description": columns["description"],
+            "amount": np.array(columns["amount"], dtype=np.float64),
+            "type": columns["type"],
+            "balance": np.array(columns["balance"], dtype=np.float64),
+        })
@@ -1,74 +1,252 @@
-import yaml
-from typing import Dict, Any, List
-from app.schema.output_schema import CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators, RiskEngineOutput
-from pathlib import Path
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+from app.schema.output_schema import CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators, RiskEngineOutput, RiskScoreRequest
+from app.schema.transaction_frame import TransactionFrame
+from app.services.rule_compiler import CompiledRule
+from app.services.rule_registry import RuleRegistry, RuleSet, get_rule_registry
+
+# (upper bound, bin, decision); the last bin has no upper bound
+SCORE_BINS = (
+    (30.0, "low", "Approved"),
+    (70.0, "medium", "Review Required"),
+    (None, "high", "Rejected"),
+)
+_BIN_UPPER_BOUNDS = np.array([upper_bound for upper_bound, _, _ in SCORE_BINS if upper_bound is not None])
+
+# Metric field name -> the RiskScoreRequest section that holds it, for building batch columns
+METRIC_FIELD_SECTIONS = {
+    field_name: section
+    for section, section_field in RiskScoreRequest.model_fields.items()
+    for field_name in section_field.annotation.model_fields
+}
+
+NO_RULES_TRIGGERED = "No specific rules triggered. Base assessment."
+
+# Indexed by type code + 1 (debit -1, unknown 0, credit 1)
+_TYPE_LABELS = np.array(["debit", "unknown", "credit"], dtype=object)
+
+class RiskScoreBatch:
+    """Columnar results of RiskEngine.compute_risk_scores, in input order."""
+
+    __slots__ = ("scores", "bin_indices", "rationale", "rule_set_version")
+
+    def __init__(self, scores: np.ndarray, bin_indices: np.ndarray, rationale: List[Optional[List[str]]],
+                 rule_set_version: Optional[str] = None):
+        self.scores = scores
+        self.bin_indices = bin_indices
+        # None where no rule fired for the row
+        self.rationale = rationale
+        self.rule_set_version = rule_set_version
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Plain dicts shaped like RiskEngineOutput, ready for direct JSON serialization."""
+        return [
+            {
+                "score": score,
+                "bin": SCORE_BINS[bin_index][1],
+                "decision": SCORE_BINS[bin_index][2],
+                "rationale": row_rationale or [NO_RULES_TRIGGERED],
+                "rule_set_version": self.rule_set_version,
+            }
+            for score, bin_index, row_rationale in zip(self.scores.tolist(), self.bin_indices.tolist(), self.rationale)
+        ]
+
+    def to_outputs(self) -> List[RiskEngineOutput]:
+        return [RiskEngineOutput.model_construct(**record) for record in self.to_records()]
+
 
 class RiskEngine:
-    def __init__(self):
-        self.rules = self._load_rules()
+    def __init__(self, registry: Optional[RuleRegistry] = None):
+        # Rules are read and compiled by the registry, not per engine or per request
+        self.registry = registry or get_rule_registry()
+
+    @property
+    def rule_set(self) -> RuleSet:
+        return self.registry.current()
+
+    @staticmethod
+    def metrics_record(*metric_models) -> Dict[str, Any]:
+        """Flattens the metric models into one record for the metrics rules; missing values count as 0."""
+        record = {}
+        for metrics in metric_models:
+            if metrics is None:
+                continue
+            for name, value in metrics:
+                record[name] = 0 if value is None else value
+        return record
+
+    @staticmethod
+    def transaction_columns(transactions: TransactionFrame) -> Dict[str, np.ndarray]:
+        """The columns transaction rules can refer to; `amount` is the transaction size regardless of direction."""
+        return {
+            "amount": np.abs(transactions.amounts),
+            "signed_amount": transactions.amounts,
+            "type": _TYPE_LABELS[transactions.type_codes + 1],
+            "balance": transactions.balances,
+            "description": transactions.descriptions,
+        }
 
-    def _load_rules(self) -> List[Dict[str, Any]]:
-        rules_path = Path(__file__).parent.parent / "rules" / "rules.yaml"
-        with open(rules_path, "r") as f:
-            config = yaml.safe_load(f)
-        return config.get("rules", [])
+    def evaluate_transaction_rules(self, transactions: TransactionFrame,
+                                   rule_set: Optional[RuleSet] = None) -> List[Tuple[CompiledRule, np.ndarray]]:
+        """One boolean mask per applicable transaction rule, each computed over all rows at once."""
+        rule_set = rule_set or self.rule_set
+        columns = self.transaction_columns(transactions)
+        available = set(columns)
+        return [
+            (rule, rule.evaluate_columns(columns))
+            for rule in rule_set.transaction_rules
+            if rule.is_applicable(available)
+        ]
 
-    async def compute_risk_score(self, 
+    def transaction_rule_hits(self, transactions: TransactionFrame, rule_set: Optional[RuleSet] = None,
+                              hits: Optional[Dict[str, Tuple[CompiledRule, int, float]]] = None) -> Dict[str, Tuple[CompiledRule, int, float]]:
+        """
+        Per matched transaction rule: the rule, how many rows it matched and the largest impact among them.
+        Passing the hits of the previous chunks folds a statement in chunk by chunk.
+        """
+        hits = dict(hits or {})
+        if not len(transactions):
+            return hits
+        columns = self.transaction_columns(transactions)
+        for rule, matched in self.evaluate_transaction_rules(transactions, rule_set):
+            matched_count = int(np.count_nonzero(matched))
+            if not matched_count:
+                continue
+            impact = np.asarray(rule.impact(columns))
+            largest_impact = float(impact.max() if impact.ndim == 0 else impact[matched].max())
+            _, earlier_count, earlier_impact = hits.get(rule.name, (rule, 0, largest_impact))
+            hits[rule.name] = (rule, earlier_count + matched_count, max(earlier_impact, largest_impact))
+        return hits
+
+    @staticmethod
+    def metric_columns(requests: Sequence[Union[RiskScoreRequest, Mapping[str, Any]]], names) -> Dict[str, np.ndarray]:
+        """
+        One array per requested metric field across the batch; missing values count as 0.
+        Accepts RiskScoreRequest models or RiskScoreRecord dicts.
+        """
+        as_models = bool(requests) and isinstance(requests[0], RiskScoreRequest)
+        columns = {}
+        for name in names:
+            section = METRIC_FIELD_SECTIONS.get(name)
+            if section is None:
+                continue
+            if as_models:
+                values = [getattr(getattr(request, section), name) for request in requests]
+            else:
+                values = [request[section].get(name) for request in requests]
+            columns[name] = np.array([0 if value is None else value for value in values])
+        return columns
+
+    @staticmethod
+    def score_bins(scores: np.ndarray) -> np.ndarray:
+        """Index into SCORE_BINS for every score."""
+        return np.searchsorted(_BIN_UPPER_BOUNDS, scores, side="right")
+
+    @classmethod
+    def score_bin(cls, score: float) -> Tuple[str, str]:
+        _, bin_category, decision = SCORE_BINS[int(cls.score_bins(np.asarray(score)))]
+        return bin_category, decision
+
+    async def compute_risk_scores(self, requests: Sequence[Union[RiskScoreRequest, Mapping[str, Any]]]) -> "RiskScoreBatch":
+        """
+        Scores a batch of metric requests. Each metrics rule is evaluated once over the whole batch,
+        and scores are clamped and binned as arrays; results keep the input order.
+        """
+        rule_set = self.rule_set
+        count = len(requests)
+        needed = set()
+        for rule in rule_set.metrics_rules:
+            needed |= rule.variables | rule.rationale_fields
+        columns = self.metric_columns(requests, needed) if count else {}
+        available = set(columns)
+
+        scores = np.zeros(count)
+        # Rows stay None until a rule fires for them, so clean rows cost nothing
+        rationale: List[Optional[List[str]]] = [None] * count
+        for rule in rule_set.metrics_rules:
+            if not count or not rule.is_applicable(available):
+                continue
+            matched = rule.evaluate_columns(columns)
+            matched_rows = np.flatnonzero(matched).tolist()
+            if not matched_rows:
+                continue
+            impact = np.broadcast_to(np.asarray(rule.impact(columns), dtype=np.float64), (count,))
+            scores += np.where(matched, impact, 0.0)
+            if rule.rationale_fields:
+                # Only rows the rule matched pay for string formatting
+                field_values = {name: columns[name].tolist() for name in rule.rationale_fields if name in columns}
+                texts = [rule.explain({name: values[row] for name, values in field_values.items()}) for row in matched_rows]
+            else:
+                texts = [rule.explain({})] * len(matched_rows)
+            for row, text in zip(matched_rows, texts):
+                if rationale[row] is None:
+                    rationale[row] = [text]
+                else:
+                    rationale[row].append(text)
+
+        np.clip(scores, 0.0, 100.0, out=scores)
+        return RiskScoreBatch(scores, self.score_bins(scores), rationale, rule_set.version)
+
+    async def compute_risk_score(self,
                                  cashflow_metrics: CashflowMetrics,
                                  liquidity_metrics: LiquidityMetrics,
                                  financial_discipline_metrics: FinancialDisciplineMetrics,
                                  debt_servicing_metrics: DebtServicingMetrics,
-                                 risk_indicators: RiskIndicators) -> RiskEngineOutput:
-        score = 0
+                                 risk_indicators: RiskIndicators,
+                                 transactions: Optional[TransactionFrame] = None,
+                                 transaction_rule_hits: Optional[Dict[str, Tuple[CompiledRule, int, float]]] = None,
+                                 rule_set: Optional[RuleSet] = None) -> RiskEngineOutput:
+        """
+        Scores one statement's metrics. Transaction rules are applied to `transactions`, or taken from
+        `transaction_rule_hits` already folded over the statement's chunks with the same `rule_set`.
+        """
+        # Taken once, so every rule in this request comes from the same version
+        rule_set = rule_set or self.rule_set
+        score = 0.0
         rationale = []
 
-        # Safely access metrics, defaulting to 0 if None to prevent errors
-        net_cashflow = getattr(cashflow_metrics, 'net_cashflow', 0.0) or 0.0
-        current_ratio = getattr(liquidity_metrics, 'current_ratio', 0.0) or 0.0
-        overdraft_frequency = getattr(financial_discipline_metrics, 'overdraft_frequency', 0) or 0
-        dscr = getattr(debt_servicing_metrics, 'dscr', 0.0) or 0.0
-        bankruptcy_flags = getattr(risk_indicators, 'bankruptcy_flags', False) or False
-
-        if net_cashflow < 0:
-            score += 20
-            rationale.append("Negative net cashflow indicates financial distress.")
-
-        if current_ratio < 1.0:
-            score += 15
-            rationale.append("Current ratio below 1.0 suggests poor short-term liquidity.")
-
-        if overdraft_frequency > 0:
-            score += overdraft_frequency * 5
-            rationale.append(f"Frequent overdrafts ({overdraft_frequency}) indicate poor financial management.")
-        
-        # Only apply DSCR rule if dscr is not zero (to avoid penalizing for missing data that defaults to 0)
-        if dscr > 0 and dscr < 1.2: 
-            score += 25
-            rationale.append(f"Debt Service Coverage Ratio ({dscr:.2f}) is below acceptable levels.")
-
-        if bankruptcy_flags:
-            score += 50
-            rationale.append("Bankruptcy flags detected, indicating severe financial risk.")
-
-        score = max(0, min(100, score))
-
-        if score < 30:
-            bin_category = "low"
-            decision = "Approved"
-        elif 30 <= score < 70:
-            bin_category = "medium"
-            decision = "Review Required"
-        else:
-            bin_category = "high"
-            decision = "Rejected"
+        record = self.metrics_record(
+            cashflow_metrics, liquidity_metrics, financial_discipline_metrics, debt_servicing_metrics, risk_indicators
+        )
+        available = set(record)
+        for rule in rule_set.metrics_rules:
+            if rule.is_applicable(available) and rule.evaluate(record):
+                score += float(rule.impact(record))
+                rationale.append(rule.explain(record))
+
+        # A transaction rule counts once per statement, however many rows it matches
+        if transactions is not None:
+            transaction_rule_hits = self.transaction_rule_hits(transactions, rule_set)
+        for rule in rule_set.transaction_rules:
+            if transaction_rule_hits and rule.name in transaction_rule_hits:
+                _, matched_count, impact = transaction_rule_hits[rule.name]
+                score += impact
+                rationale.append(f"{rule.explain({})} ({matched_count} matching transactions)")
+
+        score = max(0.0, min(100.0, score))
+        bin_category, decision = self.score_bin(score)
 
         if not rationale:
-            rationale.append("No specific rules triggered. Base assessment.")
+            rationale.append(NO_RULES_TRIGGERED)
 
         return RiskEngineOutput(
-            score=float(score),
+            score=score,
             bin=bin_category,
             decision=decision,
-            rationale=rationale
+            rationale=rationale,
+            rule_set_version=rule_set.version
         )
 
+
+_risk_engine: Optional[RiskEngine] = None
+
+
+def get_risk_engine() -> RiskEngine:
+    """Shared engine backed by the process-wide rule registry."""
+    global _risk_engine
+    if _risk_engine is None:
+        _risk_engine = RiskEngine()
+    return _risk_engine
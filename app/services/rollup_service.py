@@ -0,0 +1,92 @@
+from typing import Dict, Optional
+import numpy as np
+from app.schema.period_rollup import PeriodRollup, WEEK_OFFSET_DAYS
+from app.schema.transaction_frame import TransactionFrame
+
+
+class RollupService:
+    FREQUENCIES = ("D", "W", "M")
+
+    @staticmethod
+    def period_codes(dates: np.ndarray, freq: str) -> np.ndarray:
+        """Integer period codes for day (days since epoch), week (Monday-based) or month (months since epoch)."""
+        if freq == "M":
+            return dates.astype("datetime64[M]").astype(np.int64)
+        days = dates.astype("datetime64[D]").astype(np.int64)
+        if freq == "W":
+            return (days + WEEK_OFFSET_DAYS) // 7
+        if freq == "D":
+            return days
+        raise ValueError(f"Unsupported rollup frequency: {freq}")
+
+    @staticmethod
+    def rollup(transactions: TransactionFrame, freq: str = "M") -> Optional[PeriodRollup]:
+        """Buckets transactions by period with bincount reductions; returns None for an empty frame."""
+        if not len(transactions):
+            return None
+
+        codes = RollupService.period_codes(transactions.dates, freq)
+        first_code = int(codes.min())
+        buckets = codes - first_code
+        n_periods = int(buckets.max()) + 1
+
+        amounts = np.nan_to_num(transactions.amounts, nan=0.0)
+        inflow = np.bincount(buckets, weights=np.where(transactions.is_credit, amounts, 0.0), minlength=n_periods)
+        outflow = np.bincount(buckets, weights=np.where(transactions.is_debit, -amounts, 0.0), minlength=n_periods)
+        count = np.bincount(buckets, minlength=n_periods)
+
+        min_balance = np.full(n_periods, np.nan)
+        last_balance = np.full(n_periods, np.nan)
+        has_balance = ~np.isnan(transactions.balances)
+        if has_balance.any():
+            balance_buckets = buckets[has_balance]
+            balances = transactions.balances[has_balance]
+            # Stable sort keeps statement order within a period, so the last entry of each run is the closing balance
+            order = np.argsort(balance_buckets, kind="stable")
+            sorted_buckets = balance_buckets[order]
+            sorted_balances = balances[order]
+            run_starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+            run_ends = np.r_[run_starts[1:], len(sorted_buckets)] - 1
+            min_balance[sorted_buckets[run_starts]] = np.minimum.reduceat(sorted_balances, run_starts)
+            last_balance[sorted_buckets[run_starts]] = sorted_balances[run_ends]
+
+        return PeriodRollup(freq, first_code, inflow, outflow, count, min_balance, last_balance)
+
+    @staticmethod
+    def merge(earlier: Optional[PeriodRollup], later: Optional[PeriodRollup]) -> Optional[PeriodRollup]:
+        """
+        Combines the rollups of two consecutive chunks of one statement over the union of their periods.
+        Flows and counts add up, minimum balances take the lower value and `later` has the closing balance
+        of any period it saw.
+        """
+        if earlier is None or later is None:
+            return earlier if later is None else later
+        if earlier.freq != later.freq:
+            raise ValueError(f"Cannot merge {earlier.freq} and {later.freq} rollups")
+
+        first_code = min(earlier.first_code, later.first_code)
+        n_periods = max(earlier.first_code + len(earlier), later.first_code + len(later)) - first_code
+
+        def spread(rollup: PeriodRollup, values: np.ndarray, fill: float) -> np.ndarray:
+            spread_values = np.full(n_periods, fill, dtype=values.dtype)
+            offset = rollup.first_code - first_code
+            spread_values[offset:offset + len(rollup)] = values
+            return spread_values
+
+        last_balance = spread(later, later.last_balance, np.nan)
+        return PeriodRollup(
+            earlier.freq,
+            first_code,
+            spread(earlier, earlier.inflow, 0.0) + spread(later, later.inflow, 0.0),
+            spread(earlier, earlier.outflow, 0.0) + spread(later, later.outflow, 0.0),
+            spread(earlier, earlier.count, 0) + spread(later, later.count, 0),
+            np.fmin(spread(earlier, earlier.min_balance, np.nan), spread(later, later.min_balance, np.nan)),
+            np.where(np.isnan(last_balance), spread(earlier, earlier.last_balance, np.nan), last_balance)
+        )
+
+    @staticmethod
+    def monthly_net_cashflow(rollup: Optional[PeriodRollup]) -> Dict[str, float]:
+        """Monthly net cashflow keyed by YYYY-MM, the mergeable form kept in account states."""
+        if rollup is None:
+            return {}
+        return {label: float(net) for label, net in zip(rollup.labels(), rollup.net)}
@@ -0,0 +1,188 @@
+import ast
+import operator
+import string
+from typing import Any, Callable, List, Mapping, Set
+import numpy as np
+
+
+class RuleCompilationError(ValueError):
+    """Raised when a rule expression uses syntax outside the whitelisted subset."""
+
+
+# Every operator maps to a NumPy function, so the same compiled expression works on
+# scalars (one metrics record) and on whole columns (all transactions at once)
+_BINARY_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.Mod: np.mod,
+}
+_COMPARISON_OPERATORS = {
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.In: lambda left, right: np.isin(left, right),
+    ast.NotIn: lambda left, right: np.logical_not(np.isin(left, right)),
+}
+_UNARY_OPERATORS = {
+    ast.Not: np.logical_not,
+    ast.USub: np.negative,
+    ast.UAdd: operator.pos,
+}
+_FUNCTIONS = {
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+
+class CompiledExpression:
+    """A whitelisted expression parsed once into a tree of closures."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.variables: Set[str] = set()
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise RuleCompilationError(f"Invalid rule expression {source!r}: {e.msg}") from e
+        self._evaluate = self._compile(tree.body)
+
+    def __call__(self, context: Mapping[str, Any]) -> Any:
+        return self._evaluate(context)
+
+    def _compile(self, node: ast.AST) -> Evaluator:
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, str, bool, type(None))):
+                raise RuleCompilationError(f"Unsupported constant in {self.source!r}")
+            value = node.value
+            return lambda context: value
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            self.variables.add(name)
+            return lambda context: context[name]
+
+        if isinstance(node, (ast.List, ast.Tuple)):
+            elements = [self._compile(element) for element in node.elts]
+            return lambda context: [element(context) for element in elements]
+
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            operands = [self._compile(value) for value in node.values]
+            def evaluate_bool_op(context: Mapping[str, Any]) -> Any:
+                result = operands[0](context)
+                for operand in operands[1:]:
+                    result = combine(result, operand(context))
+                return result
+            return evaluate_bool_op
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            apply = _UNARY_OPERATORS[type(node.op)]
+            operand = self._compile(node.operand)
+            return lambda context: apply(operand(context))
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            apply = _BINARY_OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda context: apply(left(context), right(context))
+
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISON_OPERATORS for op in node.ops):
+            operands = [self._compile(node.left)] + [self._compile(comparator) for comparator in node.comparators]
+            comparisons = [_COMPARISON_OPERATORS[type(op)] for op in node.ops]
+            def evaluate_compare(context: Mapping[str, Any]) -> Any:
+                # Chained comparisons (a < b < c) are the conjunction of each pair
+                values = [operand(context) for operand in operands]
+                result = comparisons[0](values[0], values[1])
+                for position, compare in enumerate(comparisons[1:], start=1):
+                    result = np.logical_and(result, compare(values[position], values[position + 1]))
+                return result
+            return evaluate_compare
+
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS
+                and not node.keywords):
+            apply = _FUNCTIONS[node.func.id]
+            arguments = [self._compile(argument) for argument in node.args]
+            return lambda context: apply(*[argument(context) for argument in arguments])
+
+        raise RuleCompilationError(f"Unsupported syntax {type(node).__name__} in rule expression {self.source!r}")
+
+
+class CompiledRule:
+    """
+    One rules.yaml entry with its condition (and score impact, when it is an expression) compiled.
+    `scope` says what the variables refer to: "metrics" for a single metrics record,
+    "transaction" for per-transaction columns.
+    """
+
+    def __init__(self, name: str, condition: str, score_impact: Any, rationale: str, scope: str = "metrics"):
+        if scope not in ("metrics", "transaction"):
+            raise RuleCompilationError(f"Rule {name!r} has unknown scope {scope!r}")
+        self.name = name
+        self.scope = scope
+        self.rationale = rationale
+        # Fields named by {placeholders} in the rationale, e.g. "{dscr:.2f}" -> dscr
+        try:
+            self.rationale_fields = {
+                field_name.split(".")[0].split("[")[0]
+                for _, field_name, _, _ in string.Formatter().parse(rationale)
+                if field_name
+            }
+        except ValueError as e:
+            raise RuleCompilationError(f"Rule {name!r} has a malformed rationale: {e}") from e
+        self.condition = CompiledExpression(condition)
+        if isinstance(score_impact, (int, float)):
+            self.score_impact = score_impact
+        else:
+            self.score_impact = CompiledExpression(str(score_impact))
+        self.variables = set(self.condition.variables)
+        if isinstance(self.score_impact, CompiledExpression):
+            self.variables |= self.score_impact.variables
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "CompiledRule":
+        missing = [key for key in ("name", "condition", "score_impact") if key not in config]
+        if missing:
+            raise RuleCompilationError(f"Rule {config.get('name', '<unnamed>')!r} is missing {', '.join(missing)}")
+        return cls(
+            name=config["name"],
+            condition=config["condition"],
+            score_impact=config["score_impact"],
+            rationale=config.get("rationale", config["name"]),
+            scope=config.get("scope", "metrics")
+        )
+
+    def is_applicable(self, available: Set[str]) -> bool:
+        """Rules referring to fields the data does not have are skipped rather than failing."""
+        return self.variables <= available
+
+    def evaluate(self, record: Mapping[str, Any]) -> bool:
+        return bool(self.condition(record))
+
+    def evaluate_columns(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Evaluates the condition over whole columns at once; returns a boolean mask."""
+        length = len(next(iter(columns.values()))) if columns else 0
+        return np.broadcast_to(np.asarray(self.condition(columns), dtype=bool), (length,))
+
+    def impact(self, record: Mapping[str, Any]) -> Any:
+        if isinstance(self.score_impact, CompiledExpression):
+            return self.score_impact(record)
+        return self.score_impact
+
+    def explain(self, record: Mapping[str, Any]) -> str:
+        """Rationale text, with {field} placeholders filled from the record when possible."""
+        try:
+            return self.rationale.format(**record)
+        except (KeyError, IndexError, ValueError, TypeError):
+            return self.rationale
+
+
+def compile_rules(rule_configs: List[Mapping[str, Any]]) -> List[CompiledRule]:
+    """Compiles every rule up front, so a malformed rule fails at load time rather than per request."""
+    return [CompiledRule.from_config(config) for config in rule_configs]
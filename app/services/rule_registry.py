@@ -0,0 +1,102 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import yaml
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.services.rule_compiler import CompiledRule, compile_rules
+
+logger = get_logger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).parent.parent / "rules" / "rules.yaml"
+
+
+class RuleSet:
+    """
+    One immutable, compiled version of the rules file. Requests take a reference once and
+    use it throughout, so a concurrent reload never mixes rules from two versions.
+    """
+
+    __slots__ = ("version", "rules", "compiled_rules", "metrics_rules", "transaction_rules", "mtime_ns", "loaded_at")
+
+    def __init__(self, version: str, rules: List[Dict[str, Any]], mtime_ns: Optional[int] = None):
+        self.version = version
+        self.rules = rules
+        self.compiled_rules: List[CompiledRule] = compile_rules(rules)
+        self.metrics_rules = [rule for rule in self.compiled_rules if rule.scope == "metrics"]
+        self.transaction_rules = [rule for rule in self.compiled_rules if rule.scope == "transaction"]
+        self.mtime_ns = mtime_ns
+        self.loaded_at = time.time()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes, mtime_ns: Optional[int] = None) -> "RuleSet":
+        """Parses and compiles a rules file; raises if it is malformed, before anything is swapped in."""
+        config = yaml.safe_load(raw) or {}
+        if not isinstance(config, dict) or not isinstance(config.get("rules", []), list):
+            raise ValueError("Rules file must be a mapping with a 'rules' list")
+        # Content hash, so the same rules always carry the same version across processes
+        version = hashlib.sha256(raw).hexdigest()[:12]
+        return cls(version, config.get("rules", []), mtime_ns)
+
+
+class RuleRegistry:
+    """
+    Loads and compiles the rules file once, then serves the compiled RuleSet.
+    The file's mtime is checked at most every `check_interval` seconds (0 disables watching);
+    a changed file is validated and swapped in atomically, and a broken one leaves the
+    current version in place.
+    """
+
+    def __init__(self, rules_path: Optional[Path] = None, check_interval: Optional[float] = None):
+        self.rules_path = Path(rules_path or settings.RULES_PATH or DEFAULT_RULES_PATH)
+        self.check_interval = check_interval if check_interval is not None else settings.RULES_RELOAD_CHECK_SECONDS
+        self._reload_lock = Lock()
+        self._next_check = 0.0
+        # mtime of a file that failed validation, so it is reported once rather than on every check
+        self._rejected_mtime_ns: Optional[int] = None
+        self._rule_set = self._load()
+
+    def _load(self) -> RuleSet:
+        mtime_ns = os.stat(self.rules_path).st_mtime_ns
+        with open(self.rules_path, "rb") as f:
+            return RuleSet.from_bytes(f.read(), mtime_ns)
+
+    def current(self) -> RuleSet:
+        """The live rule set; picks up a changed file when the check interval has elapsed."""
+        if self.check_interval > 0 and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime_ns = os.stat(self.rules_path).st_mtime_ns
+            except OSError:
+                mtime_ns = self._rule_set.mtime_ns
+            if mtime_ns not in (self._rule_set.mtime_ns, self._rejected_mtime_ns):
+                try:
+                    self.reload()
+                except Exception:
+                    self._rejected_mtime_ns = mtime_ns
+                    logger.exception("Rules file %s failed validation; keeping version %s", self.rules_path, self._rule_set.version)
+        return self._rule_set
+
+    def reload(self) -> RuleSet:
+        """Re-reads the rules file now. Raises (keeping the current version) if the new file is invalid."""
+        with self._reload_lock:
+            rule_set = self._load()
+            if rule_set.version != self._rule_set.version:
+                logger.info("Rules reloaded: version %s -> %s", self._rule_set.version, rule_set.version)
+            # A single reference assignment; readers see either the old or the new set, never a mix
+            self._rule_set = rule_set
+            return rule_set
+
+
+_rule_registry: Optional[RuleRegistry] = None
+
+
+def get_rule_registry() -> RuleRegistry:
+    """Process-wide registry, so the rules file is read and compiled once rather than per request."""
+    global _rule_registry
+    if _rule_registry is None:
+        _rule_registry = RuleRegistry()
+    return _rule_registry
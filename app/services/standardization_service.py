@@ -1,136 +1,103 @@
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import date
+import numpy as np
 import pandas as pd
 from app.schema.bank_statement_schema import BankStatementInput, Transaction
 from app.schema.credit_bureau_schema import CreditBureauInput
 from app.schema.kyb_kyc_schema import KybKycInput
-from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS
+from app.schema.transaction_frame import TransactionFrame
+from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS, TRANSACTION_TYPE_ALIASES
 from app.services.header_standardization_service import HeaderStandardizationService
 
 class StandardizationService:
     def __init__(self):
         self.header_standardization_service = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS)
 
-    def standardize_bank_statement(self, df: pd.DataFrame) -> BankStatementInput:
-        # Ensure we are working on a copy to avoid SettingWithCopyWarning
-        df = df.copy()
-
-        # 1. Rename headers to canonical fields, handling potential duplicates
+    def standardize_bank_statement(self, df: pd.DataFrame, header_mapping: Optional[Dict[str, str]] = None) -> BankStatementInput:
+        return self.build_bank_statement_input(self.standardize_bank_statement_frame(df, header_mapping))
+
+    def standardize_bank_statement_frame(self, df: pd.DataFrame, header_mapping: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """
+        Maps headers and coerces types, returning the typed transaction columns
+        (date as datetime64, description as str, amount and balance as float64, type as str).
+        Every step is a column operation, so cost grows linearly with rows at vector speed.
+        A header mapping already computed by the classifier is reused instead of re-matching.
+        """
+        # 1. Select the first raw column for each canonical field, handling potential duplicates
         raw_headers = df.columns.tolist()
-        mapped_headers = self.header_standardization_service.map_headers_to_canonical(raw_headers)
-        
-        new_columns_map = {}
-        seen_canonical_names = set()
+        mapped_headers = header_mapping if header_mapping is not None else self.header_standardization_service.map_headers_to_canonical(raw_headers)
+
+        canonical_names = list(CANONICAL_BANK_STATEMENT_FIELDS.keys())
+        selected_columns = {}
         for raw_col in raw_headers:
             canonical_name = mapped_headers.get(raw_col)
-            if canonical_name and canonical_name not in seen_canonical_names:
-                new_columns_map[raw_col] = canonical_name
-                seen_canonical_names.add(canonical_name)
-            else:
-                # If no canonical match or canonical name already seen, keep original name (or drop if it's junk)
-                # We will drop non-canonical and non-mapped columns later
-                new_columns_map[raw_col] = raw_col
-        
-        df = df.rename(columns=new_columns_map) # Assign back to df after rename
-
-        # Drop any columns that are not canonical fields for bank statements and are not 'type'
-        # After renaming, we can safely filter based on canonical names
-        canonical_names = list(CANONICAL_BANK_STATEMENT_FIELDS.keys())
-        # Ensure 'type' is included if it exists and is not a canonical field name
-        cols_to_keep = [col for col in df.columns if col in canonical_names or col == 'type']
-        df = df[cols_to_keep].copy() # Explicitly create a copy after filtering
+            if canonical_name in canonical_names and canonical_name not in selected_columns:
+                selected_columns[canonical_name] = raw_col
+
+        # Projecting only the mapped columns gives us our own frame, so no defensive copy of the input is needed
+        df = pd.DataFrame({canonical_name: df[raw_col] for canonical_name, raw_col in selected_columns.items()}, index=df.index)
 
         # 2. Drop junk rows (rows where all relevant canonical fields are NaN)
-        df.dropna(how='all', subset=[col for col in canonical_names if col in df.columns], inplace=True)
-        
+        df = df.dropna(how='all')
+
         if df.empty:
             raise ValueError("No valid transaction data found after standardization.")
 
-        # Ensure all canonical columns exist, fill missing with None or appropriate default
-        for field in canonical_names:
-            if field not in df.columns:
-                df[field] = None
-
-        # Convert text-based canonical fields to string type to prevent Pydantic validation errors
-        text_fields = ['description'] # Add other text fields if needed
-        for field in text_fields:
-            if field in df.columns:
-                df[field] = df[field].astype(str).replace('nan', '') # Convert NaNs to empty string
-
         # 3. Normalize dates and amounts
-        # Debug print to check columns before date conversion
-        # print(f"DataFrame columns before date conversion: {df.columns.tolist()}") # Keep for debugging if needed
-
-        if 'date' in df.columns and not df['date'].empty:
-            # Use .loc for explicit assignment to avoid SettingWithCopyWarning
-            df.loc[:, 'date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
-        if 'debit' in df.columns and not df['debit'].empty:
-            df.loc[:, 'debit'] = pd.to_numeric(df['debit'], errors='coerce')
-        if 'credit' in df.columns and not df['credit'].empty:
-            df.loc[:, 'credit'] = pd.to_numeric(df['credit'], errors='coerce')
-        if 'balance' in df.columns and not df['balance'].empty:
-            df.loc[:, 'balance'] = pd.to_numeric(df['balance'], errors='coerce')
-        
-        # Handle debit/credit to single amount and type
-        if 'debit' in df.columns and 'credit' in df.columns:
-            df.loc[:, 'amount'] = df['credit'].fillna(0) - df['debit'].fillna(0)
-            df.loc[:, 'type'] = df.apply(lambda row: 'credit' if row['credit'] > 0 else ('debit' if row['debit'] > 0 else 'unknown'), axis=1)
-        elif 'debit' in df.columns:
-            df.loc[:, 'amount'] = -df['debit'].fillna(0)
-            df.loc[:, 'type'] = df.apply(lambda row: 'debit' if row['debit'] > 0 else 'unknown', axis=1)
-        elif 'credit' in df.columns:
-            df.loc[:, 'amount'] = df['credit'].fillna(0)
-            df.loc[:, 'type'] = df.apply(lambda row: 'credit' if row['credit'] > 0 else 'unknown', axis=1)
+        dates = pd.to_datetime(df['date'], errors='coerce').dt.normalize() if 'date' in df.columns else pd.Series(pd.NaT, index=df.index)
+        debit = pd.to_numeric(df['debit'], errors='coerce').to_numpy(dtype='float64') if 'debit' in df.columns else None
+        credit = pd.to_numeric(df['credit'], errors='coerce').to_numpy(dtype='float64') if 'credit' in df.columns else None
+        balance = pd.to_numeric(df['balance'], errors='coerce').to_numpy(dtype='float64') if 'balance' in df.columns else np.full(len(df), np.nan)
+
+        # Fold debit/credit (or a signed amount with an optional type column) into a single signed amount and type
+        if debit is not None or credit is not None:
+            debit = np.nan_to_num(debit, nan=0.0) if debit is not None else np.zeros(len(df))
+            credit = np.nan_to_num(credit, nan=0.0) if credit is not None else np.zeros(len(df))
+            amount = credit - debit
+            transaction_type = np.select([credit > 0, debit > 0], ['credit', 'debit'], default='unknown')
+        elif 'amount' in df.columns:
+            amount = np.nan_to_num(pd.to_numeric(df['amount'], errors='coerce').to_numpy(dtype='float64'), nan=0.0)
+            if 'type' in df.columns:
+                type_codes = df['type'].astype(str).str.strip().str.lower().map(TRANSACTION_TYPE_ALIASES).to_numpy()
+                is_credit = type_codes == 'credit'
+                is_debit = type_codes == 'debit'
+                # An explicit type column decides the direction; the amount may be given unsigned
+                amount = np.where(is_credit, np.abs(amount), np.where(is_debit, -np.abs(amount), amount))
+            else:
+                is_credit = amount > 0
+                is_debit = amount < 0
+            transaction_type = np.select([is_credit & (amount != 0), is_debit & (amount != 0)], ['credit', 'debit'], default='unknown')
         else:
-            df.loc[:, 'amount'] = None
-            df.loc[:, 'type'] = 'unknown'
+            amount = np.zeros(len(df))
+            transaction_type = np.full(len(df), 'unknown')
 
-        # Drop original debit/credit columns
-        df.drop(columns=['debit', 'credit'], errors='ignore', inplace=True)
+        if 'description' in df.columns:
+            description = df['description'].fillna('').astype(str)
+        else:
+            description = pd.Series('', index=df.index)
+
+        standardized = pd.DataFrame({
+            'date': dates,
+            'description': description,
+            'amount': amount,
+            'type': transaction_type,
+            'balance': balance
+        }, index=df.index)
 
         # Filter out rows where 'date' is NaT (Not a Time) after coercion
-        df.dropna(subset=['date'], inplace=True)
+        return standardized[standardized['date'].notna()].reset_index(drop=True)
 
-        # Ensure numerical columns have proper None values instead of NaN before Pydantic conversion
-        for col in ['amount', 'balance']:
-            if col in df.columns:
-                # Explicitly convert to float, then handle NaN to None
-                df.loc[:, col] = df[col].apply(lambda x: float(x) if pd.notna(x) else None)
+    @staticmethod
+    def build_transaction_frame(df: pd.DataFrame) -> TransactionFrame:
+        """Packs the typed columns into the array-backed representation consumed by the services."""
+        return TransactionFrame.from_dataframe(df)
 
+    @staticmethod
+    def build_bank_statement_input(df: pd.DataFrame) -> BankStatementInput:
+        """Materializes the typed columns as the pydantic schema; only called when row objects are needed."""
         # 4. Produce a clean schema matching Pydantic BankStatementInput
-        transactions: List[Transaction] = []
-        for index, row in df.iterrows():
-            # Retrieve values, ensuring they are strictly float or None
-            amount_val_raw = row.get('amount')
-            balance_val_raw = row.get('balance')
-
-            amount_for_transaction = float(amount_val_raw) if pd.notna(amount_val_raw) else None
-            balance_for_transaction = float(balance_val_raw) if pd.notna(balance_val_raw) else None
-
-            transactions.append(
-                Transaction(
-                    date=row['date'],
-                    description=str(row.get('description', 'N/A')), # Ensure description is string
-                    amount=amount_for_transaction, 
-                    type=row.get('type', 'unknown'),
-                    balance=balance_for_transaction
-                )
-            )
-        
-        # Infer start_date and end_date from transactions
-        start_date = min(t.date for t in transactions) if transactions else date.min
-        end_date = max(t.date for t in transactions) if transactions else date.max
-
-        return BankStatementInput(
-            account_holder_name="Default Account Holder",  # Placeholder
-            account_number="XXXX-XXXX-XXXX-1234",  # Placeholder
-            bank_name="Generic Bank",  # Placeholder
-            start_date=start_date,
-            end_date=end_date,
-            transactions=transactions,
-            currency="USD"  # Placeholder
-        )
+        return TransactionFrame.from_dataframe(df).to_bank_statement_input()
 
     @staticmethod
     def standardize_credit_bureau(raw_data: Dict[str, Any]) -> CreditBureauInput:
@@ -0,0 +1,37 @@
+import base64
+import binascii
+from typing import Dict, Any, Optional, Tuple
+import pandas as pd
+from app.core.pipeline_context import InvalidPayloadError, PipelineContext
+from app.services.arrow_processing_service import ArrowProcessingService
+
+
+class TablePayloadService:
+    """
+    Turns the content of a JSON document request into a pipeline context, decoding tabular payloads
+    once up front: base64 Arrow IPC (column by column, only the statement columns), column lists
+    (one array per column) and row dicts (the original format), cheapest first.
+    """
+
+    @staticmethod
+    def decode(content: Dict[str, Any]) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """The payload's table, or None for non-tabular content, plus what was detected about it."""
+        if isinstance(content.get("arrow_ipc"), str):
+            try:
+                frame, table_metadata = ArrowProcessingService.read_frame(base64.b64decode(content["arrow_ipc"], validate=True), "arrow")
+            except (binascii.Error, ValueError) as e:
+                raise InvalidPayloadError(f"arrow_ipc is not base64-encoded Arrow IPC data: {e}") from e
+            return frame, {"table": table_metadata}
+        if isinstance(content.get("columns"), dict):
+            try:
+                return pd.DataFrame(content["columns"]), {}
+            except ValueError as e:
+                raise InvalidPayloadError(f"columns must be lists of equal length: {e}") from e
+        if isinstance(content.get("excel_data"), list):
+            return pd.DataFrame(content["excel_data"]), {}
+        return None, {}
+
+    @staticmethod
+    def build_context(document_id: str, content: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> PipelineContext:
+        frame, detected = TablePayloadService.decode(content) if content else (None, {})
+        return PipelineContext(document_id=document_id, content=content, metadata={**(metadata or {}), **detected}, frame=frame)
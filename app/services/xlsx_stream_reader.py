@@ -0,0 +1,89 @@
+"""
+Column-projected row streaming for .xlsx worksheets, on top of openpyxl's read-only sheet parser.
+openpyxl converts every cell of a row (types, shared strings, dates) even when only a few columns are
+wanted; this parser only converts the cells of the requested columns. It is imported lazily by
+ExcelProcessingService so openpyxl stays off the startup path.
+
+The parser builds on openpyxl internals (WorkSheetParser, the workbook's date formats, the sheet's
+shared strings and XML source). If a release changes them, rows are read through the public
+`iter_rows` API instead: slower, since every cell is converted, but the same values.
+"""
+import itertools
+import re
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+from openpyxl.utils.cell import column_index_from_string
+from app.core.logger import get_logger
+
+try:
+    from openpyxl.worksheet._reader import WorkSheetParser
+except ImportError:
+    # The private module moved; constructing the parser below then fails and the fallback is used
+    WorkSheetParser = object
+
+logger = get_logger(__name__)
+
+_COLUMN_LETTERS = re.compile(r"[A-Z]+")
+
+
+class ProjectedSheetParser(WorkSheetParser):
+    """Yields (row number, values) where values holds only the requested 0-based columns, in order."""
+
+    def __init__(self, source, worksheet, columns: Sequence[int]):
+        workbook = worksheet.parent
+        super().__init__(
+            source, worksheet._shared_strings, data_only=True, epoch=workbook.epoch,
+            date_formats=workbook._date_formats, timedelta_formats=workbook._timedelta_formats
+        )
+        # 1-based sheet column -> position in the yielded values
+        self.positions: Dict[int, int] = {column + 1: position for position, column in enumerate(columns)}
+        self.width = len(columns)
+        self._column_indexes: Dict[str, int] = {}
+
+    def _column_index(self, coordinate: str) -> int:
+        letters = _COLUMN_LETTERS.match(coordinate).group()
+        index = self._column_indexes.get(letters)
+        if index is None:
+            index = self._column_indexes[letters] = column_index_from_string(letters)
+        return index
+
+    def parse_row(self, row) -> Tuple[int, List[Any]]:
+        row_number = row.get("r")
+        self.row_counter = int(float(row_number)) if row_number else self.row_counter + 1
+        values: List[Any] = [None] * self.width
+        column = 0
+        for element in row:
+            coordinate = element.get("r")
+            # Cells may omit their reference, in which case they follow the previous cell
+            column = self._column_index(coordinate) if coordinate else column + 1
+            position = self.positions.get(column)
+            if position is not None:
+                self.col_counter = column - 1
+                values[position] = self.parse_cell(element)["value"]
+        return self.row_counter, values
+
+
+def _parsed_rows(worksheet, columns: Sequence[int]) -> Iterator[Tuple[int, List[Any]]]:
+    with worksheet._get_source() as source:
+        yield from ProjectedSheetParser(source, worksheet, columns).parse()
+
+
+def _public_rows(worksheet, columns: Sequence[int], min_row: int) -> Iterator[Tuple[Any, ...]]:
+    for row in worksheet.iter_rows(min_row=min_row, values_only=True):
+        yield tuple(row[column] if column < len(row) else None for column in columns)
+
+
+def iter_projected_rows(worksheet, columns: Sequence[int], min_row: int = 1) -> Iterator[Tuple[Any, ...]]:
+    """Values of `columns` for each stored row from `min_row` (1-based) on; rows absent from the file are skipped."""
+    rows = _parsed_rows(worksheet, columns)
+    try:
+        # Building the parser and converting a first row exercises every internal it relies on
+        first_row = next(rows, None)
+    except (AttributeError, TypeError) as e:
+        logger.warning("openpyxl's sheet parser is not usable (%s); reading rows through iter_rows", e)
+        yield from _public_rows(worksheet, columns, min_row)
+        return
+    if first_row is None:
+        return
+    for row_number, values in itertools.chain([first_row], rows):
+        if row_number >= min_row:
+            yield tuple(values)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schema.transaction_frame import TransactionFrame
+from app.services.account_state_service import AccountStateService, get_account_state_service
+from app.services.metrics_service import MetricsService
+
+def _frame(amounts, start_day=0, opening_balance=1000.0):
+    amounts = np.asarray(amounts, dtype=float)
+    return TransactionFrame(
+        dates=np.datetime64('2023-01-01') + np.arange(start_day, start_day + len(amounts)),
+        amounts=amounts,
+        type_codes=np.sign(amounts),
+        balances=opening_balance + np.cumsum(amounts)
+    )
+
+def test_merged_state_equals_state_of_full_history():
+    history = [250.0, -40.0, -12.5, 900.0, -300.0]
+    delta = [-75.0, 1200.0, -19.99]
+
+    merged = MetricsService.merge_states(MetricsService.aggregate_state(_frame(history)),
+                                         MetricsService.aggregate_state(_frame(delta, start_day=len(history), opening_balance=1000.0 + sum(history))))
+    full = MetricsService.aggregate_state(_frame(history + delta))
+
+    assert merged.transaction_count == full.transaction_count == 8
+    assert merged.total_inflow == pytest.approx(full.total_inflow)
+    assert merged.total_outflow == pytest.approx(full.total_outflow)
+    assert merged.amount_variance == pytest.approx(np.var(history + delta, ddof=1))
+    assert merged.last_balance == full.last_balance
+    assert (merged.min_date, merged.max_date) == (full.min_date, full.max_date)
+    assert MetricsService.cashflow_metrics_from_state(merged) == MetricsService.calculate_cashflow_metrics(_frame(history + delta))
+
+def test_append_endpoint_refreshes_metrics_from_persisted_state(tmp_path):
+    account_state_service = AccountStateService(str(tmp_path))
+    app.dependency_overrides[get_account_state_service] = lambda: account_state_service
+    client = TestClient(app)
+    try:
+        january = [{"date": "2023-01-05", "description": "Salary", "amount": 2000.0, "type": "credit", "balance": 2000.0}]
+        february = [{"date": "2023-02-03", "description": "Rent", "amount": 800.0, "type": "debit", "balance": 1200.0}]
+
+        assert client.post("/accounts/acme-1/transactions", json={"transactions": january}).status_code == 200
+        response = client.post("/accounts/acme-1/transactions", json={"transactions": february})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["transaction_count"] == 2
+        assert body["end_date"] == "2023-02-03"
+        assert body["cashflow_metrics"]["net_cashflow"] == 1200.0
+        assert (tmp_path / "acme-1.json").exists()
+        # A fresh service picks the state up from disk
+        assert AccountStateService(str(tmp_path)).get_state("acme-1").transaction_count == 2
+
+        assert client.post("/accounts/..%2Fescape/transactions", json={"transactions": january}).status_code in (400, 404)
+    finally:
+        app.dependency_overrides.clear()
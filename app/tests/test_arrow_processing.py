@@ -0,0 +1,63 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.arrow_processing_service import ArrowProcessingService
+
+client = TestClient(app)
+
+STATEMENT = {
+    "Posting Date": ["2023-01-01", "2023-01-02", "2023-01-03"],
+    "Branch Code": ["N01", "N01", "S07"],
+    "Narration": ["Rent", "Salary", "Groceries"],
+    "Debit": [1000.0, None, 150.0],
+    "Credit": [None, 2000.0, None],
+    "Running Balance": [5000.0, 7000.0, 6850.0],
+}
+
+def _parquet(data):
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa.table(data), sink)
+    return sink.getvalue().to_pybytes()
+
+def _ipc(data, stream=False):
+    table = pa.table(data)
+    sink = pa.BufferOutputStream()
+    with (pa.ipc.new_stream if stream else pa.ipc.new_file)(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def test_only_statement_columns_are_decoded():
+    for table_format, content in (("parquet", _parquet(STATEMENT)), ("arrow", _ipc(STATEMENT)), ("arrow", _ipc(STATEMENT, stream=True))):
+        df, metadata = ArrowProcessingService.read_frame(content, table_format)
+
+        assert "Branch Code" not in df.columns
+        assert df["Narration"].tolist() == ["Rent", "Salary", "Groceries"]
+        assert metadata["columns_total"] == 6 and metadata["rows"] == 3
+
+def test_tables_that_are_not_statements_keep_every_column():
+    df, metadata = ArrowProcessingService.read_frame(b"bureau\tscore\nExperian\t720\n", "tsv")
+
+    assert df.to_dict(orient="records") == [{"bureau": "Experian", "score": 720}]
+    assert metadata["columns_read"] == ["bureau", "score"]
+
+def test_csv_upload_goes_through_the_bank_statement_pipeline():
+    csv = b"Posting Date,Branch Code,Narration,Debit,Credit,Running Balance\n" \
+          b"2023-01-01,N01,Rent,1000.00,,5000.00\n" \
+          b"2023-01-02,N01,Salary,,2000.00,7000.00\n" \
+          b"2023-01-03,S07,Groceries,150.00,,6850.00\n"
+
+    response = client.post("/document/upload-file-for-analysis", files={"file": ("export.csv", csv)})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["document_type"] == "bank_statement"
+    assert data["cashflow_metrics"]["total_inflow"] == 2000.0
+    assert data["cashflow_metrics"]["total_outflow"] == 1150.0
+    assert data["metadata"]["table"]["columns_read"] == ["Posting Date", "Narration", "Debit", "Credit", "Running Balance"]
+
+def test_malformed_export_is_a_client_error():
+    response = client.post("/document/upload-file-for-analysis", files={"file": ("export.parquet", b"not parquet")})
+
+    assert response.status_code == 400
@@ -0,0 +1,34 @@
+from app.services.document_classifier_service import DocumentClassifierService
+
+def test_text_scores_per_document_type():
+    scores = DocumentClassifierService().score_text("ACME BANK\nStatement\n  of Account\nOpening balance 100.00")
+
+    assert scores["bank_statement"] == 100
+    assert scores["credit_bureau"] < 75
+    assert scores["kyb_kyc"] < 75
+
+def test_words_of_a_synonym_found_apart_still_classify():
+    classifier = DocumentClassifierService()
+
+    assert classifier._classify_from_text("Your credit standing. Full report enclosed.") == "credit_bureau"
+    assert classifier._classify_from_text("Lorem ipsum dolor sit amet") == "unknown"
+
+def test_scan_escalates_past_the_first_window_when_inconclusive():
+    classifier = DocumentClassifierService(scan_kb=1)
+    filler = "lorem ipsum dolor sit amet " * 200_000  # ~5 MB
+
+    assert classifier._classify_from_text(filler + "Equifax credit report") == "credit_bureau"
+
+def test_conclusive_first_window_is_the_only_one_scanned(monkeypatch):
+    classifier = DocumentClassifierService(scan_kb=1)
+    filler = "lorem ipsum dolor sit amet " * 200_000  # ~5 MB
+    scanned = []
+    scan = classifier.keyword_index.scan
+    def spy(normalized_text, phrase_hits, tokens):
+        scanned.append(len(normalized_text))
+        return scan(normalized_text, phrase_hits, tokens)
+    monkeypatch.setattr(classifier.keyword_index, "scan", spy)
+
+    assert classifier._classify_from_text("Kontoauszug Nr. 3\n" + filler) == "bank_statement"
+    # Conclusive within the first window, so the rest of the text is never scanned
+    assert len(scanned) == 1 and scanned[0] <= 1024
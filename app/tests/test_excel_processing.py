@@ -1,8 +1,10 @@
+import asyncio
 import pytest
 import pandas as pd
 from io import BytesIO
 from unittest.mock import MagicMock
 
+from app.core.executor import TaskExecutor
 from app.services.excel_processing_service import ExcelProcessingService
 
 def test_process_excel_file_bank_statement_columns(monkeypatch):
@@ -47,3 +49,117 @@ def test_process_excel_file_bank_statement_columns(monkeypatch):
         'Type': 'credit',
         'Balance': 6000.0
     }
+
+def _workbook(sheets):
+    import openpyxl
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        worksheet = workbook.create_sheet(name)
+        for row in rows:
+            worksheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def test_read_excel_frame_streams_only_the_statement_columns(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.EXCEL_CHUNK_ROWS", 2)
+    content = _workbook({"Transactions": [
+        ["Date", "Branch", "Description", "Amount", "Type", "Balance", "Teller"],
+        ["2023-01-01", "North", "Rent", 1000.0, "debit", 5000.0, "A"],
+        [None, None, None, None, None, None, None],
+        ["2023-01-02", "North", "Salary", 2000.0, "credit", 7000.0, "B"],
+        ["2023-01-03", "South", "Groceries", 150.0, "debit", 6850.0, "C"],
+    ]})
+
+    df = ExcelProcessingService.read_excel_frame(content)
+
+    assert df.columns.tolist() == ["Date", "Description", "Amount", "Type", "Balance"]
+    assert df["Description"].tolist() == ["Rent", "Salary", "Groceries"]
+    assert df["Amount"].tolist() == [1000.0, 2000.0, 150.0]
+
+def test_rows_are_read_through_the_public_api_when_openpyxl_internals_change(monkeypatch):
+    from app.services import xlsx_stream_reader
+    content = _workbook({"Transactions": [
+        ["Date", "Branch", "Description", "Amount", "Type", "Balance"],
+        ["2023-01-01", "North", "Rent", 1000.0, "debit", 5000.0],
+        ["2023-01-02", "North", "Salary", 2000.0, "credit", 7000.0],
+    ]})
+    expected = ExcelProcessingService.read_excel_frame(content)
+
+    class ChangedParser:
+        def __init__(self, *args, **kwargs):
+            raise TypeError("__init__() got an unexpected keyword argument 'date_formats'")
+    monkeypatch.setattr(xlsx_stream_reader, "ProjectedSheetParser", ChangedParser)
+
+    pd.testing.assert_frame_equal(ExcelProcessingService.read_excel_frame(content), expected)
+
+def test_read_excel_frame_keeps_all_columns_of_other_sheets():
+    content = _workbook({"Report": [["Bureau", "Score"], ["Experian", 720]]})
+
+    assert ExcelProcessingService.read_excel_frame(content).to_dict(orient="records") == [{"Bureau": "Experian", "Score": 720}]
+
+def test_header_row_and_sheet_are_detected_below_a_preamble():
+    content = _workbook({
+        "Summary": [["ACME Bank"], ["Customer", "J. Doe"], ["Total", 850.0]],
+        "Transactions": [
+            ["ACME Bank - Account Statement"],
+            ["Account number", "12345678"],
+            [],
+            ["Txn Date", "Narration", "Debit", "Credit", "Running Balance"],
+            ["2023-01-01", "Rent", 1000.0, None, 5000.0],
+            ["2023-01-02", "Salary", None, 2000.0, 7000.0],
+        ],
+    })
+
+    df, metadata = ExcelProcessingService.read_workbook(content)
+
+    assert metadata == {
+        "sheet_name": "Transactions",
+        "header_row": 3,
+        "matched_fields": ["balance", "credit", "date", "debit", "description"],
+        "sheets_scanned": 2,
+    }
+    assert df.columns.tolist() == ["Txn Date", "Narration", "Debit", "Credit", "Running Balance"]
+    assert df["Narration"].tolist() == ["Rent", "Salary"]
+
+def test_uploaded_workbook_reports_where_the_statement_was_found():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    content = _workbook({
+        "Notes": [["Exported from online banking"]],
+        "Sheet2": [
+            ["Statement period", "January 2023"],
+            ["Date", "Description", "Amount", "Type", "Balance"],
+            ["2023-01-01", "Rent", 1000.0, "debit", 5000.0],
+            ["2023-01-02", "Salary", 2000.0, "credit", 7000.0],
+            ["2023-01-03", "Groceries", 150.0, "debit", 6850.0],
+        ],
+    })
+
+    response = TestClient(app).post("/document/upload-file-for-analysis", files={"file": ("export.xlsx", content)})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["document_type"] == "bank_statement"
+    assert data["cashflow_metrics"]["net_cashflow"] == 850.0
+    assert data["metadata"]["excel"]["sheet_name"] == "Sheet2"
+    assert data["metadata"]["excel"]["header_row"] == 1
+    # The upload's own metadata (filename, content type) is not echoed back
+    assert set(data["metadata"]) == {"excel"}
+
+def test_workbook_with_more_sheets_than_executor_slots_loads():
+    sheets = {f"Notes {index}": [["Exported from online banking"]] for index in range(20)}
+    sheets["Transactions"] = [
+        ["Date", "Description", "Amount", "Type", "Balance"],
+        ["2023-01-01", "Rent", 1000.0, "debit", 5000.0],
+    ]
+    executor = TaskExecutor(thread_workers=4, process_workers=0, max_pending=8)
+    try:
+        df, metadata = asyncio.run(ExcelProcessingService(executor).extract_table(_workbook(sheets)))
+    finally:
+        executor.shutdown()
+
+    assert metadata["sheet_name"] == "Transactions" and metadata["sheets_scanned"] == 21
+    assert df["Description"].tolist() == ["Rent"]
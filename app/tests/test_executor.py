@@ -0,0 +1,60 @@
+import asyncio
+import time
+from io import BytesIO
+import pytest
+
+from app.core.executor import ExecutorBusyError, ExecutorTimeoutError, TaskExecutor
+from app.services.file_format_handler_service import FileFormatHandlerService
+
+def _blank_pdf() -> bytes:
+    import pypdf
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def test_blocking_work_does_not_stall_the_event_loop():
+    executor = TaskExecutor(thread_workers=2, process_workers=0)
+
+    async def scenario():
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+        task = asyncio.create_task(ticker())
+        result = await executor.run_in_thread(time.sleep, 0.2)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    assert result is None
+    assert ticks > 5
+    executor.shutdown()
+
+def test_pending_limit_and_timeout():
+    executor = TaskExecutor(thread_workers=1, process_workers=0, max_pending=1)
+
+    async def scenario():
+        slow = asyncio.create_task(executor.run_in_thread(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run_in_thread(time.sleep, 0)
+        await slow
+        with pytest.raises(ExecutorTimeoutError):
+            await executor.run_in_thread(time.sleep, 0.3, timeout=0.05)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+def test_pdf_parsing_runs_in_a_worker_process():
+    executor = TaskExecutor(process_workers=1)
+    handler = FileFormatHandlerService(executor)
+
+    result = asyncio.run(handler.process_file(_blank_pdf(), "statement.pdf"))
+
+    assert result["text_content"] == "\n"
+    assert result["page_count"] == 1
+    executor.shutdown()
@@ -0,0 +1,46 @@
+import asyncio
+from datetime import date
+import numpy as np
+import pytest
+
+from app.services.forecast_engine import ForecastEngine
+from app.services.forecast_service import ForecastService
+
+def test_daily_series_sums_same_day_transactions_and_fills_gaps():
+    first_day, values = ForecastEngine.daily_series(
+        np.array(['2023-01-01', '2023-01-01', '2023-01-03'], dtype='datetime64[D]'),
+        np.array([100.0, -40.0, 25.0])
+    )
+
+    assert first_day == np.datetime64('2023-01-01')
+    assert values.tolist() == [60.0, 0.0, 25.0]
+
+def test_models_on_simple_series():
+    engine = ForecastEngine(window=3, alpha=0.5, beta=0.5)
+    linear = np.arange(1.0, 11.0)
+
+    assert engine.forecast(linear, 3, "holt") == pytest.approx([11.0, 12.0, 13.0])
+    assert engine.forecast(linear, 2, "rolling_mean") == pytest.approx([9.0, 9.0])
+    assert engine.forecast(np.array([4.0, np.nan, 8.0]), 1, "ewma") == pytest.approx([6.0])
+    with pytest.raises(ValueError):
+        engine.forecast(linear, 1, "arima")
+
+def test_batch_forecast_matches_single_series():
+    engine = ForecastEngine()
+    rng = np.random.default_rng(3)
+    series = [rng.normal(size=n) for n in (5, 40, 365)]
+
+    batch = engine.forecast_many(series, 14, "holt")
+
+    assert batch.shape == (3, 14)
+    for row, values in enumerate(series):
+        assert batch[row] == pytest.approx(engine.forecast(values, 14, "holt"))
+
+def test_get_forecast_uses_configured_horizons():
+    service = ForecastService(model="rolling_mean", horizon_days=3, long_term_days=30)
+
+    outputs = asyncio.run(service.get_forecast({date(2023, 1, 1): 10.0, date(2023, 1, 2): 20.0, date(2023, 1, 3): 30.0}))
+
+    assert list(outputs.short_term_cashflow_forecast) == [date(2023, 1, 4), date(2023, 1, 5), date(2023, 1, 6)]
+    assert outputs.short_term_cashflow_forecast[date(2023, 1, 4)] == pytest.approx(20.0)
+    assert outputs.long_term_revenue_projection == {date(2023, 2, 2): pytest.approx(20.0)}
@@ -0,0 +1,33 @@
+from app.core.bank_statement_fields import CANONICAL_BANK_STATEMENT_FIELDS
+from app.services.header_standardization_service import HeaderStandardizationService
+
+def test_compiled_index_is_shared_per_canonical_table():
+    first = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS)
+    second = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS)
+    other_threshold = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS, threshold=90)
+
+    assert first.index is second.index
+    assert first.index is not other_threshold.index
+
+def test_exact_synonyms_and_fuzzy_headers_map_in_one_batch():
+    service = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS)
+    raw_headers = ['Transaction Date', ' NARRATION ', 'Withdrawal Amt.', 'Deposit Amt', 'Closing Balance', 'Ref No']
+
+    mapped = service.map_headers_to_canonical(raw_headers)
+
+    assert mapped == {
+        'Transaction Date': 'date',
+        ' NARRATION ': 'description',
+        'Withdrawal Amt.': 'debit',
+        'Deposit Amt': 'credit',
+        'Closing Balance': 'balance'
+    }
+    # Single lookups agree with the batch result and are served from the cache afterwards
+    for header in raw_headers:
+        assert service.fuzzy_match_header(header) == mapped.get(header)
+
+def test_result_cache_is_bounded():
+    service = HeaderStandardizationService(CANONICAL_BANK_STATEMENT_FIELDS)
+    service.map_headers_to_canonical([f"unmapped column {i}" for i in range(service.index.cache_size + 10)])
+
+    assert len(service.index._cache) == service.index.cache_size
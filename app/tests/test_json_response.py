@@ -0,0 +1,67 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+
+from app.core.json_response import dumps
+from app.main import app
+
+def test_numpy_values_and_missing_numbers_serialize_natively():
+    content = {
+        "score": np.float64("nan"),
+        "count": np.int64(3),
+        "series": np.array([1.5, np.nan, np.inf]),
+        "posted": pd.Timestamp("2023-01-02"),
+        "settled": pd.NaT,
+    }
+
+    assert json.loads(dumps(content)) == {
+        "score": None, "count": 3, "series": [1.5, None, None], "posted": "2023-01-02T00:00:00", "settled": None
+    }
+
+def test_values_jsonable_encoder_handled_still_serialize():
+    content = {"amount": Decimal("1234.56"), "duration": timedelta(minutes=1), "ref": b"TX-1", "raw": b"\xff", "tags": {"a"}}
+
+    assert json.loads(dumps(content)) == {"amount": 1234.56, "duration": 60.0, "ref": "TX-1", "raw": "/w==", "tags": ["a"]}
+
+def test_decimal_statement_columns_are_echoed():
+    # Core banking exports often store money as decimal128
+    money = pa.decimal128(12, 2)
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa.table({
+        "Date": ["2023-01-01", "2023-01-02", "2023-01-03"],
+        "Description": ["Rent", "Salary", "Groceries"],
+        "Amount": pa.array([Decimal("-1000.00"), Decimal("2000.00"), Decimal("-150.00")], type=money),
+        "Balance": pa.array([Decimal("5000.00"), Decimal("7000.00"), Decimal("6850.00")], type=money),
+    }), sink)
+
+    response = TestClient(app).post("/document/upload-file-for-analysis", params={"include": "extracted_data"},
+                                    files={"file": ("export.parquet", sink.getvalue().to_pybytes())})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["extracted_data"]["excel_data"][1]["Amount"] == 2000.0
+    assert data["cashflow_metrics"]["total_inflow"] == 2000.0
+
+def test_echoed_rows_with_gaps_are_valid_json():
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa.table({
+        "Date": pd.to_datetime(["2023-01-01", "2023-01-02", None]),
+        "Description": ["Rent", "Salary", "Groceries"],
+        "Debit": [1000.0, None, 150.0],
+        "Credit": [None, 2000.0, None],
+        "Balance": [5000.0, 7000.0, 6850.0],
+    }), sink)
+
+    response = TestClient(app).post("/document/upload-file-for-analysis", params={"include": "extracted_data"},
+                                    files={"file": ("export.parquet", sink.getvalue().to_pybytes())})
+
+    assert response.status_code == 200
+    rows = response.json()["extracted_data"]["excel_data"]
+    assert rows[0]["Credit"] is None and rows[1]["Debit"] is None
+    assert rows[0]["Date"] == "2023-01-01T00:00:00" and rows[2]["Date"] is None
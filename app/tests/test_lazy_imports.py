@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+from app.services.image_processing_service import ImageProcessingService
+from app.services.pdf_processing_service import PdfProcessingService
+
+def test_format_libraries_are_not_imported_at_startup():
+    probe = "import sys, app.main; print(sorted(m for m in ('pypdf', 'PIL', 'openpyxl') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+def test_format_libraries_load_on_first_use():
+    assert "error" in PdfProcessingService.process_pdf_file(b"not a pdf")
+    assert "error" in ImageProcessingService.process_image_file(b"not an image")
+    assert "pypdf" in sys.modules and "PIL.Image" in sys.modules
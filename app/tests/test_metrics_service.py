@@ -0,0 +1,55 @@
+from datetime import date
+import numpy as np
+
+from app.schema.bank_statement_schema import BankStatementInput, Transaction
+from app.schema.transaction_frame import TransactionFrame
+from app.services.metrics_service import MetricsService
+
+def _bank_statement():
+    # Pydantic callers may send unsigned amounts and rely on the type for the direction
+    transactions = [
+        Transaction(date=date(2023, 1, 1), description='Rent', amount=1000.0, type='debit', balance=5000.0),
+        Transaction(date=date(2023, 1, 2), description='Salary', amount=2000.0, type='credit', balance=7000.0),
+        Transaction(date=date(2023, 1, 3), description='Groceries', amount=150.0, type='debit', balance=6850.0),
+        Transaction(date=date(2023, 1, 4), description='Coffee', amount=5.0, type='debit', balance=6845.0),
+    ]
+    return BankStatementInput(
+        account_holder_name='Jane Doe', account_number='1', bank_name='Bank',
+        start_date=date(2023, 1, 1), end_date=date(2023, 1, 4), transactions=transactions
+    )
+
+def test_transaction_frame_is_signed_and_round_trips():
+    frame = TransactionFrame.from_bank_statement(_bank_statement())
+
+    assert frame.amounts.tolist() == [-1000.0, 2000.0, -150.0, -5.0]
+    assert frame.type_codes.dtype == np.int8
+    assert frame.start_date == date(2023, 1, 1)
+    assert [t.amount for t in frame.to_transactions([1])] == [2000.0]
+    assert len(frame.to_bank_statement_input().transactions) == 4
+
+def test_metrics_match_for_frame_and_pydantic_statement():
+    bank_statement = _bank_statement()
+    frame = TransactionFrame.from_bank_statement(bank_statement)
+
+    for statement in (bank_statement, frame):
+        cashflow = MetricsService.calculate_cashflow_metrics(statement)
+        assert cashflow.total_inflow == 2000.0
+        assert cashflow.total_outflow == 1155.0
+        assert cashflow.net_cashflow == 845.0
+
+        liquidity = MetricsService.calculate_liquidity_metrics(statement)
+        assert liquidity.current_ratio == 7000.0 / 6845.0
+
+        risk_indicators = MetricsService.identify_risk_indicators(statement)
+        assert [t['description'] for t in risk_indicators.high_risk_transactions] == ['Rent']
+
+def test_fused_kernel_matches_per_family_methods():
+    frame = TransactionFrame.from_bank_statement(_bank_statement())
+
+    metrics = MetricsService.calculate_all_metrics(frame, total_debt=500.0)
+
+    assert metrics.cashflow_metrics == MetricsService.calculate_cashflow_metrics(frame)
+    assert metrics.liquidity_metrics == MetricsService.calculate_liquidity_metrics(frame)
+    assert metrics.financial_discipline_metrics == MetricsService.calculate_financial_discipline_metrics(frame)
+    assert metrics.debt_servicing_metrics == MetricsService.calculate_debt_servicing_metrics(frame, total_debt=500.0)
+    assert metrics.risk_indicators == MetricsService.identify_risk_indicators(frame)
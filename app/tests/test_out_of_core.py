@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.arrow_processing_service import ArrowProcessingService
+
+client = TestClient(app)
+
+def _statement_csv(rows=600):
+    rng = np.random.default_rng(11)
+    amounts = np.round(rng.lognormal(4, 1.0, size=rows), 2)
+    credits = rng.random(rows) < 0.3
+    # A few large debits to be flagged as high risk
+    amounts[[37, 290, 555]] = 25_000.0
+    credits[[37, 290, 555]] = False
+    frame = pd.DataFrame({
+        "Date": pd.date_range("2023-01-01", periods=rows, freq="9h").strftime("%Y-%m-%d"),
+        "Narration": np.where(credits, "Salary", "Card payment"),
+        "Debit": np.where(credits, np.nan, amounts),
+        "Credit": np.where(credits, amounts, np.nan),
+        "Balance": np.round(50_000 + np.cumsum(np.where(credits, amounts, -amounts)), 2),
+    })
+    return frame.to_csv(index=False).encode()
+
+def _assert_close(actual, expected):
+    # Sums are accumulated chunk by chunk, so floats may differ in the last digits
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            _assert_close(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for actual_item, expected_item in zip(actual, expected):
+            _assert_close(actual_item, expected_item)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected)
+    else:
+        assert actual == expected
+
+def _analyze(csv):
+    response = client.post("/document/upload-file-for-analysis", files={"file": ("export.csv", csv)})
+    assert response.status_code == 200
+    return response.json()
+
+def test_chunked_upload_matches_in_memory_analysis(monkeypatch):
+    csv = _statement_csv()
+    in_memory = _analyze(csv)
+
+    monkeypatch.setattr(settings, "MAX_MEMORY_MB", 0.01)
+    monkeypatch.setattr(settings, "OUT_OF_CORE_CHUNK_ROWS", 70)
+    chunked = _analyze(csv)
+
+    assert chunked["metadata"]["chunked"] == {"chunk_rows": 70, "rows": 600, "chunks": 9}
+    assert chunked["extracted_data"] == {"row_count": 600, "chunk_count": 9}
+    assert len(chunked["risk_indicators"]["high_risk_transactions"]) >= 3
+    for section in ("cashflow_metrics", "liquidity_metrics", "financial_discipline_metrics", "debt_servicing_metrics",
+                    "risk_indicators", "forecasts", "risk_score", "risk_factors"):
+        _assert_close(chunked[section], in_memory[section])
+
+def test_csv_chunks_keep_one_dtype_per_column():
+    # The first block only sees whole numbers; later rows have cents
+    csv = b"Date,Description,Amount,Balance\n" + b"".join(
+        f"2023-01-{day % 28 + 1:02d},Payment,{-day if day < 150 else -day - 0.5},{1000 + day}\n".encode() for day in range(300)
+    )
+
+    chunks = list(ArrowProcessingService.iter_frames(csv, "csv", 100))
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 100]
+    assert {str(chunk["Amount"].dtype) for chunk in chunks} == {"float64"}
+    assert chunks[-1]["Amount"].iloc[-1] == -299.5
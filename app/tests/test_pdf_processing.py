@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.executor import ExecutorBusyError, TaskExecutor
+from app.services.pdf_processing_service import PdfProcessingService
+
+def _pdf(page_texts):
+    """A minimal PDF with one line of Helvetica text per page."""
+    count = len(page_texts)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(count))
+    font_id = 3 + 2 * count
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {count} >>"]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 20 100 Td ({text}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 200] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+PAGES = [f"Page {i}" for i in range(7)]
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = TaskExecutor(process_workers=2)
+    yield executor
+    executor.shutdown()
+
+def test_parallel_extraction_matches_sequential_in_page_order(executor):
+    service = PdfProcessingService(executor, max_pages=0, max_bytes=0, pages_per_task=2)
+
+    parallel = asyncio.run(service.extract_text(_pdf(PAGES)))
+
+    assert parallel == PdfProcessingService.process_pdf_file(_pdf(PAGES))
+    assert parallel["text_content"] == "".join(f"{page}\n" for page in PAGES)
+    assert (parallel["page_count"], parallel["pages_extracted"], parallel["truncated"]) == (7, 7, False)
+
+def test_page_and_byte_caps(executor):
+    by_pages = asyncio.run(PdfProcessingService(executor, max_pages=3, max_bytes=0, pages_per_task=2).extract_text(_pdf(PAGES)))
+    assert by_pages["text_content"] == "Page 0\nPage 1\nPage 2\n"
+    assert by_pages["truncated"]
+
+    by_bytes = asyncio.run(PdfProcessingService(executor, max_pages=0, max_bytes=10, pages_per_task=2).extract_text(_pdf(PAGES)))
+    assert by_bytes["text_content"] == "Page 0\nPag"
+    assert by_bytes["pages_extracted"] == 2
+    assert PdfProcessingService.process_pdf_file(_pdf(PAGES), max_bytes=10) == by_bytes
+
+def test_pages_stream_before_the_document_is_finished(executor):
+    service = PdfProcessingService(executor, max_pages=0, max_bytes=0, pages_per_task=1)
+
+    async def first_two():
+        pages = []
+        async for page in service.aiter_pages(_pdf(PAGES)):
+            pages.append(page)
+            if len(pages) == 2:
+                break
+        return pages
+
+    assert asyncio.run(first_two()) == ["Page 0", "Page 1"]
+    assert list(PdfProcessingService.iter_pages(_pdf(PAGES), 5)) == ["Page 5", "Page 6"]
+
+def test_executor_errors_are_not_reported_as_bad_documents():
+    class BusyExecutor:
+        process_workers = 2
+
+        async def run_in_thread(self, fn, *args):
+            raise ExecutorBusyError("executor queue is full")
+
+    with pytest.raises(ExecutorBusyError):
+        asyncio.run(PdfProcessingService(BusyExecutor()).extract_text(_pdf(["page one"])))
+
+def test_a_dead_worker_is_not_reported_as_a_bad_document():
+    class BrokenExecutor:
+        process_workers = 2
+
+        async def run_in_thread(self, fn, *args):
+            return fn(*args)
+
+        async def run_in_process(self, fn, *args):
+            raise BrokenProcessPool("a worker process terminated abruptly")
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(PdfProcessingService(BrokenExecutor(), pages_per_task=1).extract_text(_pdf(["page one", "page two"])))
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services.pdf_table_extraction_service import PdfTableExtractionService
+
+client = TestClient(app)
+
+STATEMENT_PAGES = [
+    """ACME BANK
+Account Statement
+Date        Description                      Withdrawals   Deposits    Balance
+01/01/2023  Opening balance                                            5,000.00
+02/01/2023  Salary ACME Corp                               2,500.00    7,500.00
+13/01/2023  Rent payment                     1,200.00                  6,300.00
+            ref 99812 January
+Page 1 of 2
+""",
+    """Date        Description                      Withdrawals   Deposits    Balance
+15/01/2023  Card 4411 Grocery Store 123.45                             6,176.55
+            Refund Store 42                                 50.00 CR    6,226.55
+20/01/2023  ATM withdrawal                     (60.00)                  6,166.55
+""",
+]
+
+def test_rows_are_extracted_across_pages():
+    rows = list(PdfTableExtractionService().iter_rows(iter(STATEMENT_PAGES)))
+
+    assert [row["description"] for row in rows] == [
+        "Salary ACME Corp", "Rent payment ref 99812 January", "Card 4411 Grocery Store", "Refund Store 42", "ATM withdrawal"
+    ]
+    assert [row["type"] for row in rows] == ["credit", "debit", "debit", "credit", "debit"]
+    assert [row["amount"] for row in rows] == [2500.0, 1200.0, 123.45, 50.0, 60.0]
+    # A row without a date belongs to the previous date
+    assert rows[3]["date"] == "15/01/2023"
+
+def test_three_amount_rows_follow_the_header_column_order():
+    text = """Date        Details        Deposits   Withdrawals   Balance
+2023-03-01  Opening balance                           100.00
+2023-03-02  Invoice 7        250.00       0.00        350.00
+2023-03-03  Supplier         0.00         80.00       270.00
+"""
+    rows = list(PdfTableExtractionService().iter_rows(text))
+
+    assert [(row["type"], row["amount"]) for row in rows] == [("credit", 250.0), ("debit", 80.0)]
+
+def test_closing_and_carried_forward_balances_are_not_transactions():
+    text = """Date        Description                      Withdrawals   Deposits    Balance
+01/01/2023  Opening balance                                            5,000.00
+02/01/2023  Rent payment                     1,200.00                  3,800.00
+            Balance carried forward                                    3,800.00
+03/01/2023  Balance brought forward                                    3,800.00
+15/01/2023  Salary ACME Corp                               1,196.00    4,996.00
+31/01/2023  Closing balance                                            4,996.00
+"""
+    rows = list(PdfTableExtractionService().iter_rows(text))
+
+    assert [(row["description"], row["type"], row["amount"]) for row in rows] == [
+        ("Rent payment", "debit", 1200.0), ("Salary ACME Corp", "credit", 1196.0)
+    ]
+
+def test_frame_uses_day_first_dates_when_the_statement_does():
+    frame = PdfTableExtractionService().extract_frame("".join(STATEMENT_PAGES))
+
+    assert frame["date"].dt.strftime("%Y-%m-%d").tolist() == ["2023-01-02", "2023-01-13", "2023-01-15", "2023-01-15", "2023-01-20"]
+    assert frame["balance"].iloc[-1] == 6166.55
+    assert PdfTableExtractionService().extract_frame("no table here") is None
+
+def test_text_statement_gets_bank_metrics():
+    response = client.post("/document/analyze-document", json={
+        "document": {"document_id": "pdf-1", "content": {"text_content": "".join(STATEMENT_PAGES)}}
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["document_type"] == "bank_statement"
+    assert data["cashflow_metrics"]["total_inflow"] == pytest.approx(2550.0)
+    assert data["cashflow_metrics"]["total_outflow"] == pytest.approx(1383.45)
+    # The text is summarized rather than echoed back, alongside the rows extracted from it
+    assert data["extracted_data"]["text_content_length"] == len("".join(STATEMENT_PAGES))
+    assert data["extracted_data"]["row_count"] > 0
@@ -0,0 +1,76 @@
+import base64
+
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from app.core.pipeline_context import PipelineContext
+from app.main import app
+from app.services.document_classifier_service import DocumentClassifierService
+from app.services.standardization_service import StandardizationService
+
+def _statement_frame():
+    return pd.DataFrame({
+        'Date': ['2023-01-01', '2023-01-02', '2023-01-03'],
+        'Description': ['Rent', 'Salary', 'Groceries'],
+        'Debit': [1000.0, None, 150.0],
+        'Credit': [None, 2000.0, None],
+        'Balance': [5000.0, 7000.0, 6850.0]
+    })
+
+def test_standardizer_reuses_header_mapping_from_classifier(monkeypatch):
+    context = PipelineContext(document_id="statement.xlsx", frame=_statement_frame())
+
+    assert DocumentClassifierService().classify_context(context) == "bank_statement"
+    assert context.header_mapping == {
+        'Date': 'date', 'Description': 'description', 'Debit': 'debit', 'Credit': 'credit', 'Balance': 'balance'
+    }
+
+    standardization_service = StandardizationService()
+    def fail_on_remap(raw_headers):
+        raise AssertionError("headers should not be mapped twice")
+    monkeypatch.setattr(standardization_service.header_standardization_service, 'map_headers_to_canonical', fail_on_remap)
+
+    statement_frame = standardization_service.standardize_bank_statement_frame(context.frame, context.header_mapping)
+
+    assert statement_frame['type'].tolist() == ['debit', 'credit', 'debit']
+    # The parsed frame handed over by the file handler is left untouched
+    assert context.frame.columns.tolist() == ['Date', 'Description', 'Debit', 'Credit', 'Balance']
+
+def test_content_rows_are_only_built_on_demand():
+    context = PipelineContext(document_id="statement.xlsx", frame=_statement_frame())
+
+    assert context._content is None
+    assert len(context.content["excel_data"]) == 3
+
+def _arrow_ipc(frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
+def test_columnar_and_arrow_payloads_match_row_payload():
+    frame = _statement_frame()
+    payloads = {
+        "excel_data": {"excel_data": frame.astype(object).where(frame.notna(), None).to_dict(orient="records")},
+        "columns": {"columns": frame.astype(object).where(frame.notna(), None).to_dict(orient="list")},
+        "arrow_ipc": {"arrow_ipc": _arrow_ipc(frame)},
+    }
+    client = TestClient(app)
+
+    cashflows = {}
+    for name, content in payloads.items():
+        response = client.post("/document/analyze-document", json={"document": {"document_id": name, "content": content}})
+        assert response.status_code == 200
+        assert response.json()["document_type"] == "bank_statement"
+        cashflows[name] = response.json()["cashflow_metrics"]
+
+    assert cashflows["columns"] == cashflows["excel_data"] == cashflows["arrow_ipc"]
+
+def test_malformed_columnar_payloads_are_rejected():
+    client = TestClient(app)
+
+    for content in ({"columns": {"Date": ["2023-01-01"], "Amount": [1.0, 2.0]}}, {"arrow_ipc": "not arrow"}):
+        response = client.post("/document/analyze-document", json={"document": {"document_id": "bad", "content": content}})
+        assert response.status_code == 400
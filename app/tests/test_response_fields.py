@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.forecast_service import ForecastService
+
+client = TestClient(app)
+
+STATEMENT_ROWS = [
+    {"Date": "2023-01-01", "Description": "Rent", "Debit": 1000.0, "Credit": None, "Balance": 5000.0},
+    {"Date": "2023-01-02", "Description": "Salary", "Debit": None, "Credit": 2000.0, "Balance": 7000.0},
+    {"Date": "2023-01-03", "Description": "Groceries", "Debit": 150.0, "Credit": None, "Balance": 6850.0},
+]
+
+def _analyze(params=None):
+    return client.post("/document/analyze-document", params=params,
+                       json={"document": {"document_id": "statement", "content": {"excel_data": STATEMENT_ROWS}}})
+
+def test_input_is_summarized_unless_included():
+    summary = _analyze().json()["extracted_data"]
+    echoed = _analyze({"include": "extracted_data"}).json()["extracted_data"]
+
+    assert summary == {"row_count": 3, "columns": ["Date", "Description", "Debit", "Credit", "Balance"]}
+    assert echoed == {"excel_data": STATEMENT_ROWS}
+
+def test_only_requested_fields_are_computed_and_returned(monkeypatch):
+    async def fail_forecast(self, rollup):
+        raise AssertionError("forecasts were not requested")
+    monkeypatch.setattr(ForecastService, "get_forecast_from_rollup", fail_forecast)
+
+    response = _analyze({"fields": "risk_score,risk_factors"})
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"document_type", "risk_score", "risk_factors"}
+    assert response.json()["risk_factors"]
+
+def test_unknown_fields_are_rejected():
+    for params in ({"fields": "risk_score,secret_sauce"}, {"include": "forecasts"}):
+        response = _analyze(params)
+
+        assert response.status_code == 400
+        assert "Allowed" in response.json()["detail"]
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schema.output_schema import CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators, RiskScoreRequest
+from app.schema.transaction_frame import TransactionFrame
+from app.services.risk_engine import RiskEngine
+from app.services.rule_compiler import CompiledExpression, CompiledRule, RuleCompilationError
+
+client = TestClient(app)
+
+def test_expression_evaluates_scalars_and_columns():
+    expression = CompiledExpression("amount > 10000 and type in ['debit', 'unknown'] or 0 < abs(balance) < 5")
+
+    assert expression.variables == {"amount", "type", "balance"}
+    assert bool(expression({"amount": 20000.0, "type": "debit", "balance": 100.0}))
+    assert not bool(expression({"amount": 20000.0, "type": "credit", "balance": 100.0}))
+    mask = expression({
+        "amount": np.array([20000.0, 20000.0, 50.0, 50.0]),
+        "type": np.array(["debit", "credit", "credit", "debit"], dtype=object),
+        "balance": np.array([100.0, 100.0, -3.0, 0.0]),
+    })
+    assert mask.tolist() == [True, False, True, False]
+
+@pytest.mark.parametrize("source", [
+    "__import__('os').system('true')",
+    "amount.__class__",
+    "[x for x in amount]",
+    "amount if amount else 0",
+    "lambda: 1",
+    "amount >",
+])
+def test_expressions_outside_the_whitelist_are_rejected(source):
+    with pytest.raises(RuleCompilationError):
+        CompiledExpression(source)
+
+def test_rule_with_expression_impact_and_formatted_rationale():
+    rule = CompiledRule.from_config({
+        "name": "Overdrafts", "condition": "overdraft_frequency > 0",
+        "score_impact": "overdraft_frequency * 5", "rationale": "Overdrafts ({overdraft_frequency})"
+    })
+
+    assert rule.evaluate({"overdraft_frequency": 3})
+    assert rule.impact({"overdraft_frequency": 3}) == 15
+    assert rule.explain({"overdraft_frequency": 3}) == "Overdrafts (3)"
+    assert not rule.is_applicable({"dscr"})
+
+def _metrics(net_cashflow=100.0, current_ratio=2.0, overdraft_frequency=0, dscr=0.0, bankruptcy_flags=False):
+    return (
+        CashflowMetrics(net_cashflow=net_cashflow),
+        LiquidityMetrics(current_ratio=current_ratio),
+        FinancialDisciplineMetrics(overdraft_frequency=overdraft_frequency),
+        DebtServicingMetrics(dscr=dscr),
+        RiskIndicators(bankruptcy_flags=bankruptcy_flags),
+    )
+
+def test_metrics_rules_come_from_yaml():
+    engine = RiskEngine()
+
+    clean = asyncio.run(engine.compute_risk_score(*_metrics()))
+    assert (clean.score, clean.bin, clean.decision) == (0.0, "low", "Approved")
+    assert clean.rationale == ["No specific rules triggered. Base assessment."]
+
+    risky = asyncio.run(engine.compute_risk_score(*_metrics(net_cashflow=-5.0, overdraft_frequency=2, dscr=1.1)))
+    assert risky.score == 20 + 10 + 25
+    assert risky.bin == "medium"
+    assert "Debt Service Coverage Ratio (1.10) is below acceptable levels." in risky.rationale
+
+    assert asyncio.run(engine.compute_risk_score(*_metrics(bankruptcy_flags=True, net_cashflow=-1.0, current_ratio=0.5))).decision == "Rejected"
+
+def test_transaction_rules_are_vectorized_and_skip_missing_columns():
+    engine = RiskEngine()
+    amounts = np.array([500.0, -25000.0, 12000.0, -40.0])
+    transactions = TransactionFrame(
+        dates=np.array(['2023-01-01', '2023-01-02', '2023-01-03', '2023-01-04'], dtype='datetime64[D]'),
+        amounts=amounts,
+        type_codes=np.sign(amounts),
+        balances=np.array([500.0, -24500.0, -12500.0, -12540.0])
+    )
+
+    masks = {rule.name: mask for rule, mask in engine.evaluate_transaction_rules(transactions)}
+    # Location and customer age are not statement columns, so those rules are skipped
+    assert list(masks) == ["High Value Transaction"]
+    # The 12,000 credit is incoming money and is not flagged
+    assert masks["High Value Transaction"].tolist() == [False, True, False, False]
+
+    output = asyncio.run(engine.compute_risk_score(*_metrics(), transactions=transactions))
+    assert output.score == 30.0
+    assert output.rationale == ["Outgoing transaction amount exceeds high value threshold. (1 matching transactions)"]
+
+def _request(net_cashflow=100.0, overdraft_frequency=0, dscr=0.0):
+    return {
+        "cashflow_metrics": {"net_cashflow": net_cashflow},
+        "liquidity_metrics": {"current_ratio": 2.0},
+        "financial_discipline_metrics": {"overdraft_frequency": overdraft_frequency},
+        "debt_servicing_metrics": {"dscr": dscr},
+        "risk_indicators": {},
+    }
+
+def test_batch_scores_match_single_scores():
+    engine = RiskEngine()
+    requests = [_request(), _request(net_cashflow=-1.0, overdraft_frequency=20), _request(dscr=1.15), _request(overdraft_frequency=1)]
+
+    batch = asyncio.run(engine.compute_risk_scores(requests))
+
+    assert len(batch) == 4
+    for request, output in zip(requests, batch.to_outputs()):
+        model = RiskScoreRequest.model_validate(request)
+        single = asyncio.run(engine.compute_risk_score(
+            model.cashflow_metrics, model.liquidity_metrics, model.financial_discipline_metrics,
+            model.debt_servicing_metrics, model.risk_indicators
+        ))
+        assert output.model_dump() == single.model_dump()
+    assert batch.to_records()[1]["score"] == 100.0
+
+def test_batch_endpoint_accepts_json_and_ndjson_in_input_order():
+    requests = [_request(net_cashflow=-1.0), _request(), _request(dscr=1.0)]
+
+    json_response = client.post("/risk/risk-score-batch", json=requests)
+    ndjson_response = client.post(
+        "/risk/risk-score-batch",
+        content="\n".join(json.dumps(request) for request in requests) + "\n",
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert json_response.status_code == ndjson_response.status_code == 200
+    assert json_response.json() == ndjson_response.json()
+    assert [output["score"] for output in json_response.json()] == [20.0, 0.0, 25.0]
+
+    invalid = client.post("/risk/risk-score-batch", json=[_request(), {"cashflow_metrics": {}}])
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"][0] == 1
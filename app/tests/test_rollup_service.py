@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app.schema.transaction_frame import TransactionFrame
+from app.services.metrics_service import MetricsService
+from app.services.rollup_service import RollupService
+
+def _frame():
+    dates = np.array(['2023-01-02', '2023-01-20', '2023-01-31', '2023-03-01', '2023-03-15'], dtype='datetime64[D]')
+    amounts = np.array([3000.0, -500.0, -1000.0, 2000.0, -2500.0])
+    return TransactionFrame(
+        dates=dates,
+        amounts=amounts,
+        type_codes=np.sign(amounts),
+        balances=np.array([3000.0, 2500.0, 1500.0, 3500.0, 1000.0])
+    )
+
+def test_monthly_rollup_keeps_quiet_months():
+    rollup = RollupService.rollup(_frame(), "M")
+
+    assert rollup.labels() == ['2023-01', '2023-02', '2023-03']
+    assert rollup.net.tolist() == [1500.0, 0.0, -500.0]
+    assert rollup.count.tolist() == [3, 0, 2]
+    assert rollup.last_balance[[0, 2]].tolist() == [1500.0, 1000.0]
+    assert np.isnan(rollup.min_balance[1])
+
+def test_week_codes_start_on_monday():
+    # 2023-01-01 is a Sunday, 2023-01-02 a Monday
+    codes = RollupService.period_codes(np.array(['2023-01-01', '2023-01-02', '2023-01-08'], dtype='datetime64[D]'), "W")
+
+    assert codes[0] != codes[1]
+    assert codes[1] == codes[2]
+
+def test_cashflow_and_liquidity_use_monthly_buckets():
+    frame = _frame()
+
+    cashflow = MetricsService.calculate_cashflow_metrics(frame)
+    liquidity = MetricsService.calculate_liquidity_metrics(frame)
+
+    assert cashflow.average_monthly_cashflow == pytest.approx(1000.0 / 3)
+    assert cashflow.cashflow_volatility == pytest.approx(np.std([1500.0, 0.0, -500.0], ddof=1))
+    assert liquidity.min_balance_by_month == {'2023-01': 1500.0, '2023-02': None, '2023-03': 1000.0}
+    # 4000 of outflow spread over the 73 calendar days from Jan 2 to Mar 15
+    assert liquidity.days_cash_on_hand == pytest.approx(1000.0 / (4000.0 / 73))
+
+def test_merged_chunk_rollups_equal_the_whole_statement_rollup():
+    frame = _frame()
+    # The split falls inside January, so both chunks contribute to that month
+    earlier = TransactionFrame(dates=frame.dates[:2], amounts=frame.amounts[:2], type_codes=frame.type_codes[:2], balances=frame.balances[:2])
+    later = TransactionFrame(dates=frame.dates[2:], amounts=frame.amounts[2:], type_codes=frame.type_codes[2:], balances=frame.balances[2:])
+
+    for freq in RollupService.FREQUENCIES:
+        whole = RollupService.rollup(frame, freq)
+        merged = RollupService.merge(RollupService.rollup(earlier, freq), RollupService.rollup(later, freq))
+
+        assert merged.first_code == whole.first_code
+        for field in ("inflow", "outflow", "count", "min_balance", "last_balance"):
+            np.testing.assert_array_equal(getattr(merged, field), getattr(whole, field))
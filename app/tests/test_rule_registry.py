@@ -0,0 +1,78 @@
+import asyncio
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schema.output_schema import CashflowMetrics, LiquidityMetrics, FinancialDisciplineMetrics, DebtServicingMetrics, RiskIndicators
+from app.services.risk_engine import RiskEngine
+from app.services.rule_registry import RuleRegistry, get_rule_registry
+
+RULES_V1 = """
+rules:
+  - name: "Negative Net Cashflow"
+    condition: "net_cashflow < 0"
+    score_impact: 20
+"""
+RULES_V2 = RULES_V1.replace("score_impact: 20", "score_impact: 40")
+
+def _write(path, text, mtime_offset=0):
+    path.write_text(text)
+    stat = os.stat(path)
+    # Bump the mtime explicitly; some filesystems only have coarse timestamps
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+
+def _score(engine):
+    return asyncio.run(engine.compute_risk_score(
+        CashflowMetrics(net_cashflow=-1.0), LiquidityMetrics(current_ratio=2.0),
+        FinancialDisciplineMetrics(), DebtServicingMetrics(), RiskIndicators()
+    ))
+
+def test_changed_file_is_swapped_in_and_stamped_with_its_version(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    _write(rules_path, RULES_V1)
+    registry = RuleRegistry(rules_path, check_interval=0.001)
+    engine = RiskEngine(registry)
+
+    first = _score(engine)
+    assert first.score == 20.0 and first.rule_set_version == registry.current().version
+
+    _write(rules_path, RULES_V2, mtime_offset=10**9)
+    asyncio.run(asyncio.sleep(0.01))
+    second = _score(engine)
+    assert second.score == 40.0
+    assert second.rule_set_version != first.rule_set_version
+
+def test_invalid_file_keeps_the_current_version(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    _write(rules_path, RULES_V1)
+    registry = RuleRegistry(rules_path, check_interval=0.001)
+    version = registry.current().version
+
+    _write(rules_path, RULES_V1.replace("net_cashflow < 0", "__import__('os')"), mtime_offset=10**9)
+    asyncio.run(asyncio.sleep(0.01))
+    assert registry.current().version == version
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.current().version == version
+
+def test_reload_endpoint(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    _write(rules_path, RULES_V1)
+    registry = RuleRegistry(rules_path, check_interval=0)
+    app.dependency_overrides[get_rule_registry] = lambda: registry
+    try:
+        client = TestClient(app)
+        version = client.get("/risk/rules").json()["version"]
+
+        _write(rules_path, RULES_V2)
+        response = client.post("/risk/rules/reload")
+        assert response.status_code == 200
+        assert response.json()["version"] != version
+        assert response.json()["rule_count"] == 1
+
+        _write(rules_path, "rules: [")
+        assert client.post("/risk/rules/reload").status_code == 400
+        assert client.get("/risk/rules").json()["version"] == response.json()["version"]
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,38 @@
+import asyncio
+import time
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.service_container import ServiceContainer, get_service_container, get_ingestion_service
+
+def test_warm_up_runs_the_full_pipeline():
+    container = ServiceContainer()
+    assert not container.is_ready
+
+    asyncio.run(container.warm_up())
+
+    assert container.is_ready
+    assert container.warm_up_error is None
+
+def test_readyz_reports_not_ready_until_warm():
+    container = ServiceContainer()
+    app.dependency_overrides[get_service_container] = lambda: container
+    try:
+        client = TestClient(app)
+        response = client.get("/health/readyz")
+        assert response.status_code == 503
+        assert client.get("/health/livez").status_code == 200
+
+        asyncio.run(container.warm_up())
+        assert client.get("/health/readyz").status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+def test_lifespan_warms_the_shared_container():
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 30
+        while client.get("/health/readyz").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert client.get("/health/readyz").json()["status"] == "ok"
+        # Requests share the container's services instead of building their own
+        assert get_ingestion_service() is get_service_container().ingestion_service
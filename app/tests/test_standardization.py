@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.standardization_service import StandardizationService
+
+def test_debit_credit_columns_fold_into_signed_amount_and_type():
+    df = pd.DataFrame({
+        'Date': ['2023-01-01', '2023-01-02', 'not a date', '2023-01-04', None],
+        'Narration': ['Rent', 'Salary', 'Header noise', None, None],
+        'Withdrawal': [1000.0, None, None, None, None],
+        'Deposit': [None, 2000.0, None, None, None],
+        'Balance': [5000.0, 7000.0, None, 7000.0, None]
+    })
+
+    statement_frame = StandardizationService().standardize_bank_statement_frame(df)
+
+    # The unparseable date and the all-empty row are dropped
+    assert statement_frame['date'].dt.strftime('%Y-%m-%d').tolist() == ['2023-01-01', '2023-01-02', '2023-01-04']
+    assert statement_frame['amount'].tolist() == [-1000.0, 2000.0, 0.0]
+    assert statement_frame['type'].tolist() == ['debit', 'credit', 'unknown']
+    assert statement_frame['description'].tolist() == ['Rent', 'Salary', '']
+    assert statement_frame['balance'].dtype == np.float64
+
+def test_amount_with_type_column_uses_type_for_direction():
+    df = pd.DataFrame({
+        'Date': ['2023-01-01', '2023-01-02', '2023-01-03'],
+        'Description': ['Rent', 'Salary', 'Fee reversal'],
+        'Amount': [1000.0, 2000.0, -15.0],
+        'Type': ['debit', 'CR', 'unknown'],
+        'Balance': [5000.0, 7000.0, None]
+    })
+
+    statement_frame = StandardizationService().standardize_bank_statement_frame(df)
+
+    assert statement_frame['amount'].tolist() == [-1000.0, 2000.0, -15.0]
+    assert statement_frame['type'].tolist() == ['debit', 'credit', 'unknown']
+
+def test_rows_are_only_materialized_on_request():
+    service = StandardizationService()
+    df = pd.DataFrame({
+        'Date': ['2023-01-03', '2023-01-01'],
+        'Description': ['Groceries', 'Rent'],
+        'Debit': [150.0, 1000.0],
+        'Balance': [None, 5000.0]
+    })
+
+    bank_statement = service.build_bank_statement_input(service.standardize_bank_statement_frame(df))
+
+    assert [t.amount for t in bank_statement.transactions] == [-150.0, -1000.0]
+    assert bank_statement.transactions[0].balance is None
+    assert str(bank_statement.start_date) == '2023-01-01'
+    assert str(bank_statement.end_date) == '2023-01-03'
+
+def test_empty_statement_raises():
+    with pytest.raises(ValueError):
+        StandardizationService().standardize_bank_statement_frame(pd.DataFrame({'Date': [None], 'Debit': [None]}))
@@ -0,0 +1,47 @@
+import numpy as np
+
+from app.schema.transaction_frame import TransactionFrame
+from app.services.rollup_service import RollupService
+from app.services.stress_test_service import StressTestService
+
+def _daily_flows():
+    rng = np.random.default_rng(11)
+    return np.where(rng.random(120) < 0.1, 3000.0, 0.0), rng.gamma(2.0, 40.0, size=120)
+
+def test_simulation_is_reproducible_with_a_seed():
+    daily_inflow, daily_outflow = _daily_flows()
+    service = StressTestService(paths=2000, horizon_days=60, seed=7)
+
+    assert service.simulate(daily_inflow, daily_outflow, 1500.0) == service.simulate(daily_inflow, daily_outflow, 1500.0)
+    assert service.simulate(daily_inflow, daily_outflow, 1500.0, seed=8) != service.simulate(daily_inflow, daily_outflow, 1500.0)
+
+def test_shocks_make_scenarios_worse():
+    daily_inflow, daily_outflow = _daily_flows()
+    results = StressTestService(paths=2000, horizon_days=60).simulate(daily_inflow, daily_outflow, 1500.0)
+
+    baseline = results["baseline"]
+    combined = results["income_drop_30_expense_spike_25"]
+    assert 0.0 <= baseline["probability_negative"] <= combined["probability_negative"] <= 1.0
+    assert combined["expected_min_balance"] < baseline["expected_min_balance"]
+
+def test_no_income_always_runs_dry_and_negative_opening_balance_fails():
+    service = StressTestService(paths=500, horizon_days=30)
+    daily_outflow = np.full(10, 100.0)
+
+    assert service.simulate(np.zeros(10), daily_outflow, 1000.0)["baseline"]["probability_negative"] == 1.0
+    assert service.simulate(np.zeros(10), np.zeros(10), -1.0)["baseline"]["status"] == "fail"
+
+def test_run_uses_closing_balance_from_daily_rollup():
+    amounts = np.array([500.0, -20.0, -30.0])
+    frame = TransactionFrame(
+        dates=np.array(['2023-01-01', '2023-01-02', '2023-01-03'], dtype='datetime64[D]'),
+        amounts=amounts,
+        type_codes=np.sign(amounts),
+        balances=np.array([500.0, 480.0, 450.0])
+    )
+
+    results = StressTestService(paths=100, horizon_days=10).run(RollupService.rollup(frame, "D"))
+
+    assert results["starting_balance"] == 450.0
+    assert results["scenarios"]["baseline"]["status"] == "pass"
+    assert StressTestService().run(None) == {"status": "insufficient_data"}
@@ -0,0 +1,38 @@
+"""
+Time to classify long text documents with DocumentClassifierService: one whose type is clear from
+its opening lines (only the first CLASSIFIER_SCAN_KB are scanned) and one whose keywords only appear
+at the end (the scan window keeps growing until the whole text is read).
+
+Usage: python -m benchmarks.bench_classifier [--megabytes 5] [--repeat 5]
+"""
+import argparse
+import time
+
+from app.services.document_classifier_service import DocumentClassifierService
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=float, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    filler = "lorem ipsum dolor sit amet " * int(args.megabytes * 1e6 / 27)
+    classifier = DocumentClassifierService()
+    documents = {
+        "keywords up front": "Kontoauszug Nr. 3\n" + filler,
+        "keywords at the end": filler + "Equifax credit report",
+    }
+    print(f"text: {len(filler) / 1e6:.1f} MB")
+    for label, text in documents.items():
+        elapsed = best_of(lambda: classifier._classify_from_text(text), args.repeat)
+        print(f"{label:<20} {classifier._classify_from_text(text):<15} best {elapsed * 1000:9.2f} ms")
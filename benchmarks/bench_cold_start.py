@@ -0,0 +1,68 @@
+"""
+Measures cold-start import time of the application in fresh interpreters.
+
+Runs `python -X importtime -c "import app.main"` several times, reports the median total and the
+slowest modules (cumulative time), and checks that lazily imported format libraries stay out of
+the startup path.
+
+Usage: python -m benchmarks.bench_cold_start [--budget-ms 2000] [--runs 5] [--top 15]
+Exits with status 1 when the median import time exceeds the budget or a lazy module is imported.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Format libraries that must only be imported when a matching file is processed
+LAZY_MODULES = ("pypdf", "PIL", "openpyxl")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure_import(target: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """Returns (total microseconds, {module: (self us, cumulative us)}) for one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match[1]), int(match[2]), match[3], match[4]
+        modules[module] = (self_us, cumulative_us)
+        # Top-level imports (single space of indentation) add up to the total
+        if len(indent) == 1:
+            total += cumulative_us
+    return total, modules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "2000")))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # The first run warms the OS file cache; it is not counted
+    measure_import(args.target)
+    runs: List[Tuple[int, Dict[str, Tuple[int, int]]]] = [measure_import(args.target) for _ in range(args.runs)]
+    median_ms = statistics.median(total for total, _ in runs) / 1000
+    _, modules = runs[-1]
+
+    print(f"{'module':<50} {'self ms':>9} {'cumulative ms':>14}")
+    for module, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{module:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+    print()
+
+    eager = sorted({module.split(".")[0] for module in modules} & set(LAZY_MODULES))
+    if eager:
+        print(f"lazy modules imported at startup: {', '.join(eager)}")
+    print(f"import {args.target}: median {median_ms:.0f} ms over {args.runs} runs  (budget {args.budget_ms:.0f} ms)")
+    sys.exit(0 if median_ms <= args.budget_ms and not eager else 1)
@@ -0,0 +1,70 @@
+"""
+Compares reading a wide exported statement workbook with pd.read_excel against the two-phase
+ExcelProcessingService.read_excel_frame (sniff the header, stream only the needed columns).
+
+Usage: python -m benchmarks.bench_excel_ingest [--rows 20000] [--extra-columns 15] [--trace-memory]
+Reports the wall time of each reader and, with --trace-memory, its peak traced memory in a second
+run (tracemalloc slows openpyxl's parsing several times over, so it is kept out of the timing).
+"""
+import argparse
+import time
+import tracemalloc
+from io import BytesIO
+import numpy as np
+import pandas as pd
+
+from app.services.excel_processing_service import ExcelProcessingService
+
+
+def build_workbook(rows: int, extra_columns: int, seed: int = 11) -> bytes:
+    import openpyxl
+    rng = np.random.default_rng(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Transactions")
+    extra_headers = [f"Export Field {index}" for index in range(extra_columns)]
+    worksheet.append(["Date", "Description", "Amount", "Type", "Balance", *extra_headers])
+    amounts = np.round(rng.lognormal(4, 1.2, size=rows), 2)
+    credits = rng.random(rows) < 0.3
+    balance = 10_000.0
+    dates = pd.date_range("2020-01-01", periods=rows, freq="h").strftime("%Y-%m-%d").tolist()
+    for row in range(rows):
+        balance += amounts[row] if credits[row] else -amounts[row]
+        worksheet.append([
+            dates[row], "card payment", float(amounts[row]), "credit" if credits[row] else "debit", round(balance, 2),
+            *(f"value {row}-{index}" for index in range(extra_columns))
+        ])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def timed(fn, content: bytes):
+    start = time.perf_counter()
+    frame = fn(content)
+    return frame, time.perf_counter() - start
+
+
+def peak_memory(fn, content: bytes) -> int:
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--extra-columns", type=int, default=15)
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    content = build_workbook(args.rows, args.extra_columns)
+    print(f"rows: {args.rows:,}  columns: {5 + args.extra_columns}  workbook: {len(content) / 1e6:.1f} MB")
+    for label, fn in (
+        ("pd.read_excel", lambda data: pd.read_excel(BytesIO(data))),
+        ("read_excel_frame", ExcelProcessingService.read_excel_frame),
+    ):
+        frame, elapsed = timed(fn, content)
+        memory = f"  peak {peak_memory(fn, content) / 1e6:8.1f} MB" if args.trace_memory else ""
+        print(f"{label:<18} {elapsed:8.2f} s{memory}  ({frame.shape[1]} columns kept)")
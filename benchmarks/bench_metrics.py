@@ -0,0 +1,78 @@
+"""
+Compares the fused MetricsService.calculate_all_metrics kernel with calling the
+five per-family methods one after another, each of which rescans the transactions.
+
+Usage: python -m benchmarks.bench_metrics [--rows 1000000] [--repeat 5]
+"""
+import argparse
+import time
+import numpy as np
+
+from app.schema.transaction_frame import TransactionFrame
+from app.services.metrics_service import MetricsService, StatementAggregates
+
+
+def build_frame(rows: int, seed: int = 7) -> TransactionFrame:
+    rng = np.random.default_rng(seed)
+    type_codes = rng.choice(np.array([1, -1, 0], dtype=np.int8), size=rows, p=[0.3, 0.65, 0.05])
+    amounts = np.round(rng.lognormal(4, 1.2, size=rows), 2) * type_codes
+    return TransactionFrame(
+        dates=np.datetime64('2020-01-01') + np.sort(rng.integers(0, 1460, size=rows)),
+        amounts=amounts,
+        type_codes=type_codes,
+        balances=10_000 + np.cumsum(amounts),
+        descriptions=np.full(rows, "card payment", dtype=object)
+    )
+
+
+def per_method(transactions: TransactionFrame) -> None:
+    MetricsService.calculate_cashflow_metrics(transactions)
+    MetricsService.calculate_liquidity_metrics(transactions)
+    MetricsService.calculate_financial_discipline_metrics(transactions)
+    MetricsService.calculate_debt_servicing_metrics(transactions)
+    MetricsService.identify_risk_indicators(transactions)
+
+
+def fused(transactions: TransactionFrame) -> None:
+    MetricsService.calculate_all_metrics(transactions)
+
+
+def per_method_aggregates_only(transactions: TransactionFrame) -> None:
+    # Same as per_method without the high risk row materialization, which both paths pay once
+    MetricsService.calculate_cashflow_metrics(transactions)
+    MetricsService.calculate_liquidity_metrics(transactions)
+    MetricsService.calculate_financial_discipline_metrics(transactions)
+    MetricsService.calculate_debt_servicing_metrics(transactions)
+
+
+def fused_aggregates_only(transactions: TransactionFrame) -> None:
+    StatementAggregates.from_frame(transactions)
+
+
+def best_of(fn, transactions: TransactionFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(transactions)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transactions = build_frame(args.rows)
+    print(f"rows: {args.rows:,}")
+    for label, baseline, candidate in (
+        ("all metric families", per_method, fused),
+        ("aggregation scans only", per_method_aggregates_only, fused_aggregates_only),
+    ):
+        per_method_seconds = best_of(baseline, transactions, args.repeat)
+        fused_seconds = best_of(candidate, transactions, args.repeat)
+        print(f"{label}:")
+        print(f"  per-method:  {per_method_seconds * 1000:8.2f} ms")
+        print(f"  fused:       {fused_seconds * 1000:8.2f} ms")
+        print(f"  speedup:     {per_method_seconds / fused_seconds:8.2f}x")
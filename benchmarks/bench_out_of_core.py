@@ -0,0 +1,70 @@
+"""
+Peak memory and wall time of analysing a large CSV statement upload held whole versus out of core
+(folded into the metrics OUT_OF_CORE_CHUNK_ROWS rows at a time once it is above MAX_MEMORY_MB).
+
+Usage: python -m benchmarks.bench_out_of_core [--rows 2000000] [--chunk-rows 250000]
+Each mode runs in a fresh interpreter so its peak RSS covers only that mode; the response is
+serialized to JSON as the API would.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+
+def build_csv(path: str, rows: int, seed: int = 3) -> None:
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.lognormal(4, 1.2, size=rows), 2)
+    credits = rng.random(rows) < 0.3
+    pd.DataFrame({
+        "Date": pd.date_range("2015-01-01", periods=rows, freq="min").strftime("%Y-%m-%d"),
+        "Description": np.where(credits, "salary", "card payment"),
+        "Debit": np.where(credits, np.nan, amounts),
+        "Credit": np.where(credits, amounts, np.nan),
+        "Balance": np.round(10_000 + np.cumsum(np.where(credits, amounts, -amounts)), 2),
+    }).to_csv(path, index=False)
+
+
+def run_mode(path: str) -> None:
+    from app.services.file_format_handler_service import FileFormatHandlerService
+    from app.services.ingestion_service import IngestionService
+
+    async def analyze(content: bytes):
+        context = await FileFormatHandlerService().build_context(content, "statement.csv")
+        return await IngestionService().process_context(context)
+
+    with open(path, "rb") as file:
+        content = file.read()
+    start = time.perf_counter()
+    body = asyncio.run(analyze(content)).model_dump_json()
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:8.2f} s  peak RSS {peak_mb:8.0f} MB  response {len(body) / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args.child)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "statement.csv")
+        build_csv(path, args.rows)
+        print(f"rows: {args.rows:,}  csv: {os.path.getsize(path) / 1e6:.1f} MB")
+        for label, max_memory_mb in (("in memory", "0"), ("out of core", "1")):
+            env = {**os.environ, "MAX_MEMORY_MB": max_memory_mb, "OUT_OF_CORE_CHUNK_ROWS": str(args.chunk_rows),
+                   "EXECUTOR_PROCESS_WORKERS": "0", "EXECUTOR_TASK_TIMEOUT_SECONDS": "3600"}
+            print(f"{label:<12}", end=" ", flush=True)
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_out_of_core", "--child", path], env=env, check=True)
@@ -0,0 +1,66 @@
+"""
+Compares the request parsing cost of the /document/analyze-document table payloads: row dicts
+("excel_data"), column lists ("columns") and base64 Arrow IPC ("arrow_ipc"). Each timing covers
+validating the JSON body into DocumentAnalysisRequest and building the pipeline's DataFrame.
+
+Usage: python -m benchmarks.bench_payload_formats [--rows 100000] [--repeat 3]
+"""
+import argparse
+import base64
+import json
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.core.models import DocumentAnalysisRequest
+from app.services.table_payload_service import TablePayloadService
+
+
+def build_statement(rows: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.lognormal(4, 1.2, size=rows), 2)
+    credits = rng.random(rows) < 0.3
+    return pd.DataFrame({
+        "Date": pd.date_range("2020-01-01", periods=rows, freq="h").strftime("%Y-%m-%d"),
+        "Description": np.where(credits, "salary", "card payment"),
+        "Amount": amounts,
+        "Type": np.where(credits, "credit", "debit"),
+        "Balance": np.round(10_000 + np.cumsum(np.where(credits, amounts, -amounts)), 2),
+    })
+
+
+def arrow_ipc(frame: pd.DataFrame) -> str:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
+
+def parse(body: bytes) -> pd.DataFrame:
+    request = DocumentAnalysisRequest.model_validate_json(body)
+    return TablePayloadService.build_context(request.document.document_id, request.document.content).frame
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = build_statement(args.rows)
+    payloads = {
+        "excel_data": {"excel_data": frame.to_dict(orient="records")},
+        "columns": {"columns": frame.to_dict(orient="list")},
+        "arrow_ipc": {"arrow_ipc": arrow_ipc(frame)},
+    }
+    print(f"rows: {args.rows:,}")
+    for name, content in payloads.items():
+        body = json.dumps({"document": {"document_id": name, "content": content}}).encode()
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parse(body)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<12} body {len(body) / 1e6:7.1f} MB   best {min(timings) * 1000:9.1f} ms")
@@ -0,0 +1,61 @@
+"""
+Times batch risk scoring end to end: body parsing, rule evaluation and JSON serialization.
+
+Usage: python -m benchmarks.bench_risk_batch [--requests 100000] [--budget-s 3]
+Exits with status 1 when the total exceeds the budget.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import numpy as np
+from pydantic_core import to_json
+
+from app.api.risk_routes import parse_batch_body
+from app.services.risk_engine import RiskEngine
+
+
+def build_body(count: int) -> bytes:
+    rng = np.random.default_rng(0)
+    net_cashflow = rng.normal(0.0, 1000.0, count).tolist()
+    current_ratio = rng.uniform(0.0, 3.0, count).tolist()
+    overdrafts = rng.poisson(0.5, count).tolist()
+    dscr = rng.uniform(0.0, 3.0, count).tolist()
+    bankruptcy = (rng.random(count) < 0.01).tolist()
+    return json.dumps([
+        {
+            "cashflow_metrics": {"net_cashflow": net_cashflow[i]},
+            "liquidity_metrics": {"current_ratio": current_ratio[i]},
+            "financial_discipline_metrics": {"overdraft_frequency": overdrafts[i]},
+            "debt_servicing_metrics": {"dscr": dscr[i]},
+            "risk_indicators": {"bankruptcy_flags": bankruptcy[i]},
+        }
+        for i in range(count)
+    ]).encode()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--budget-s", type=float, default=3.0)
+    args = parser.parse_args()
+
+    body = build_body(args.requests)
+    engine = RiskEngine()
+
+    start = time.perf_counter()
+    requests = parse_batch_body(body, "application/json")
+    parsed = time.perf_counter()
+    batch = asyncio.run(engine.compute_risk_scores(requests))
+    scored = time.perf_counter()
+    response = to_json(batch.to_records())
+    serialized = time.perf_counter()
+
+    total = serialized - start
+    print(f"{args.requests:,} requests, {len(body) / 1e6:.1f} MB in, {len(response) / 1e6:.1f} MB out")
+    print(f"parse:     {parsed - start:.3f} s")
+    print(f"score:     {scored - parsed:.3f} s")
+    print(f"serialize: {serialized - scored:.3f} s")
+    print(f"total:     {total:.3f} s  (budget {args.budget_s:.1f} s)")
+    sys.exit(0 if total <= args.budget_s else 1)
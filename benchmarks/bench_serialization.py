@@ -0,0 +1,56 @@
+"""
+Compares serializing a large UnifiedDocumentResponse, a statement echoed back with include=extracted_data,
+the way the API used to (NaN cells replaced by None per value, FastAPI's jsonable_encoder, then
+json.dumps) against the FastJSONResponse path (the raw rows, model_dump, then orjson).
+Each timing covers building the echoed rows from the parsed frame and rendering the body.
+
+Usage: python -m benchmarks.bench_serialization [--rows 100000] [--repeat 3]
+"""
+import argparse
+import time
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from app.core.json_response import FastJSONResponse
+from app.core.pipeline_context import PipelineContext
+from app.core.response_fields import ResponseFields
+from app.services.ingestion_service import IngestionService
+from benchmarks.bench_payload_formats import build_statement
+
+
+def legacy_body(context: PipelineContext, response) -> bytes:
+    rows = context.frame.astype(object).where(context.frame.notna(), None).to_dict(orient="records")
+    echoed = response.model_copy(update={"extracted_data": {"excel_data": rows}})
+    return JSONResponse(jsonable_encoder(echoed)).body
+
+
+def fast_body(context: PipelineContext, response) -> bytes:
+    echoed = response.model_copy(update={"extracted_data": {"excel_data": context.frame.to_dict(orient="records")}})
+    return FastJSONResponse(echoed.model_dump()).body
+
+
+def best_of(fn, repeat: int, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), body
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = build_statement(args.rows)
+    # Every other balance is missing, so the rows carry NaN cells
+    frame.loc[frame.index[::2], "Balance"] = float("nan")
+    context = PipelineContext(document_id="bench", frame=frame)
+    response = IngestionService()._analyze_blocking(context, ResponseFields())
+
+    print(f"rows: {args.rows:,}")
+    for label, fn in (("jsonable_encoder + json", legacy_body), ("model_dump + orjson", fast_body)):
+        elapsed, body = best_of(fn, args.repeat, context, response)
+        print(f"{label:<24} best {elapsed * 1000:9.1f} ms   body {len(body) / 1e6:6.1f} MB")
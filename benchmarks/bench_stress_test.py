@@ -0,0 +1,40 @@
+"""
+Times the Monte Carlo liquidity stress test against its latency budget.
+
+Usage: python -m benchmarks.bench_stress_test [--paths 10000] [--days 90] [--budget-ms 100]
+Exits with status 1 when the median run exceeds the budget.
+"""
+import argparse
+import statistics
+import sys
+import time
+import numpy as np
+
+from app.services.stress_test_service import StressTestService
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    daily_inflow = np.where(rng.random(args.history_days) < 0.1, 3000.0, 0.0)
+    daily_outflow = rng.gamma(2.0, 40.0, size=args.history_days)
+    service = StressTestService(paths=args.paths, horizon_days=args.days)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        service.simulate(daily_inflow, daily_outflow, starting_balance=2000.0)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    median_ms = statistics.median(timings)
+    print(f"{args.paths:,} paths x {args.days} days, {len(service.scenarios)} scenarios")
+    print(f"median: {median_ms:.2f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"max:    {max(timings):.2f} ms")
+    sys.exit(0 if median_ms <= args.budget_ms else 1)